@@ -0,0 +1,456 @@
+"""
+Состояние, правила и физика игры Balls без Tk: прицел, снаряды, мишени,
+препятствия и магазин улучшений. Отрисовкой занимается games.balls.Balls.
+
+Объекты игры (мишени, препятствия, снаряды) - словари с координатами;
+события, которые нужно показать игроку, складываются в список events
+(он очищается в начале каждого step() и каждого действия игрока):
+    ("level_up", заработано)    - попадание в основную мишень
+    ("record",)                 - новый рекорд уровня
+    ("bonus_hit",)              - попадание в бонусную мишень
+    ("money", текст)            - изменение денег
+    ("game_over",)              - игра окончена
+"""
+import math
+import random
+
+
+class BallsCore:
+    def __init__(self, seed=None):
+        """
+        :param seed: Зерно генератора случайных чисел (одинаковое зерно и ввод - одинаковая игра)
+        """
+        self.random = random.Random(seed)
+
+        # ===== ИГРОВЫЕ НАСТРОЙКИ =====
+        self.WIDTH = 800  # Ширина поля
+        self.HEIGHT = 600  # Высота поля
+        self.STEP = 20  # Длина шага физики (мс)
+        self.GRAVITY = 0.1  # Гравитация
+        self.FRICTION = 0.005  # Сопротивление воздуха
+        self.LEVEL_DELAY = 300  # Пауза перед следующим уровнем (мс)
+        self.border_width = 10  # Толщина границ карты
+
+        # Настройки снарядов
+        self.projectile_size = 10  # Размер снаряда
+        self.projectile_speed = 20  # Скорость снаряда
+
+        # Настройки прицела
+        self.sight_x = 400  # Позиция прицела по X
+        self.sight_y = 550  # Позиция прицела по Y
+        self.normal_sight_speed = 3.0  # Базовая скорость поворота прицела
+        self.slow_sight_speed = 0.5  # Медленная скорость при зажатом Shift
+
+        # Настройки мишеней
+        self.target_min_size = 20  # Минимальный размер мишени
+        self.target_max_size = 60  # Максимальный размер мишени
+        self.bonus_size = 30  # Размер бонусной мишени
+        self.money_per_level = 5  # Базовое количество денег за уровень
+
+        # Настройки магазина
+        self.remove_random_obstacle_price = 5  # Цена удаления случайного препятствия
+        self.remove_selected_obstacle_price = 10  # Цена удаления выбранного препятствия
+        self.buy_ammo_price = 5  # Цена покупки одного снаряда
+
+        # Улучшения бонусных снарядов (+2, +3, +4, +5)
+        self.bonus_ammo_prices = [5, 10, 20, 40]
+        self.bonus_ammo_values = [2, 3, 4, 5]
+
+        # Улучшения максимального количества снарядов (6-10)
+        self.max_ammo_prices = [5, 10, 15, 20, 25]
+        self.max_ammo_values = [6, 7, 8, 9, 10]
+
+        # Улучшения денег за уровень (6-10 руб)
+        self.money_per_level_prices = [5, 10, 15, 20, 25]
+        self.money_per_level_values = [6, 7, 8, 9, 10]
+
+        self.record = 0  # Рекордный уровень
+        self.time = 0  # Игровое время (мс), идет только в step()
+        self.events = []  # Изменения для отображения
+        self.reset()
+
+    def reset(self):
+        """Начинает игру заново с полным сбросом состояния (рекорд сохраняется)"""
+        self.level = 0  # Текущий уровень
+        self.money = 0  # Количество денег
+
+        self.max_ammo = 5  # Максимальное количество снарядов (начальное)
+        self.ammo = self.max_ammo  # Текущее количество снарядов
+        self.bonus_ammo = 1  # Количество бонусных снарядов за попадание в зеленую мишень
+        self.bonus_ammo_level = 0  # Текущий уровень улучшения
+        self.max_ammo_level = 0  # Текущий уровень улучшения
+        self.money_per_level_upgrade_level = 0  # Текущий уровень улучшения
+        self.money_per_level_upgrade = 0  # Бонус к деньгам за уровень
+
+        self.sight_angle = 0  # Угол наклона прицела
+        self.sight_speed = self.normal_sight_speed  # Текущая скорость поворота прицела
+
+        # Игровые объекты
+        self.target = None  # Основная мишень (красная)
+        self.bonus_target = None  # Бонусная мишень (зеленая)
+        self.obstacles = []  # Список препятствий
+        self.projectiles = []  # Список снарядов
+        self.level_timer = None  # Время до создания следующего уровня (мс)
+
+        self.events = []
+        self.game_active = True  # Флаг активности игры
+        self.create_level()
+
+    # ===== ДЕЙСТВИЯ ИГРОКА =====
+
+    def rotate(self, direction):
+        """
+        Поворот прицела
+        :param direction: -1 - влево, 1 - вправо
+        """
+        self.events = []
+        if self.game_active:
+            self.sight_angle += direction * self.sight_speed
+
+    def set_slow_aim(self, slow):
+        """Замедление прицела (пока зажат Shift)"""
+        self.sight_speed = self.slow_sight_speed if slow else self.normal_sight_speed
+
+    def fire(self):
+        """
+        Выстрел снарядом
+        :return: Созданный снаряд или None
+        """
+        self.events = []
+        if not self.game_active:
+            return None  # Не стреляем, если игра не активна
+
+        # Проверяем, есть ли снаряды
+        if self.ammo <= 0:
+            # Если нет снарядов и денег на покупку, завершаем игру
+            if self.money < self.buy_ammo_price:
+                self.game_over()
+            return None
+
+        self.ammo -= 1  # Уменьшаем количество снарядов
+
+        angle_rad = math.radians(self.sight_angle)  # Угол в радианах
+
+        # Добавляем снаряд в список с параметрами движения
+        projectile = {
+            'x': self.sight_x,  # Позиция X
+            'y': self.sight_y,  # Позиция Y
+            'dx': self.projectile_speed * math.sin(angle_rad),  # Скорость по X
+            'dy': -self.projectile_speed * math.cos(angle_rad),  # Скорость по Y
+            'speed': self.projectile_speed  # Общая скорость (не изменяется)
+        }
+        self.projectiles.append(projectile)
+        return projectile
+
+    def buy(self, upgrade_type):
+        """
+        Покупка улучшения в магазине
+        :param upgrade_type: 'remove_random_obstacle', 'remove_selected_obstacle',
+                             'bonus_ammo', 'max_ammo', 'money_per_level' или 'buy_ammo'
+        :return: Текст списания ("-5 руб") или None, если купить нельзя.
+                 После 'remove_selected_obstacle' препятствие выбирается через remove_obstacle_at
+        """
+        self.events = []
+        message = None
+
+        if upgrade_type == 'remove_random_obstacle':
+            if self.money >= self.remove_random_obstacle_price and len(self.obstacles) > 0:
+                self.money -= self.remove_random_obstacle_price
+                message = f"-{self.remove_random_obstacle_price} руб"
+                obstacle = self.random.choice(self.obstacles)
+                self.obstacles.remove(obstacle)
+        elif upgrade_type == 'remove_selected_obstacle':
+            if self.money >= self.remove_selected_obstacle_price and len(self.obstacles) > 0:
+                self.money -= self.remove_selected_obstacle_price
+                message = f"-{self.remove_selected_obstacle_price} руб"
+        elif upgrade_type == 'bonus_ammo' and self.bonus_ammo_level < len(self.bonus_ammo_prices):
+            if self.money >= self.bonus_ammo_prices[self.bonus_ammo_level]:
+                self.money -= self.bonus_ammo_prices[self.bonus_ammo_level]
+                message = f"-{self.bonus_ammo_prices[self.bonus_ammo_level]} руб"
+                self.bonus_ammo = self.bonus_ammo_values[self.bonus_ammo_level]
+                self.bonus_ammo_level += 1
+        elif upgrade_type == 'max_ammo' and self.max_ammo_level < len(self.max_ammo_prices):
+            if self.money >= self.max_ammo_prices[self.max_ammo_level]:
+                self.money -= self.max_ammo_prices[self.max_ammo_level]
+                message = f"-{self.max_ammo_prices[self.max_ammo_level]} руб"
+                self.max_ammo = self.max_ammo_values[self.max_ammo_level]
+                self.max_ammo_level += 1
+        elif upgrade_type == 'money_per_level' and self.money_per_level_upgrade_level < len(self.money_per_level_prices):
+            if self.money >= self.money_per_level_prices[self.money_per_level_upgrade_level]:
+                self.money -= self.money_per_level_prices[self.money_per_level_upgrade_level]
+                message = f"-{self.money_per_level_prices[self.money_per_level_upgrade_level]} руб"
+                self.money_per_level_upgrade = self.money_per_level_values[self.money_per_level_upgrade_level] - self.money_per_level
+                self.money_per_level_upgrade_level += 1
+        elif upgrade_type == 'buy_ammo':
+            if self.money >= self.buy_ammo_price and self.ammo < self.max_ammo:
+                self.money -= self.buy_ammo_price
+                message = f"-{self.buy_ammo_price} руб"
+                self.ammo += 1
+
+        if message:
+            self.events.append(("money", message))
+        return message
+
+    def remove_obstacle_at(self, x, y):
+        """
+        Удаляет выбранное игроком препятствие (после покупки 'remove_selected_obstacle');
+        если в точке нет препятствия, деньги возвращаются
+        :return: True если препятствие удалено
+        """
+        self.events = []
+        for obstacle in self.obstacles[:]:
+            if (obstacle['x'] <= x <= obstacle['x'] + obstacle['size'] and
+                obstacle['y'] <= y <= obstacle['y'] + obstacle['size']):
+                self.obstacles.remove(obstacle)
+                return True
+
+        self.money += self.remove_selected_obstacle_price
+        self.events.append(("money", f"+{self.remove_selected_obstacle_price} руб"))
+        return False
+
+    # ===== ИГРОВОЙ ЦИКЛ =====
+
+    def step(self):
+        """Один шаг игры длиной STEP мс: физика снарядов и смена уровня"""
+        self.events = []
+        if not self.game_active:
+            return
+        self.time += self.STEP
+
+        if self.level_timer is not None:
+            self.level_timer -= self.STEP
+            if self.level_timer <= 0:
+                self.level_timer = None
+                self.create_level()
+
+        for projectile in self.projectiles[:]:
+            # Применяем гравитацию
+            projectile['dy'] += self.GRAVITY
+
+            # Применяем сопротивление воздуха
+            speed = math.sqrt(projectile['dx']**2 + projectile['dy']**2)
+            if speed > 0:
+                projectile['dx'] -= self.FRICTION * projectile['dx'] / speed
+                projectile['dy'] -= self.FRICTION * projectile['dy'] / speed
+
+            # Сохраняем старую позицию для обработки коллизий
+            old_x, old_y = projectile['x'], projectile['y']
+
+            # Обновляем позицию
+            projectile['x'] += projectile['dx']
+            projectile['y'] += projectile['dy']
+
+            # Обработка коллизий с границами
+            if projectile['x'] <= self.border_width + self.projectile_size/2:
+                projectile['x'] = self.border_width + self.projectile_size/2
+                projectile['dx'] = -projectile['dx'] * 0.95  # Небольшие потери при ударе
+
+            elif projectile['x'] >= self.WIDTH - self.border_width - self.projectile_size/2:
+                projectile['x'] = self.WIDTH - self.border_width - self.projectile_size/2
+                projectile['dx'] = -projectile['dx'] * 0.95
+
+            if projectile['y'] <= self.border_width + self.projectile_size/2:
+                projectile['y'] = self.border_width + self.projectile_size/2
+                projectile['dy'] = -projectile['dy'] * 0.95
+
+            # Обработка коллизий с препятствиями
+            for obstacle in self.obstacles:
+                if self.check_collision(projectile, obstacle):
+                    self.handle_obstacle_collision(projectile, obstacle, old_x, old_y)
+                    break
+
+            # Удаление снарядов за пределами экрана
+            if projectile['y'] > self.HEIGHT or abs(projectile['dx']) < 0.1 and abs(projectile['dy']) < 0.1:
+                self.projectiles.remove(projectile)
+                continue
+
+            # Проверка попаданий в мишени
+            self.check_target_hits(projectile)
+
+    def game_over(self):
+        """Завершение игры"""
+        self.game_active = False
+        self.events.append(("game_over",))
+
+    # ===== УРОВНИ =====
+
+    def create_level(self):
+        """Создание нового уровня с мишенями и препятствиями"""
+        # Размер мишени уменьшается с уровнем (но не меньше минимального)
+        target_size = max(self.target_min_size, self.target_max_size - self.level * 2)
+
+        # Создаем основную мишень (красную)
+        self.target = None
+        for _ in range(200):  # Делаем до 200 попыток разместить мишень
+            x = self.random.randint(100, 700)
+            y = self.random.randint(50, 150)  # Мишень в верхней части
+
+            # Проверяем, чтобы мишень не пересекалась с препятствиями
+            valid_position = True
+            for obstacle in self.obstacles:
+                if self.check_target_obstacle_collision(x, y, target_size, obstacle):
+                    valid_position = False
+                    break
+
+            if valid_position:
+                self.target = {'x': x, 'y': y, 'size': target_size}
+                break
+
+        # Создаем бонусную мишень (зеленую)
+        bonus_size = self.bonus_size
+        self.bonus_target = None
+        for _ in range(200):  # Делаем до 200 попыток разместить мишень
+            bx = self.random.randint(100, 700)
+            by = self.random.randint(50, 150)  # Бонусная мишень тоже в верхней части
+
+            # Проверяем расстояние до основной мишени
+            if self.target and (abs(bx - self.target['x']) < 100 and abs(by - self.target['y']) < 100):
+                continue
+
+            # Проверяем, чтобы бонусная мишень не пересекалась с препятствиями
+            valid_position = True
+            for obstacle in self.obstacles:
+                if self.check_target_obstacle_collision(bx, by, bonus_size, obstacle):
+                    valid_position = False
+                    break
+
+            if valid_position:
+                self.bonus_target = {'x': bx, 'y': by, 'size': bonus_size}
+                break
+
+        # Добавляем новое препятствие (если нужно)
+        if len(self.obstacles) < self.level:
+            self.add_new_obstacle()
+
+    def check_target_obstacle_collision(self, x, y, size, obstacle):
+        """Проверяет пересечение мишени с препятствием"""
+        # Центры мишени и препятствия
+        target_center_x = x + size/2
+        target_center_y = y + size/2
+        obstacle_center_x = obstacle['x'] + obstacle['size']/2
+        obstacle_center_y = obstacle['y'] + obstacle['size']/2
+
+        # Расстояние между центрами
+        distance = math.sqrt(
+            (target_center_x - obstacle_center_x)**2 +
+            (target_center_y - obstacle_center_y)**2
+        )
+        # Проверяем пересечение (сумма радиусов больше расстояния)
+        return distance < size/2 + obstacle['size']/2
+
+    def add_new_obstacle(self):
+        """Добавляет новое препятствие в центральной части экрана"""
+        for _ in range(200):  # Делаем до 200 попыток разместить препятствие
+            # Препятствия генерируются преимущественно в центре
+            ox = self.random.randint(50, 750)
+            oy = self.random.randint(100, 400)
+
+            # Иногда добавляем случайные препятствия
+            if self.random.random() < 0.3:
+                ox = self.random.randint(50, 750)
+                oy = self.random.randint(100, 400)
+
+            osize = self.random.randint(30, 70)
+
+            valid_position = True
+
+            # Проверка с мишенями
+            if self.target and self.check_target_obstacle_collision(
+                self.target['x'], self.target['y'], self.target['size'],
+                {'x': ox, 'y': oy, 'size': osize}
+            ):
+                valid_position = False
+
+            if self.bonus_target and self.check_target_obstacle_collision(
+                self.bonus_target['x'], self.bonus_target['y'], self.bonus_target['size'],
+                {'x': ox, 'y': oy, 'size': osize}
+            ):
+                valid_position = False
+
+            # Проверка с другими препятствиями
+            if valid_position:
+                for obstacle in self.obstacles:
+                    if (abs(ox - obstacle['x']) < osize + obstacle['size'] and
+                        abs(oy - obstacle['y']) < osize + obstacle['size']):
+                        valid_position = False
+                        break
+
+            if valid_position:
+                self.obstacles.append({'x': ox, 'y': oy, 'size': osize})
+                break
+
+    # ===== СТОЛКНОВЕНИЯ =====
+
+    def handle_obstacle_collision(self, projectile, obstacle, old_x, old_y):
+        """Обработка столкновения с препятствиями с учетом угла удара"""
+        # Определяем стороны препятствия
+        left = obstacle['x']
+        right = obstacle['x'] + obstacle['size']
+        top = obstacle['y']
+        bottom = obstacle['y'] + obstacle['size']
+
+        # Определяем, с какой стороны произошло столкновение
+        if old_x < left and projectile['x'] >= left:  # Слева
+            projectile['x'] = left - self.projectile_size/2
+            projectile['dx'] = -abs(projectile['dx']) * 0.95
+
+        elif old_x > right and projectile['x'] <= right:  # Справа
+            projectile['x'] = right + self.projectile_size/2
+            projectile['dx'] = abs(projectile['dx']) * 0.95
+
+        if old_y < top and projectile['y'] >= top:  # Сверху
+            projectile['y'] = top - self.projectile_size/2
+            projectile['dy'] = -abs(projectile['dy']) * 0.95
+
+        elif old_y > bottom and projectile['y'] <= bottom:  # Снизу
+            projectile['y'] = bottom + self.projectile_size/2
+            projectile['dy'] = abs(projectile['dy']) * 0.95
+
+    def check_collision(self, projectile, obstacle):
+        """Точная проверка столкновения круга с прямоугольником"""
+        # Ближайшая точка на прямоугольнике к центру круга
+        closest_x = max(obstacle['x'], min(projectile['x'], obstacle['x'] + obstacle['size']))
+        closest_y = max(obstacle['y'], min(projectile['y'], obstacle['y'] + obstacle['size']))
+
+        # Расстояние от центра круга до ближайшей точки
+        distance = math.sqrt((projectile['x'] - closest_x)**2 + (projectile['y'] - closest_y)**2)
+
+        return distance < self.projectile_size/2
+
+    def check_target_hits(self, projectile):
+        """Проверка попаданий в мишени"""
+        if self.target and self.check_hit(projectile, self.target):
+            earned_money = self.money_per_level + self.money_per_level_upgrade
+            self.money += earned_money
+            self.level += 1
+            self.events.append(("level_up", earned_money))
+            self.events.append(("money", f"+{earned_money} руб"))
+
+            if self.level > self.record:
+                self.record = self.level
+                self.events.append(("record",))
+
+            self.target = None
+            self.projectiles.remove(projectile)
+            self.level_timer = self.LEVEL_DELAY
+
+        elif self.bonus_target and self.check_hit(projectile, self.bonus_target):
+            self.ammo = min(self.ammo + self.bonus_ammo, self.max_ammo)
+            self.events.append(("bonus_hit",))
+
+            self.bonus_target = None
+            self.projectiles.remove(projectile)
+
+    def check_hit(self, projectile, target):
+        """Проверяет попадание снаряда в мишень (круг в круг)"""
+        # Центры мишени и снаряда
+        target_center_x = target['x'] + target['size']/2
+        target_center_y = target['y'] + target['size']/2
+
+        # Расстояние между центрами
+        distance = math.sqrt(
+            (projectile['x'] - target_center_x)**2 +
+            (projectile['y'] - target_center_y)**2
+        )
+        # Проверяем попадание (сумма радиусов больше расстояния)
+        return distance < target['size']/2 + self.projectile_size/2
@@ -0,0 +1,217 @@
+"""
+Замеры скорости шага каждой игры без Tk: ядро игры (games/*_core.py) гоняется
+сценарием с заранее заданным вводом на нескольких масштабах - длина змейки,
+число препятствий, число букв и цифр на экране одновременно.
+
+Для каждого масштаба считаются шаги в секунду, перцентили времени шага,
+число сборок мусора и выделенная память (отдельным прогоном под tracemalloc,
+чтобы он не искажал время). Результаты сохраняются в JSON для сравнения запусков:
+
+    python -m gcenter bench --output before.json
+    python -m gcenter bench --compare before.json
+"""
+import gc
+import json
+import platform
+import time
+import tracemalloc
+
+from games.balls_core import BallsCore
+from games.digits_core import DigitsCore
+from games.letters_core import LettersCore
+from games.overlay import percentile
+from games.snake_core import SnakeCore
+
+VERSION = 1         # Версия формата результатов
+TICKS = 2000        # Сколько шагов замеряется на каждом масштабе
+WARMUP = 100        # Сколько шагов выполняется до замеров
+ALLOC_TICKS = 300   # Сколько шагов выполняется под tracemalloc
+EAT_EVERY = 5       # Змейка съедает еду каждые EAT_EVERY шагов
+FIRE_EVERY = 10     # Balls: выстрел каждые FIRE_EVERY шагов
+
+
+def snake_scenario(length, seed):
+    """
+    Змейка заданной длины ползет по своей строке поля и регулярно ест
+    (на каждом съедании - create_food и, время от времени, add_mine)
+    """
+    game = SnakeCore(seed)
+    cell = game.CELL_SIZE
+    # Строка поля на одну клетку длиннее змейки: голова всегда идет в клетку,
+    # которую только что освободил хвост, а мины не ставятся ближе 3 клеток к змейке
+    game.WIDTH = (length + 1) * cell
+    y = game.HEIGHT // 2 // cell * cell
+    game.snake = [((length - 1 - i) * cell, y) for i in range(length)]
+    game.direction = "Right"
+    game.game_started = True
+    game.food = game.create_food()
+
+    def tick(number):
+        if number % EAT_EVERY == 0:
+            game.food = ((game.snake[0][0] + cell) % game.WIDTH, y, "blue")
+        game.step()
+        del game.snake[length:]  # Длина змейки не меняется от масштаба к масштабу
+    return game, tick
+
+
+def balls_scenario(obstacles, seed):
+    """Поле с заданным числом препятствий, прицел ходит влево-вправо, выстрелы без остановки"""
+    game = BallsCore(seed)
+    columns = 12
+    game.obstacles = [
+        {'x': 60 + (index % columns) * 58, 'y': 230 + (index // columns) * 50, 'size': 30}
+        for index in range(obstacles)
+    ]
+
+    def tick(number):
+        if number % FIRE_EVERY == 0:
+            shot = number // FIRE_EVERY
+            game.rotate(1 if shot % 40 < 20 else -1)
+            game.ammo = game.max_ammo  # Снаряды не кончаются
+            game.fire()
+        game.step()
+    return game, tick
+
+
+def falling_scenario(game, glyphs, items, key, spawn):
+    """
+    Общий сценарий Letters и Digits: на экране все время glyphs символов,
+    настоящие нажимаются у самой линии, фальшивые уходят за линию
+    """
+    game.start()
+
+    def tick(number):
+        while len(items()) < glyphs:
+            spawn()
+        # Появление новых символов задает сценарий, а не таймер игры
+        game.spawn_timer = game.MAX_SPAWN_DELAY
+        for item in items():
+            if not item['fake'] and item['y'] > game.LINE_Y - 60:
+                game.press(item[key].lower())
+                break
+        game.step()
+    return game, tick
+
+
+def letters_scenario(glyphs, seed):
+    """Letters с заданным числом букв на экране (не больше 26)"""
+    game = LettersCore(seed)
+    return falling_scenario(game, glyphs, lambda: game.letters, 'letter', game.spawn_letter)
+
+
+def digits_scenario(glyphs, seed):
+    """Digits с заданным числом цифр на экране (не больше 10)"""
+    game = DigitsCore(seed)
+    return falling_scenario(game, glyphs, lambda: game.digits, 'digit', game.spawn_digit)
+
+
+# Игра -> (сценарий, что означает масштаб, масштабы)
+SCENARIOS = {
+    "snake": (snake_scenario, "length", [10, 100, 1000, 3000]),
+    "balls": (balls_scenario, "obstacles", [0, 12, 24, 48]),
+    "letters": (letters_scenario, "glyphs", [6, 16, 26]),
+    "digits": (digits_scenario, "glyphs", [3, 7, 10]),
+}
+
+
+def finished(name, game):
+    """Закончилась ли игра (сценарий не должен до этого доводить)"""
+    if name == "snake":
+        return game.game_over
+    return not game.game_active
+
+
+def measure(name, scale, seed=1, ticks=TICKS):
+    """
+    Замеры одного масштаба одной игры
+    :return: Словарь с результатами (время шага - в микросекундах)
+    """
+    scenario, scale_name, _ = SCENARIOS[name]
+
+    # Время: каждый шаг отдельно
+    game, tick = scenario(scale, seed)
+    for number in range(WARMUP):
+        tick(number)
+    clock = time.perf_counter_ns
+    timings = []
+    collections = sum(stats["collections"] for stats in gc.get_stats())
+    started = clock()
+    for number in range(WARMUP, WARMUP + ticks):
+        before = clock()
+        tick(number)
+        timings.append(clock() - before)
+    elapsed = clock() - started
+    collections = sum(stats["collections"] for stats in gc.get_stats()) - collections
+    if finished(name, game):
+        raise RuntimeError(f"Сценарий {name} ({scale_name}={scale}) довел игру до конца")
+
+    # Память: тот же сценарий заново, под tracemalloc
+    game, tick = scenario(scale, seed)
+    for number in range(WARMUP):
+        tick(number)
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for number in range(WARMUP, WARMUP + ALLOC_TICKS):
+            tick(number)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "game": name,
+        "scale_name": scale_name,
+        "scale": scale,
+        "ticks": ticks,
+        "ticks_per_s": ticks / (elapsed / 1e9),
+        "p50_us": percentile(timings, 0.50) / 1000,
+        "p95_us": percentile(timings, 0.95) / 1000,
+        "p99_us": percentile(timings, 0.99) / 1000,
+        "max_us": timings[-1] / 1000,
+        "gc_collections": collections,
+        "alloc_peak_kb": (peak - base) / 1024,
+        "alloc_net_kb": (current - base) / 1024,
+    }
+
+
+def run(games=None, seed=1, ticks=TICKS):
+    """
+    Замеры всех масштабов выбранных игр
+    :param games: Список игр (None - все)
+    :return: Генератор результатов measure (по мере готовности)
+    """
+    for name in games or SCENARIOS:
+        for scale in SCENARIOS[name][2]:
+            yield measure(name, scale, seed, ticks)
+
+
+def report(results, seed=1, ticks=TICKS):
+    """Документ с результатами и описанием окружения (для JSON)"""
+    return {
+        "version": VERSION,
+        "created": time.time(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "ticks": ticks,
+        "results": list(results),
+    }
+
+
+def save(document, path):
+    """Сохраняет результаты в JSON"""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(document, file, ensure_ascii=False, indent=1)
+
+
+def load_baseline(path):
+    """
+    Читает сохраненные результаты для сравнения
+    :return: {(игра, масштаб): результат}
+    """
+    with open(path, encoding="utf-8") as file:
+        document = json.load(file)
+    return {(result["game"], result["scale"]): result for result in document.get("results", [])}
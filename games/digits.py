@@ -1,37 +1,33 @@
 import tkinter as tk
-import random
+
+from games.loop import GameLoop
+from games.overlay import DebugOverlay
+from games.sprites import SpritePool
+from games.replay import Recorder
+from games.scheduler import Scheduler
 
 class Digits:
     def __init__(self, parent_window, callback=None):
         """
         Игра Digits с цифрами, оптимизированная для интеграции с Game Center.
+        Правила и состояние - в DigitsCore, здесь только отображение и ввод.
         """
         self.parent_window = parent_window  # Ссылка на главное окно
         self.callback = callback           # Функция для возврата результата
+        self.recorder = Recorder("digits")  # Ядро DigitsCore с записью ввода
+        self.game = self.recorder.game     # Правила и состояние игры
         
-        # ========== НАСТРОЙКИ ИГРЫ ==========
-        self.WIDTH = 800                   # Ширина игрового поля
-        self.HEIGHT = 600                  # Высота игрового поля
-        self.LINE_Y = 500                  # Y-координата линии поражения
+        # ========== НАСТРОЙКИ ОТОБРАЖЕНИЯ ==========
+        self.WIDTH = self.game.WIDTH       # Ширина игрового поля
+        self.HEIGHT = self.game.HEIGHT     # Высота игрового поля
+        self.LINE_Y = self.game.LINE_Y     # Y-координата линии поражения
         self.BG_COLOR = 'black'            # Цвет фона
         
         # Настройки цифр
-        self.DIGIT_RADIUS = 28             # Радиус круга с цифрой
+        self.DIGIT_RADIUS = self.game.DIGIT_RADIUS  # Радиус круга с цифрой
         self.DIGIT_FONT = ('Arial', 22, 'bold')  # Шрифт цифр
         self.REAL_COLOR = '#4682B4'        # Цвет настоящих цифр
         self.FAKE_COLOR = '#FF6347'        # Цвет фальшивых цифр
-        self.FAKE_CHANCE = 0.10            # Вероятность фальшивой цифры
-        
-        # Настройки скорости
-        self.BASE_SPEED = 1.00             # Начальная скорость падения
-        self.SPEED_INCREASE = 0.05         # Увеличение скорости за попадание
-        self.MAX_SPEED = 8.00              # Максимальная скорость
-        
-        # Настройки появления цифр
-        self.MIN_SPAWN_DELAY = 400         # Минимальная задержка (мс)
-        self.MAX_SPAWN_DELAY = 2000        # Максимальная задержка (мс)
-        self.SPAWN_ACCEL = 0.97            # Коэф. ускорения появления цифр
-        self.TARGET_DIGITS = 7             # Целевое количество цифр
         
         # Настройки анимации
         self.HIT_ANIM_DURATION = 30        # Длительность анимации попадания
@@ -40,14 +36,7 @@ class Digits:
         self.FAKE_HIT_COLOR = '#FFA500'    # Цвет анимации для фальшивых
         self.PENALTY_COLOR = '#FF0000'     # Цвет для штрафа
         
-        # ========== ИГРОВЫЕ ПЕРЕМЕННЫЕ ==========
-        self.score = 0                      # Текущий счет
-        self.current_speed = self.BASE_SPEED
-        self.spawn_delay = self.MAX_SPAWN_DELAY
-        self.game_active = False
-        self.digits = []                   # Список активных цифр
-        self.animations = []               # Список активных анимаций
-        self.active_digits = set()         # Множество цифр на экране
+        self.shapes = {}                   # id(цифры) -> (круг, текст) на холсте
         
         # ========== СОЗДАНИЕ ИНТЕРФЕЙСА ==========
         self.root = tk.Toplevel(parent_window)
@@ -60,6 +49,9 @@ class Digits:
         self.canvas = tk.Canvas(self.root, width=self.WIDTH, height=self.HEIGHT, 
                                bg=self.BG_COLOR)
         self.canvas.pack()
+        self.sprites = SpritePool(self.canvas)  # Круги, подписи и анимации переиспользуются
+        self.game_over_text = None
+        self.animations = []  # Анимации попаданий: [id на холсте, x, y, шаг]
         
         # Линия поражения
         self.canvas.create_line(0, self.LINE_Y, self.WIDTH, self.LINE_Y, 
@@ -71,7 +63,7 @@ class Digits:
             font=('Arial', 20, 'bold'))
         
         self.speed_text = self.canvas.create_text(
-            self.WIDTH//2, 30, text=f"Скорость: {self.BASE_SPEED:.2f}x", 
+            self.WIDTH//2, 30, text=f"Скорость: {self.game.BASE_SPEED:.2f}x", 
             fill='silver', font=('Arial', 16))
         
         self.instruction = self.canvas.create_text(
@@ -85,142 +77,107 @@ class Digits:
         
         # Обработчик закрытия окна
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Игровой цикл: шаг симуляции и отрисовка
+        self.scheduler = Scheduler(self.root)  # Разовые задержки: снятие штрафа и закрытие окна
+        self.loop = GameLoop(self.root, self.game.STEP, self.step, self.draw_digits)
+        self.overlay = DebugOverlay(self.root, self.canvas, self.loop, "digits", self.scheduler)  # F3/F4
 
     def on_close(self):
         """Обработчик закрытия окна игры"""
+        self.scheduler.cancel_all()
+        self.loop.stop()
         self.root.destroy()
         self.parent_window.deiconify()  # Восстанавливаем главное окно
         if self.callback:
-            self.callback(self.score)   # Передаем счет в Game Center
+            # Передаем счет и запись игры в Game Center
+            self.callback(self.game.score, self.recorder.save(self.game.score))
 
     def start_game(self, event=None):
         """Начинает новую игру"""
-        if self.game_active:
+        if self.game.game_active:
             return
             
         self.clear_canvas()
-        self.game_active = True
-        self.score = 0
-        self.current_speed = self.BASE_SPEED
-        self.spawn_delay = self.MAX_SPAWN_DELAY
-        self.active_digits = set()
+        self.recorder.record("start")
         
         # Обновляем интерфейс
         self.canvas.itemconfig(self.instruction, state='hidden')
+        self.handle_events()
         self.update_score()
         
-        # Запускаем игровые процессы
-        self.spawn_digit()
-        self.fall_digits()
+        # Запускаем игровой цикл
+        self.loop.start()
 
     def clear_canvas(self):
-        """Очищает холст от всех объектов кроме статичных элементов"""
-        for item in self.canvas.find_all():
-            if item not in [self.score_text, self.speed_text, self.instruction]:
-                self.canvas.delete(item)
-        
-        self.digits = []
-        self.animations = []
-        self.active_digits = set()
-        
-        # Восстанавливаем линию
-        self.canvas.create_line(0, self.LINE_Y, self.WIDTH, self.LINE_Y, 
-                              fill='red', width=1)
+        """Убирает с холста все, что осталось от прошлой игры"""
+        for shape in self.shapes.values():
+            for item in shape:
+                self.sprites.release(item)
+        self.shapes = {}
+        self.clear_animations()
+        
+        if self.game_over_text is not None:
+            self.canvas.delete(self.game_over_text)
+            self.game_over_text = None
 
-    def spawn_digit(self):
-        """Создает новую падающую цифру"""
-        if not self.game_active:
-            return
-            
-        # Выбираем случайную цифру (0-9)
-        digit = str(random.randint(0, 9))
-        
-        # Проверяем, нет ли уже такой цифры на экране
-        while digit in self.active_digits:
-            digit = str(random.randint(0, 9))
-            
-        self.active_digits.add(digit)
-        
-        # Определяем тип цифры (10% chance для фальшивой)
-        is_fake = random.random() < self.FAKE_CHANCE
-        
-        # Случайная позиция по X
-        x = random.randint(self.DIGIT_RADIUS, self.WIDTH-self.DIGIT_RADIUS)
-        
-        # Создаем графические элементы
-        circle_id = self.canvas.create_oval(
-            x-self.DIGIT_RADIUS, -self.DIGIT_RADIUS*2,
-            x+self.DIGIT_RADIUS, 0,
-            fill=self.FAKE_COLOR if is_fake else self.REAL_COLOR,
+    def step(self):
+        """Один шаг игрового цикла"""
+        # Анимации попаданий продвигаются вместе с игрой - по шагу цикла за шаг
+        for animation in self.animations:
+            animation[3] += 1
+        self.recorder.step()
+        self.handle_events()
+
+    def handle_events(self):
+        """Переносит на холст изменения, произошедшие в игре"""
+        for event in self.game.events:
+            kind = event[0]
+            if kind == "spawn":
+                self.create_digit(event[1])
+            elif kind == "remove":
+                self.remove_digit(event[1])
+            elif kind == "hit":
+                self.update_score()
+                self.show_hit_animation(event[1], event[2], is_fake=event[3])
+            elif kind == "penalty":
+                self.update_score()
+                self.show_penalty_animation()
+            elif kind == "game_over":
+                self.game_over()
+
+    def create_digit(self, digit):
+        """Создает на холсте круг и текст новой цифры"""
+        x, y = digit['x'], digit['y']
+        circle_id = self.sprites.acquire("oval", (
+            x-self.DIGIT_RADIUS, y-self.DIGIT_RADIUS,
+            x+self.DIGIT_RADIUS, y+self.DIGIT_RADIUS),
+            fill=self.FAKE_COLOR if digit['fake'] else self.REAL_COLOR,
             outline='white',
             width=2
         )
         
-        text_id = self.canvas.create_text(
-            x, -self.DIGIT_RADIUS,
-            text=digit, 
+        text_id = self.sprites.acquire("text", (x, y),
+            text=digit['digit'], 
             fill='white', 
             font=self.DIGIT_FONT
         )
-        
-        # Добавляем цифру в список активных
-        self.digits.append({
-            'circle': circle_id,
-            'text': text_id,
-            'digit': digit,
-            'x': x,
-            'y': -self.DIGIT_RADIUS,
-            'speed': self.current_speed,
-            'hit': False,
-            'fake': is_fake,
-        })
-        
-        # Регулируем скорость спавна
-        digits_count = len(self.digits)
-        if digits_count < self.TARGET_DIGITS:
-            self.spawn_delay = max(self.MIN_SPAWN_DELAY, self.spawn_delay * self.SPAWN_ACCEL)
-        else:
-            self.spawn_delay = min(self.MAX_SPAWN_DELAY, self.spawn_delay / self.SPAWN_ACCEL)
-        
-        # Планируем следующую цифру
-        self.root.after(int(self.spawn_delay), self.spawn_digit)
+        self.shapes[id(digit)] = (circle_id, text_id)
 
-    def fall_digits(self):
-        """Обновляет позиции всех падающих цифр"""
-        if not self.game_active:
-            return
-            
-        for digit in self.digits[:]:
-            # Увеличиваем скорость со временем
-            digit['y'] += digit['speed']
-            
-            # Обновляем позицию
-            self.canvas.coords(
-                digit['circle'],
+    def draw_digits(self):
+        """Переносит цифры на холсте в текущие позиции (раз за кадр)"""
+        for digit in self.game.digits:
+            circle_id, text_id = self.shapes[id(digit)]
+            self.sprites.move(circle_id, (
                 digit['x']-self.DIGIT_RADIUS, digit['y']-self.DIGIT_RADIUS,
                 digit['x']+self.DIGIT_RADIUS, digit['y']+self.DIGIT_RADIUS
-            )
-            self.canvas.coords(digit['text'], digit['x'], digit['y'])
-            
-            # Проверка достижения линии
-            if digit['y'] - self.DIGIT_RADIUS > self.LINE_Y and not digit['hit']:
-                if digit['fake']:
-                    # Фальшивая цифра прошла линию — +1 очко
-                    self.score += 1
-                    self.update_score()
-                    self.show_hit_animation(digit['x'], digit['y'], is_fake=True)
-                else:
-                    # Настоящая цифра прошла линию — проигрыш
-                    self.game_over()
-                    return
-                
-                self.remove_digit(digit)
+            ))
+            self.sprites.move(text_id, (digit['x'], digit['y']))
         
-        # Обновляем скорость в интерфейсе
-        self.canvas.itemconfig(self.speed_text, text=f"Скорость: {self.current_speed:.2f}x")
+        self.draw_animations()
         
-        # Следующий кадр
-        self.animations.append(self.root.after(16, self.fall_digits))
+        # Обновляем скорость в интерфейсе
+        self.canvas.itemconfig(self.speed_text, text=f"Скорость: {self.game.current_speed:.2f}x")
 
     def handle_key_press(self, event):
         """Обрабатывает нажатия цифровых клавиш"""
@@ -228,128 +185,93 @@ class Digits:
             self.start_game()
             return
             
-        if not self.game_active:
-            return
-            
-        # Получаем нажатую цифру
-        key = event.char if event.char else ''
-        
-        # Игнорируем не-цифры
-        if not key.isdigit():
-            return
-            
-        hit_any = False
-        digit_exists = False
-        
-        # Проверяем все цифры на экране
-        for digit in self.digits[:]:
-            if digit['digit'] == key:
-                digit_exists = True
-                if not digit['hit']:
-                    if digit['fake']:
-                        # Нажали фальшивую — проигрыш
-                        self.game_over()
-                        return
-                    else:
-                        # Нажали настоящую — +1 очко
-                        digit['hit'] = True
-                        hit_any = True
-                        self.score += 1
-                        self.update_score()
-                        self.show_hit_animation(digit['x'], digit['y'])
-                        self.current_speed = min(self.MAX_SPEED, self.current_speed + self.SPEED_INCREASE)
-        
-        if hit_any:
-            for digit in self.digits[:]:
-                if digit['hit']:
-                    self.remove_digit(digit)
-        elif not digit_exists:
-            # Нажали цифру, которой нет на экране — штраф
-            self.score -= 3
-            self.update_score()
-            self.show_penalty_animation()
+        self.recorder.record("press", event.char)
+        self.handle_events()
 
     def show_penalty_animation(self):
         """Показывает анимацию штрафа"""
         # Текст "Штраф 3 рубля" внизу
-        penalty_text = self.canvas.create_text(
-            self.WIDTH//2, self.HEIGHT - 30,
+        penalty_text = self.sprites.acquire("text", (self.WIDTH//2, self.HEIGHT - 30),
             text="Штраф 3 рубля",
             fill=self.PENALTY_COLOR,
             font=('Arial', 24, 'bold')
         )
         
         # Текст "-3" возле счета
-        minus_text = self.canvas.create_text(
-            150, 30,
+        minus_text = self.sprites.acquire("text", (150, 30),
             text="-3",
             fill=self.PENALTY_COLOR,
             font=('Arial', 20, 'bold')
         )
         
         # Удаляем через 1 секунду
-        self.root.after(1000, lambda: (
-            self.canvas.delete(penalty_text),
-            self.canvas.delete(minus_text)
+        self.scheduler.after(1000, lambda: (
+            self.sprites.release(penalty_text),
+            self.sprites.release(minus_text)
         ))
 
     def remove_digit(self, digit):
         """Удаляет цифру с экрана"""
-        self.canvas.delete(digit['circle'])
-        self.canvas.delete(digit['text'])
-        self.digits.remove(digit)
-        self.active_digits.discard(digit['digit'])
+        for item in self.shapes.pop(id(digit)):
+            self.sprites.release(item)
 
     def show_hit_animation(self, x, y, is_fake=False):
         """Анимация попадания"""
         text = "+1"
         color = self.FAKE_HIT_COLOR if is_fake else self.REAL_HIT_COLOR
         
-        anim_id = self.canvas.create_text(
-            x, y-30, 
+        anim_id = self.sprites.acquire("text", (x, y-30), 
             text=text, 
             fill=color,
             font=('Arial', 24, 'bold')
         )
         
-        def move_animation(step=0):
+        self.animations.append([anim_id, x, y, 0])
+
+    def draw_animations(self):
+        """Сдвигает надписи попаданий по их шагу и убирает завершившиеся (раз за кадр)"""
+        running = []
+        for animation in self.animations:
+            anim_id, x, y, step = animation
             if step < self.HIT_ANIM_DURATION:
-                self.canvas.move(anim_id, 0, -self.HIT_ANIM_SPEED)
-                self.root.after(16, lambda: move_animation(step+1))
+                self.sprites.move(anim_id, (x, y-30 - (step+1)*self.HIT_ANIM_SPEED))
+                running.append(animation)
             else:
-                self.canvas.delete(anim_id)
-                
-        move_animation()
+                self.sprites.release(anim_id)
+        self.animations = running
+
+    def clear_animations(self):
+        """Убирает с холста все надписи попаданий"""
+        for animation in self.animations:
+            self.sprites.release(animation[0])
+        self.animations = []
 
     def update_score(self):
         """Обновляет счет на экране"""
-        self.canvas.itemconfig(self.score_text, text=f"Счёт: {self.score}")
+        self.canvas.itemconfig(self.score_text, text=f"Счёт: {self.game.score}")
 
     def game_over(self):
-        """Завершает игру с задержкой"""
-        self.game_active = False
-        
-        for anim in self.animations:
-            self.root.after_cancel(anim)
-        self.animations = []
+        """Показывает завершение игры и закрывает окно с задержкой"""
+        self.loop.stop()
+        self.clear_animations()  # Цикл остановлен - анимации больше не продвигаются
         
         # Показываем финальное сообщение
-        self.canvas.create_text(
+        self.game_over_text = self.canvas.create_text(
             self.WIDTH//2, self.HEIGHT//2,
-            text=f"Игра окончена!\nСчёт: {self.score}",
+            text=f"Игра окончена!\nСчёт: {self.game.score}",
             fill='white',
             font=('Arial', 24, 'bold'),
             justify='center'
         )
         
         # Закрываем окно через 3 секунды
-        self.root.after(3000, self.on_close)
+        self.scheduler.after(3000, self.on_close)
 
 if __name__ == "__main__":
     root = tk.Tk()
     root.withdraw()
     
-    def test_callback(score):
+    def test_callback(score, replay=None):
         print(f"Игра завершена! Счёт: {score}")
         root.destroy()
     
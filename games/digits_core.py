@@ -0,0 +1,196 @@
+"""
+Состояние и правила игры Digits без Tk: появление и падение цифр, нажатия, счет.
+Отрисовкой занимается games.digits.Digits.
+
+Изменения, которые нужно показать игроку, складываются в список events
+(он очищается в начале каждого step() и press()):
+    ("spawn", цифра)            - появилась новая цифра
+    ("remove", цифра)           - цифра убрана с поля
+    ("hit", x, y, фальшивая)    - засчитано очко
+    ("penalty",)                - штраф за цифру, которой нет на экране
+    ("game_over",)              - игра окончена
+"""
+import random
+
+
+class DigitsCore:
+    def __init__(self, seed=None):
+        """
+        :param seed: Зерно генератора случайных чисел (одинаковое зерно и ввод - одинаковая игра)
+        """
+        # ========== НАСТРОЙКИ ИГРЫ ==========
+        self.WIDTH = 800                   # Ширина игрового поля
+        self.HEIGHT = 600                  # Высота игрового поля
+        self.LINE_Y = 500                  # Y-координата линии поражения
+
+        # Настройки цифр
+        self.DIGIT_RADIUS = 28             # Радиус круга с цифрой
+        self.FAKE_CHANCE = 0.10            # Вероятность фальшивой цифры
+
+        # Настройки скорости
+        self.BASE_SPEED = 1.00             # Начальная скорость падения
+        self.SPEED_INCREASE = 0.05         # Увеличение скорости за попадание
+        self.MAX_SPEED = 8.00              # Максимальная скорость
+
+        # Настройки появления цифр
+        self.MIN_SPAWN_DELAY = 400         # Минимальная задержка (мс)
+        self.MAX_SPAWN_DELAY = 2000        # Максимальная задержка (мс)
+        self.SPAWN_ACCEL = 0.97            # Коэф. ускорения появления цифр
+        self.TARGET_DIGITS = 7             # Целевое количество цифр
+        self.PENALTY = 3                   # Штраф за цифру, которой нет на экране
+
+        # Шаг симуляции
+        self.STEP = 16                     # Длина шага игрового цикла (мс)
+
+        # ========== ИГРОВЫЕ ПЕРЕМЕННЫЕ ==========
+        self.random = random.Random(seed)
+        self.score = 0                      # Текущий счет
+        self.current_speed = self.BASE_SPEED
+        self.spawn_delay = self.MAX_SPAWN_DELAY
+        self.game_active = False
+        self.digits = []                    # Список активных цифр
+        self.spawn_timer = 0                # Время до появления следующей (мс)
+        self.active_digits = set()          # Множество цифр на экране
+        self.time = 0                       # Игровое время (мс), идет только в step()
+        self.events = []                    # Изменения для отображения
+
+    def start(self):
+        """Начинает новую игру (если она еще не идет)"""
+        self.events = []
+        if self.game_active:
+            return
+
+        self.game_active = True
+        self.score = 0
+        self.current_speed = self.BASE_SPEED
+        self.spawn_delay = self.MAX_SPAWN_DELAY
+        self.digits = []
+        self.active_digits = set()
+        self.spawn_digit()
+
+    def step(self):
+        """Один шаг игры длиной STEP мс: появление и падение цифр"""
+        self.events = []
+        if not self.game_active:
+            return
+        self.time += self.STEP
+        self.spawn_timer -= self.STEP
+        if self.spawn_timer <= 0:
+            self.spawn_digit()
+        self.fall_digits()
+
+    def spawn_digit(self):
+        """Создает новую падающую цифру"""
+        if not self.game_active:
+            return
+
+        # Выбираем случайную цифру (0-9)
+        digit = str(self.random.randint(0, 9))
+
+        # Проверяем, нет ли уже такой цифры на экране
+        while digit in self.active_digits:
+            digit = str(self.random.randint(0, 9))
+
+        self.active_digits.add(digit)
+
+        # Определяем тип цифры (10% chance для фальшивой)
+        is_fake = self.random.random() < self.FAKE_CHANCE
+
+        # Случайная позиция по X
+        x = self.random.randint(self.DIGIT_RADIUS, self.WIDTH-self.DIGIT_RADIUS)
+
+        # Добавляем цифру в список активных
+        item = {
+            'digit': digit,
+            'x': x,
+            'y': -self.DIGIT_RADIUS,
+            'speed': self.current_speed,
+            'hit': False,
+            'fake': is_fake,
+        }
+        self.digits.append(item)
+        self.events.append(("spawn", item))
+
+        # Регулируем скорость спавна
+        digits_count = len(self.digits)
+        if digits_count < self.TARGET_DIGITS:
+            self.spawn_delay = max(self.MIN_SPAWN_DELAY, self.spawn_delay * self.SPAWN_ACCEL)
+        else:
+            self.spawn_delay = min(self.MAX_SPAWN_DELAY, self.spawn_delay / self.SPAWN_ACCEL)
+
+        # Планируем следующую цифру
+        self.spawn_timer = self.spawn_delay
+
+    def fall_digits(self):
+        """Сдвигает все падающие цифры"""
+        for digit in self.digits[:]:
+            digit['y'] += digit['speed']
+
+            # Проверка достижения линии
+            if digit['y'] - self.DIGIT_RADIUS > self.LINE_Y and not digit['hit']:
+                if digit['fake']:
+                    # Фальшивая цифра прошла линию — +1 очко
+                    self.score += 1
+                    self.events.append(("hit", digit['x'], digit['y'], True))
+                else:
+                    # Настоящая цифра прошла линию — проигрыш
+                    self.game_over()
+                    return
+
+                self.remove_digit(digit)
+
+    def press(self, char):
+        """
+        Обрабатывает нажатие цифровой клавиши
+        :param char: Введенный символ (event.char)
+        """
+        self.events = []
+        if not self.game_active:
+            return
+
+        # Получаем нажатую цифру
+        key = char if char else ''
+
+        # Игнорируем не-цифры
+        if not key.isdigit():
+            return
+
+        hit_any = False
+        digit_exists = False
+
+        # Проверяем все цифры на экране
+        for digit in self.digits[:]:
+            if digit['digit'] == key:
+                digit_exists = True
+                if not digit['hit']:
+                    if digit['fake']:
+                        # Нажали фальшивую — проигрыш
+                        self.game_over()
+                        return
+                    else:
+                        # Нажали настоящую — +1 очко
+                        digit['hit'] = True
+                        hit_any = True
+                        self.score += 1
+                        self.events.append(("hit", digit['x'], digit['y'], False))
+                        self.current_speed = min(self.MAX_SPEED, self.current_speed + self.SPEED_INCREASE)
+
+        if hit_any:
+            for digit in self.digits[:]:
+                if digit['hit']:
+                    self.remove_digit(digit)
+        elif not digit_exists:
+            # Нажали цифру, которой нет на экране — штраф
+            self.score -= self.PENALTY
+            self.events.append(("penalty",))
+
+    def remove_digit(self, digit):
+        """Убирает цифру с поля"""
+        self.digits.remove(digit)
+        self.active_digits.discard(digit['digit'])
+        self.events.append(("remove", digit))
+
+    def game_over(self):
+        """Завершает игру"""
+        self.game_active = False
+        self.events.append(("game_over",))
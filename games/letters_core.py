@@ -0,0 +1,206 @@
+"""
+Состояние и правила игры Letters без Tk: появление и падение букв, нажатия, счет.
+Отрисовкой занимается games.letters.Letters.
+
+Изменения, которые нужно показать игроку, складываются в список events
+(он очищается в начале каждого step() и press()):
+    ("spawn", буква)            - появилась новая буква
+    ("remove", буква)           - буква убрана с поля
+    ("hit", x, y, фальшивая)    - засчитано очко
+    ("game_over",)              - игра окончена
+"""
+import random
+import string
+
+
+class LettersCore:
+    def __init__(self, seed=None):
+        """
+        :param seed: Зерно генератора случайных чисел (одинаковое зерно и ввод - одинаковая игра)
+        """
+        # ========== НАСТРОЙКИ ИГРЫ ==========
+        self.WIDTH = 800                   # Ширина игрового поля
+        self.HEIGHT = 600                  # Высота игрового поля
+        self.LINE_Y = 500                  # Y-координата линии поражения
+
+        # Настройки букв
+        self.LETTER_RADIUS = 28            # Радиус круга с буквой
+        self.FAKE_CHANCE = 0.10            # Вероятность фальшивой буквы
+
+        # Настройки скорости
+        self.BASE_SPEED = 1.00             # Начальная скорость падения
+        self.SPEED_INCREASE = 0.05         # Увеличение скорости за попадание
+        self.MAX_SPEED = 6.00              # Максимальная скорость
+
+        # Настройки появления букв
+        self.MIN_SPAWN_DELAY = 700         # Минимальная задержка (мс)
+        self.MAX_SPAWN_DELAY = 2000        # Максимальная задержка (мс)
+        self.SPAWN_ACCEL = 0.98            # Коэф. ускорения появления букв
+        self.TARGET_LETTERS = 6            # Целевое количество букв
+
+        # Шаг симуляции
+        self.STEP = 16                     # Длина шага игрового цикла (мс)
+
+        # Соответствие английских и русских букв (QWERTY -> ЙЦУКЕН)
+        self.KEYBOARD_LAYOUT = {
+            'Q': 'Й', 'W': 'Ц', 'E': 'У', 'R': 'К', 'T': 'Е', 'Y': 'Н',
+            'U': 'Г', 'I': 'Ш', 'O': 'Щ', 'P': 'З', 'A': 'Ф', 'S': 'Ы',
+            'D': 'В', 'F': 'А', 'G': 'П', 'H': 'Р', 'J': 'О', 'K': 'Л',
+            'L': 'Д', 'Z': 'Я', 'X': 'Ч', 'C': 'С', 'V': 'М', 'B': 'И',
+            'N': 'Т', 'M': 'Ь'
+        }
+        self.RUSSIAN_LAYOUT = {v: k for k, v in self.KEYBOARD_LAYOUT.items()}
+
+        # ========== ИГРОВЫЕ ПЕРЕМЕННЫЕ ==========
+        self.random = random.Random(seed)
+        self.score = 0                      # Текущий счет
+        self.current_speed = self.BASE_SPEED
+        self.spawn_delay = self.MAX_SPAWN_DELAY
+        self.game_active = False
+        self.letters = []                   # Список активных букв
+        self.spawn_timer = 0                # Время до появления следующей (мс)
+        self.active_letters = set()         # Множество букв на экране
+        self.time = 0                       # Игровое время (мс), идет только в step()
+        self.events = []                    # Изменения для отображения
+
+    def start(self):
+        """Начинает новую игру (если она еще не идет)"""
+        self.events = []
+        if self.game_active:
+            return
+
+        self.game_active = True
+        self.score = 0
+        self.current_speed = self.BASE_SPEED
+        self.spawn_delay = self.MAX_SPAWN_DELAY
+        self.letters = []
+        self.active_letters = set()
+        self.spawn_letter()
+
+    def step(self):
+        """Один шаг игры длиной STEP мс: появление и падение букв"""
+        self.events = []
+        if not self.game_active:
+            return
+        self.time += self.STEP
+        self.spawn_timer -= self.STEP
+        if self.spawn_timer <= 0:
+            self.spawn_letter()
+        self.fall_letters()
+
+    def spawn_letter(self):
+        """Создает новую падающую букву"""
+        if not self.game_active:
+            return
+
+        # Выбираем случайную букву (английскую)
+        letter = self.random.choice(string.ascii_uppercase)
+
+        # Проверяем, нет ли уже такой буквы на экране
+        while letter in self.active_letters:
+            letter = self.random.choice(string.ascii_uppercase)
+
+        self.active_letters.add(letter)
+
+        # Определяем тип буквы (10% chance для фальшивой)
+        is_fake = self.random.random() < self.FAKE_CHANCE
+
+        # Случайная позиция по X
+        x = self.random.randint(self.LETTER_RADIUS, self.WIDTH-self.LETTER_RADIUS)
+
+        # Добавляем букву в список активных
+        item = {
+            'letter': letter,
+            'x': x,
+            'y': -self.LETTER_RADIUS,
+            'speed': self.current_speed,
+            'hit': False,
+            'fake': is_fake,
+            'age': 0                        # Сколько падает (мс игрового времени)
+        }
+        self.letters.append(item)
+        self.events.append(("spawn", item))
+
+        # Регулируем скорость спавна
+        letters_count = len(self.letters)
+        if letters_count < self.TARGET_LETTERS:
+            self.spawn_delay = max(self.MIN_SPAWN_DELAY, self.spawn_delay * self.SPAWN_ACCEL)
+        else:
+            self.spawn_delay = min(self.MAX_SPAWN_DELAY, self.spawn_delay / self.SPAWN_ACCEL)
+
+        # Планируем следующую букву
+        self.spawn_timer = self.spawn_delay
+
+    def fall_letters(self):
+        """Сдвигает все падающие буквы"""
+        for letter in self.letters[:]:
+            # Увеличиваем скорость со временем
+            letter['age'] += self.STEP
+            time_alive = letter['age'] / 1000
+            speed_mult = 1.0 + min(4.0, (time_alive / 8.0) ** 1.5)
+            letter['y'] += letter['speed'] * speed_mult
+
+            # Проверка достижения линии
+            if letter['y'] - self.LETTER_RADIUS > self.LINE_Y and not letter['hit']:
+                if letter['fake']:
+                    # Фальшивая буква прошла линию — +1 очко
+                    self.score += 1
+                    self.events.append(("hit", letter['x'], letter['y'], True))
+                else:
+                    # Настоящая буква прошла линию — проигрыш
+                    self.game_over()
+                    return
+
+                self.remove_letter(letter)
+
+    def press(self, char):
+        """
+        Обрабатывает нажатие клавиши с поддержкой русской раскладки
+        :param char: Введенный символ (event.char)
+        """
+        self.events = []
+        if not self.game_active:
+            return
+
+        # Получаем символ в верхнем регистре
+        key = char.upper() if char else ''
+
+        # Преобразуем русскую букву в английскую (если нужно)
+        key = self.RUSSIAN_LAYOUT.get(key, key)
+
+        # Игнорируем не-буквы
+        if not key.isalpha():
+            return
+
+        hit_any = False
+
+        # Проверяем все буквы на экране
+        for letter in self.letters[:]:
+            if letter['letter'] == key and not letter['hit']:
+                if letter['fake']:
+                    # Нажали фальшивую — проигрыш
+                    self.game_over()
+                    return
+                else:
+                    # Нажали настоящую — +1 очко
+                    letter['hit'] = True
+                    hit_any = True
+                    self.score += 1
+                    self.events.append(("hit", letter['x'], letter['y'], False))
+                    self.current_speed = min(self.MAX_SPEED, self.current_speed + self.SPEED_INCREASE)
+
+        if hit_any:
+            for letter in self.letters[:]:
+                if letter['hit']:
+                    self.remove_letter(letter)
+
+    def remove_letter(self, letter):
+        """Убирает букву с поля"""
+        self.letters.remove(letter)
+        self.active_letters.discard(letter['letter'])
+        self.events.append(("remove", letter))
+
+    def game_over(self):
+        """Завершает игру"""
+        self.game_active = False
+        self.events.append(("game_over",))
@@ -0,0 +1,119 @@
+"""
+Общий игровой цикл с фиксированным шагом симуляции.
+
+Вместо цепочки root.after(N, ...) в каждой игре: время меряется по монотонным
+часам, симуляция продвигается целыми шагами фиксированной длины (при отставании -
+несколько шагов подряд, но не больше MAX_STEPS_BEHIND), а отрисовка выполняется
+один раз за кадр. Поэтому скорость игры не зависит от того, сколько длился сам кадр.
+Цикл останавливается сам, когда окно уничтожено (даже если его закрыли не через игру).
+"""
+import time
+import tkinter as tk
+
+FRAME_MS = 16          # Минимальный период кадра отрисовки (~60 кадров в секунду)
+MAX_STEPS_BEHIND = 5   # Сколько шагов симуляции можно догнать за один кадр
+
+
+class GameLoop:
+    """Цикл «обновление с фиксированным шагом + одна отрисовка за кадр» поверх after"""
+
+    def __init__(self, widget, step_ms, update, render=None,
+                 frame_ms=FRAME_MS, max_steps=MAX_STEPS_BEHIND):
+        """
+        :param widget: Виджет Tk, через after которого планируются кадры
+        :param step_ms: Длина шага симуляции (мс)
+        :param update: Функция одного шага симуляции (без аргументов)
+        :param render: Функция отрисовки (вызывается после шагов, если они были)
+        :param frame_ms: Минимальный период кадра (мс)
+        :param max_steps: Сколько шагов можно выполнить за кадр; остальное отставание отбрасывается
+        """
+        self.widget = widget
+        self.step_ms = step_ms
+        self.step = step_ms / 1000
+        self.frame = frame_ms / 1000
+        self.update = update
+        self.render = render
+        self.max_steps = max_steps
+        self.running = False
+        self.job = None        # Запланированный вызов after
+        self.last = 0.0        # Время предыдущего кадра (time.monotonic)
+        self.lag = 0.0         # Прошедшее, но еще не просимулированное время (с)
+        self.steps = 0         # Всего выполнено шагов
+        self.dropped = 0       # Всего отброшено шагов из-за отставания
+        self.due = 0.0         # Когда должен был начаться текущий кадр (time.monotonic)
+        self.monitor = None    # Замеры кадров (games.overlay.DebugOverlay), None - без замеров
+        widget.bind("<Destroy>", self.on_destroy, add="+")
+
+    def start(self):
+        """Запускает (или перезапускает) цикл; первый шаг - через step_ms"""
+        self.stop()
+        self.running = True
+        self.last = time.monotonic()
+        self.lag = 0.0
+        self.due = self.last + self.step
+        self.job = self.widget.after(self.step_ms, self.tick)
+
+    def stop(self):
+        """Останавливает цикл (можно вызывать из update)"""
+        self.running = False
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+            self.job = None
+
+    def on_destroy(self, event):
+        """Окно уничтожено: следующий кадр обращался бы к удаленному холсту"""
+        if event.widget is not self.widget:
+            return
+        try:
+            self.stop()
+        except tk.TclError:
+            self.job = None  # Интерпретатор Tk уже завершен
+
+    def tick(self):
+        """Один кадр: догоняет симуляцию, отрисовывает и планирует следующий кадр"""
+        self.job = None
+        if not self.running:
+            return
+
+        now = time.monotonic()
+        if self.monitor is None:
+            self.run_frame(now)
+        else:
+            self.monitor.frame(self, now)
+        if not self.running:
+            return
+
+        # Следующий кадр - к моменту следующего шага, но не чаще frame_ms;
+        # время, ушедшее на этот кадр, вычитается из ожидания
+        self.due = now + max(self.frame, self.step - self.lag)
+        delay = max(1, round((self.due - time.monotonic()) * 1000))
+        self.job = self.widget.after(delay, self.tick)
+
+    def run_frame(self, now):
+        """Шаги симуляции за прошедшее время и одна отрисовка"""
+        steps = self.advance(now)
+        if steps and self.running and self.render is not None:
+            self.render()
+
+    def advance(self, now):
+        """
+        Выполняет накопившиеся шаги симуляции
+        :return: Сколько шагов выполнено
+        """
+        self.lag += now - self.last
+        self.last = now
+
+        steps = 0
+        while self.running and self.lag >= self.step:
+            if steps == self.max_steps:
+                # Отстали слишком сильно (например, окно перетаскивали) - не догоняем,
+                # иначе каждый следующий кадр будет только длиннее
+                behind = int(self.lag / self.step)
+                self.dropped += behind
+                self.lag -= behind * self.step
+                break
+            self.update()
+            self.lag -= self.step
+            steps += 1
+        self.steps += steps
+        return steps
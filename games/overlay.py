@@ -0,0 +1,170 @@
+"""
+Отладочный оверлей для окон игр: время симуляции и отрисовки кадра, отставание
+срабатывания after от запланированного, число объектов на холсте и ожидающих after.
+
+F3 - показать/скрыть, F4 - сохранить замеры в CSV (data/overlay/<игра>-<время>.csv).
+Пока оверлей выключен, GameLoop работает без замеров: стоимость - одна проверка за кадр.
+"""
+import csv
+import os
+import time
+from collections import deque
+
+from gcenter import DATA_DIR
+
+WINDOW = 300       # По скольким последним кадрам считаются p50/p95/p99
+SAMPLES = 3600     # Сколько кадров хранится для выгрузки в CSV (~минута при 60 к/с)
+REFRESH = 0.25     # Как часто обновляется текст оверлея (с)
+TAG = "debug_overlay"
+CSV_FIELDS = ["frame", "time_ms", "sim_ms", "render_ms", "drift_ms", "steps", "dropped",
+              "canvas_items", "after_jobs", "game_jobs"]
+
+
+def percentile(ordered, q):
+    """
+    Перцентиль по методу ближайшего ранга
+    :param ordered: Отсортированный непустой список
+    :param q: Доля от 0 до 1
+    """
+    index = max(0, min(len(ordered) - 1, int(q * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class DebugOverlay:
+    """Замеры кадров GameLoop и их отображение поверх холста игры"""
+
+    def __init__(self, root, canvas, loop, name, scheduler=None):
+        """
+        :param root: Окно игры (на нем F3/F4)
+        :param canvas: Холст, поверх которого рисуется оверлей
+        :param loop: Игровой цикл (games.loop.GameLoop)
+        :param name: Имя игры (для файла CSV)
+        :param scheduler: Отложенные вызовы игры (games.scheduler.Scheduler), None - не показывать
+        """
+        self.root = root
+        self.canvas = canvas
+        self.loop = loop
+        self.name = name
+        self.scheduler = scheduler
+        self.enabled = False
+        self.samples = deque(maxlen=SAMPLES)
+        self.started = 0.0
+        self.frames = 0
+        self.shown_at = 0.0  # Когда текст обновлялся в последний раз
+
+        root.bind("<F3>", self.toggle)
+        root.bind("<F4>", self.export_csv)
+
+    def toggle(self, event=None):
+        """Включает или выключает замеры и оверлей"""
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.samples.clear()
+            self.frames = 0
+            self.started = time.monotonic()
+            self.shown_at = 0.0
+            self.loop.monitor = self
+        else:
+            self.loop.monitor = None
+            self.canvas.delete(TAG)
+
+    def frame(self, loop, now):
+        """Кадр цикла с замерами (вызывается GameLoop.tick вместо run_frame)"""
+        drift = now - loop.due
+        dropped = loop.dropped
+        steps = loop.advance(now)
+        simulated = time.monotonic()
+        if steps and loop.running and loop.render is not None:
+            loop.render()
+        rendered = time.monotonic()
+
+        self.frames += 1
+        self.samples.append((
+            self.frames,
+            (now - self.started) * 1000,
+            (simulated - now) * 1000,
+            (rendered - simulated) * 1000,
+            drift * 1000,
+            steps,
+            loop.dropped - dropped,
+            self.canvas_items(),
+            self.after_jobs(),
+            len(self.scheduler) if self.scheduler is not None else 0
+        ))
+        if loop.running:
+            self.show(rendered)
+
+    def canvas_items(self):
+        """Число объектов на холсте (без самого оверлея)"""
+        return len(self.canvas.find_all()) - len(self.canvas.find_withtag(TAG))
+
+    def after_jobs(self):
+        """Число ожидающих вызовов after во всем интерпретаторе Tk"""
+        return len(self.root.tk.splitlist(self.root.tk.call("after", "info")))
+
+    def summary(self):
+        """
+        Сводка по последним WINDOW кадрам
+        :return: {поле: (последнее, p50, p95, p99)} для sim_ms, render_ms, drift_ms
+        """
+        recent = list(self.samples)[-WINDOW:]
+        result = {}
+        for column, field in ((2, "sim_ms"), (3, "render_ms"), (4, "drift_ms")):
+            ordered = sorted(sample[column] for sample in recent)
+            result[field] = (
+                recent[-1][column],
+                percentile(ordered, 0.50),
+                percentile(ordered, 0.95),
+                percentile(ordered, 0.99)
+            )
+        return result
+
+    def show(self, now):
+        """Обновляет текст оверлея (не чаще REFRESH и заново, если холст очищали)"""
+        if now - self.shown_at < REFRESH and self.canvas.find_withtag(TAG):
+            return
+        self.shown_at = now
+
+        last = self.samples[-1]
+        lines = [f"{'мс':<7}{'кадр':>7}{'p50':>7}{'p95':>7}{'p99':>7}"]
+        summary = self.summary()
+        for field, title in (("sim_ms", "симул."), ("render_ms", "отрис."), ("drift_ms", "after")):
+            values = summary[field]
+            lines.append(f"{title:<7}" + "".join(f"{value:>7.1f}" for value in values))
+        lines.append(f"объектов: {last[7]}  after: {last[8]} (игры: {last[9]})")
+        lines.append(f"шагов/кадр: {last[5]}  пропущено: {self.loop.dropped}")
+
+        self.canvas.delete(TAG)
+        text = self.canvas.create_text(
+            8, 8, text="\n".join(lines), anchor="nw",
+            fill="#00ff00", font=("Courier", 10), tags=TAG
+        )
+        x1, y1, x2, y2 = self.canvas.bbox(text)
+        background = self.canvas.create_rectangle(
+            x1 - 4, y1 - 4, x2 + 4, y2 + 4, fill="black", outline="", tags=TAG
+        )
+        self.canvas.tag_lower(background, text)
+        self.canvas.tag_raise(TAG)
+
+    def export_csv(self, event=None):
+        """
+        Сохраняет накопленные замеры в CSV
+        :return: Путь к файлу или None, если замеров нет
+        """
+        if not self.samples:
+            return None
+        folder = os.path.join(DATA_DIR, "overlay")
+        path = os.path.join(folder, f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}.csv")
+        try:
+            os.makedirs(folder, exist_ok=True)
+            with open(path, "w", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(CSV_FIELDS)
+                for sample in self.samples:
+                    writer.writerow(f"{value:.3f}" if isinstance(value, float) else value
+                                    for value in sample)
+        except OSError as e:
+            print(f"Ошибка сохранения замеров: {e}")
+            return None
+        print(f"Замеры сохранены: {path}")
+        return path
@@ -0,0 +1,143 @@
+"""
+Запись и воспроизведение игр без Tk.
+
+Окно игры создает ядро через Recorder: зерно генератора случайных чисел выбирается
+при запуске, а каждый шаг и каждое действие игрока (нажатие, поворот, выстрел,
+покупка) проходят через Recorder и попадают в журнал ввода с номером шага.
+После игры запись сохраняется в data/replays/<id>.json, а id - в запись истории.
+
+Так как ядра детерминированы (одинаковое зерно и ввод - одинаковая игра),
+replay() повторяет игру без окна и задержек с максимальной скоростью:
+    python -m gcenter replay                 - проверить все записи из истории
+    python -m gcenter replay snake-20250501-120000-1a2b3c4d
+"""
+import json
+import os
+import random
+import time
+
+from gcenter import DATA_DIR
+from gcenter.registry import GAMES
+from gcenter.writer import atomic_write
+
+VERSION = 1  # Версия формата записи
+# Методы ядер, которые вызываются вводом игрока (только они допустимы в записи)
+ACTIONS = {"press", "start", "reset", "rotate", "set_slow_aim", "fire", "buy", "remove_obstacle_at"}
+
+
+class ReplayError(Exception):
+    """Запись не найдена, повреждена или не подходит к игре"""
+
+
+def create_core(name, seed):
+    """Создает ядро игры с заданным зерном"""
+    game = GAMES.get(name)
+    if game is None or game.core is None:
+        raise ReplayError(f"Неизвестная игра: {name}")
+    return game.load_core()(seed)
+
+
+def replays_dir(data_dir=DATA_DIR):
+    """Папка с записями игр"""
+    return os.path.join(data_dir, "replays")
+
+
+class Recorder:
+    """Ядро игры вместе с журналом ввода по шагам"""
+
+    def __init__(self, name, seed=None):
+        """
+        :param name: Игра (id в реестре gcenter.registry)
+        :param seed: Зерно (None - случайное)
+        """
+        self.name = name
+        self.seed = random.SystemRandom().getrandbits(32) if seed is None else seed
+        self.game = create_core(name, self.seed)
+        self.ticks = 0      # Сколько шагов выполнено
+        self.inputs = []    # [шаг, действие, аргументы...]
+        self.replay_id = None
+
+    def step(self):
+        """Один шаг игры"""
+        self.game.step()
+        self.ticks += 1
+
+    def record(self, action, *args):
+        """
+        Выполняет действие игрока и записывает его
+        :param action: Метод ядра ("press", "fire", "buy", ...)
+        :return: То, что вернул метод ядра
+        """
+        self.inputs.append([self.ticks, action, *args])
+        return getattr(self.game, action)(*args)
+
+    def to_dict(self, result):
+        """Запись игры в виде словаря для JSON"""
+        return {
+            "version": VERSION,
+            "game": self.name,
+            "seed": self.seed,
+            "ticks": self.ticks,
+            "result": result,
+            "inputs": self.inputs
+        }
+
+    def save(self, result, data_dir=DATA_DIR):
+        """
+        Сохраняет запись (один раз; повторные вызовы возвращают тот же id)
+        :param result: Итог игры (счет или уровень) для последующей проверки
+        :return: id записи или None при ошибке
+        """
+        if self.replay_id is not None:
+            return self.replay_id
+        replay_id = f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}-{self.seed:08x}"
+        folder = replays_dir(data_dir)
+        path = os.path.join(folder, replay_id + ".json")
+        try:
+            os.makedirs(folder, exist_ok=True)
+            atomic_write(path, json.dumps(self.to_dict(result), separators=(",", ":")).encode("utf-8"))
+        except OSError as e:
+            print(f"Ошибка сохранения записи игры: {e}")
+            return None
+        self.replay_id = replay_id
+        return replay_id
+
+
+def load(replay, data_dir=DATA_DIR):
+    """
+    Читает запись игры
+    :param replay: Путь к файлу или id записи в data/replays
+    """
+    path = replay if replay.endswith(".json") else os.path.join(replays_dir(data_dir), replay + ".json")
+    try:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+    except OSError as e:
+        raise ReplayError(f"Запись {replay} не найдена: {e}")
+    except json.JSONDecodeError as e:
+        raise ReplayError(f"Запись {replay} повреждена: {e}")
+    if data.get("version") != VERSION:
+        raise ReplayError(f"Неподдерживаемая версия записи {replay}: {data.get('version')}")
+    return data
+
+
+def replay(data):
+    """
+    Повторяет записанную игру без окна
+    :param data: Запись (load)
+    :return: Кортеж (итог игры, ядро после последнего шага)
+    """
+    game = create_core(data["game"], data["seed"])
+    inputs = data["inputs"]
+    position = 0
+    for tick in range(data["ticks"] + 1):
+        # Действия, записанные после tick шагов, выполняются перед следующим шагом
+        while position < len(inputs) and inputs[position][0] <= tick:
+            action, *args = inputs[position][1:]
+            if action not in ACTIONS:
+                raise ReplayError(f"Недопустимое действие в записи: {action}")
+            getattr(game, action)(*args)
+            position += 1
+        if tick < data["ticks"]:
+            game.step()
+    return getattr(game, GAMES[data["game"]].result), game
@@ -0,0 +1,62 @@
+"""
+Отложенные вызовы окна игры (анимации попаданий, мигание, закрытие окна по таймеру).
+
+Scheduler помнит только еще не сработавшие вызовы after: сработавший вызов сам
+удаляется из списка, поэтому память и время cancel_all не растут с длиной игры.
+При закрытии окна (cancel_all или уничтожение виджета) все ожидающие вызовы
+отменяются и уже не обращаются к удаленному холсту.
+"""
+import tkinter as tk
+
+
+class Scheduler:
+    """Учет ожидающих вызовов after одного окна игры"""
+
+    def __init__(self, widget):
+        """
+        :param widget: Виджет Tk, через after которого планируются вызовы
+        """
+        self.widget = widget
+        self.jobs = {}       # id вызова after -> функция (только ожидающие)
+        self.closed = False
+        widget.bind("<Destroy>", self.on_destroy, add="+")
+
+    def after(self, delay, callback, *args):
+        """
+        Планирует вызов callback(*args) через delay мс
+        :return: id вызова (для cancel) или None, если окно уже закрыто
+        """
+        if self.closed:
+            return None
+
+        def run():
+            self.jobs.pop(job, None)
+            callback(*args)
+
+        job = self.widget.after(delay, run)
+        self.jobs[job] = callback
+        return job
+
+    def cancel(self, job):
+        """Отменяет один ожидающий вызов (сработавший или неизвестный - пропускается)"""
+        if self.jobs.pop(job, None) is not None:
+            self.widget.after_cancel(job)
+
+    def cancel_all(self):
+        """Отменяет все ожидающие вызовы; новые больше не планируются"""
+        self.closed = True
+        jobs, self.jobs = self.jobs, {}
+        for job in jobs:
+            try:
+                self.widget.after_cancel(job)
+            except tk.TclError:
+                pass  # Интерпретатор Tk уже завершен
+
+    def on_destroy(self, event):
+        """Окно уничтожено: вызовы для него больше не нужны"""
+        if event.widget is self.widget:
+            self.cancel_all()
+
+    def __len__(self):
+        """Сколько вызовов ожидает (для отладочного оверлея)"""
+        return len(self.jobs)
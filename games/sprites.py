@@ -0,0 +1,149 @@
+"""
+Переиспользование объектов холста вместо create_*/delete.
+
+SpritePool держит скрытые объекты каждого типа (oval, rectangle, text, line) в
+отдельных списках свободных и при запросе перенастраивает уже существующий объект.
+SpriteLayer - набор объектов, который перерисовывается целиком каждый кадр
+(например, змейка): объекты остаются на месте и меняют только координаты и цвет.
+
+Параметры, не переданные в acquire/draw, сохраняются от прошлого использования
+объекта, поэтому передавайте все, что важно для вида.
+"""
+
+DEFAULT_CAP = 256  # Сколько свободных объектов одного типа хранится (остальные удаляются)
+
+
+class SpritePool:
+    """Пул объектов холста со списками свободных по типам"""
+
+    def __init__(self, canvas, cap=DEFAULT_CAP):
+        """
+        :param canvas: Холст Tk
+        :param cap: Максимум свободных (скрытых) объектов каждого типа
+        """
+        self.canvas = canvas
+        self.cap = cap
+        self.free = {}      # Тип -> список свободных объектов
+        self.kinds = {}     # Объект -> тип (все объекты пула)
+        self.options = {}   # Объект -> последние примененные параметры
+        self.coords = {}    # Объект -> последние координаты
+        self.created = 0    # Сколько объектов создано
+        self.reused = 0     # Сколько раз выдан свободный объект
+
+    def acquire(self, kind, coords, **options):
+        """
+        Выдает объект поверх остальных (как create_<kind>)
+        :param kind: Тип объекта: "oval", "rectangle", "text", "line"
+        :param coords: Координаты, как для create_<kind>
+        :return: id объекта на холсте
+        """
+        options["state"] = "normal"
+        free = self.free.get(kind)
+        if free:
+            item = free.pop()
+            self.move(item, coords)
+            self.configure(item, options)
+            self.canvas.tag_raise(item)
+            self.reused += 1
+            return item
+
+        item = getattr(self.canvas, "create_" + kind)(*coords, **options)
+        self.kinds[item] = kind
+        self.options[item] = options
+        self.coords[item] = tuple(coords)
+        self.created += 1
+        return item
+
+    def move(self, item, coords):
+        """Задает координаты объекта (без обращения к Tk, если они не изменились)"""
+        coords = tuple(coords)
+        if self.coords.get(item) != coords:
+            self.canvas.coords(item, *coords)
+            self.coords[item] = coords
+
+    def configure(self, item, options):
+        """Меняет параметры объекта (в Tk передаются только изменившиеся)"""
+        last = self.options[item]
+        changed = {key: value for key, value in options.items() if last.get(key) != value}
+        if changed:
+            self.canvas.itemconfig(item, **changed)
+            last.update(changed)
+
+    def release(self, item):
+        """Возвращает объект в пул (скрывает; сверх cap - удаляет)"""
+        kind = self.kinds.get(item)
+        if kind is None:
+            return
+        free = self.free.setdefault(kind, [])
+        if len(free) < self.cap:
+            self.configure(item, {"state": "hidden"})
+            free.append(item)
+        else:
+            self.canvas.delete(item)
+            del self.kinds[item]
+            del self.options[item]
+            self.coords.pop(item, None)
+
+    def reset(self):
+        """Забывает все объекты (после canvas.delete("all"))"""
+        self.free = {}
+        self.kinds = {}
+        self.options = {}
+        self.coords = {}
+
+    def __len__(self):
+        """Сколько объектов холста принадлежит пулу (видимых и свободных)"""
+        return len(self.kinds)
+
+
+class SpriteLayer:
+    """Объекты, заново заполняемые каждый кадр: begin(), draw(...) для каждого, end()"""
+
+    def __init__(self, pool, tag):
+        """
+        :param pool: SpritePool
+        :param tag: Тег всех объектов слоя (для tag_raise и смены state всего слоя)
+        """
+        self.pool = pool
+        self.tag = tag
+        self.items = []  # [(тип, объект)] в порядке рисования
+        self.used = 0
+
+    def begin(self):
+        """Начинает кадр"""
+        self.used = 0
+
+    def draw(self, kind, coords, **options):
+        """Рисует очередной объект слоя, по возможности на месте объекта прошлого кадра"""
+        options["tags"] = self.tag
+        options["state"] = "normal"
+        pool = self.pool
+        if self.used < len(self.items) and self.items[self.used][0] == kind:
+            item = self.items[self.used][1]
+            pool.move(item, coords)
+            pool.configure(item, options)
+        else:
+            item = pool.acquire(kind, coords, **options)
+            if self.used < len(self.items):
+                pool.release(self.items[self.used][1])
+                self.items[self.used] = (kind, item)
+            else:
+                self.items.append((kind, item))
+        self.used += 1
+        return item
+
+    def end(self):
+        """Заканчивает кадр: лишние объекты прошлого кадра возвращаются в пул"""
+        for kind, item in self.items[self.used:]:
+            self.pool.release(item)
+        del self.items[self.used:]
+
+    def clear(self):
+        """Убирает все объекты слоя"""
+        self.begin()
+        self.end()
+
+    def set_state(self, state):
+        """Показывает ("normal") или прячет ("hidden") весь слой"""
+        for kind, item in self.items:
+            self.pool.configure(item, {"state": state})
@@ -0,0 +1,8 @@
+"""Слой данных Game Center: аккаунты, рейтинги и история игр (без tkinter)"""
+
+from gcenter.registry import GAMES
+
+GAME_NAMES = list(GAMES)  # Список игр (из реестра gcenter.registry)
+TOTAL_RATING = 5        # Максимальный общий рейтинг (делится поровну между играми)
+RATING_PER_GAME = TOTAL_RATING / len(GAMES)  # Максимальный рейтинг за одну игру
+DATA_DIR = "data"       # Папка для хранения данных
@@ -0,0 +1,412 @@
+"""
+Консольный запуск Game Center без интерфейса (tkinter не импортируется):
+
+    python -m gcenter leaderboard --limit 20
+    python -m gcenter history --from 01.05.2025 --player alice --format csv
+    python -m gcenter stats alice
+    python -m gcenter compact --retention 50000
+    python -m gcenter migrate accounts
+    python -m gcenter check
+    python -m gcenter snapshot export backup.gcsnap
+    python -m gcenter snapshot import backup.gcsnap --data-dir new_data
+    python -m gcenter stress --processes 8
+    python -m gcenter replay --player alice --game snake
+    python -m gcenter bench --game snake --compare data/bench/before.json
+    python -m gcenter profiles --game snake --limit 30
+
+Результаты выводятся построчно по мере чтения, поэтому команды подходят
+для cron и для больших папок с данными.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+from gcenter import DATA_DIR, GAME_NAMES, RATING_PER_GAME
+from gcenter.registry import game_title
+from gcenter.sessions import format_date, parse_date
+
+FORMATS = ("text", "csv", "jsonl")
+HISTORY_PAGE = 1000  # Сколько записей истории читается за раз
+
+
+class RowWriter:
+    """Построчный вывод таблицы в выбранном формате"""
+
+    def __init__(self, output_format, columns, stream=None):
+        """
+        :param output_format: "text", "csv" или "jsonl"
+        :param columns: Названия столбцов
+        """
+        self.format = output_format
+        self.columns = columns
+        self.stream = stream or sys.stdout
+        self.csv = csv.writer(self.stream) if output_format == "csv" else None
+        if self.csv is not None:
+            self.csv.writerow(columns)
+        elif output_format == "text":
+            self.stream.write("\t".join(columns) + "\n")
+
+    def write(self, values):
+        """Выводит одну строку"""
+        if self.csv is not None:
+            self.csv.writerow(values)
+        elif self.format == "jsonl":
+            self.stream.write(json.dumps(dict(zip(self.columns, values)), ensure_ascii=False) + "\n")
+        else:
+            self.stream.write("\t".join(str(value) for value in values) + "\n")
+
+
+def open_data(args):
+    """Открывает хранилище по аргументам командной строки"""
+    from gcenter.storage import open_storage
+
+    return open_storage(args.data_dir, GAME_NAMES, RATING_PER_GAME, args.storage)
+
+
+def cmd_leaderboard(args):
+    """Таблица лидеров"""
+    storage = open_data(args)
+    try:
+        writer = RowWriter(args.format, ["place", "player", "rating"] + GAME_NAMES)
+        for place, (player, data) in enumerate(storage.top(args.limit), 1):
+            writer.write(
+                [place, player, f"{data['total_rating']:.2f}"] +
+                [data["scores"].get(game, 0) for game in GAME_NAMES]
+            )
+    finally:
+        storage.close()
+    return 0
+
+
+def cmd_history(args):
+    """История игр (от новых к старым) с фильтром по периоду, игроку и игре"""
+    try:
+        start = parse_date(args.start or "")
+        end = parse_date(args.end or "", end=True)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    storage = open_data(args)
+    try:
+        game = game_title(args.game) if args.game else None
+        selection = storage.select_sessions(start, end, args.player, game)
+        total = len(selection) if args.limit is None else min(args.limit, len(selection))
+        writer = RowWriter(args.format, ["ts", "date", "player", "game", "score"])
+        for offset in range(0, total, HISTORY_PAGE):
+            for log in selection.page(offset, min(HISTORY_PAGE, total - offset)):
+                writer.write([
+                    log.get("ts"), format_date(log),
+                    log.get("player", "unknown"), log.get("game", "Unknown"), log.get("score", "?")
+                ])
+    finally:
+        storage.close()
+    return 0
+
+
+def cmd_stats(args):
+    """Статистика игрока по играм"""
+    storage = open_data(args)
+    try:
+        stats = storage.player_stats(args.player)
+    finally:
+        storage.close()
+    if stats is None:
+        print(f"Аккаунт {args.player} не найден", file=sys.stderr)
+        return 1
+
+    writer = RowWriter(args.format, ["game", "count", "max", "mean", "stddev", "min", "today_best", "recent"])
+    for game in GAME_NAMES:
+        summary = stats[game]
+        writer.write([
+            game, summary["count"], summary["max"], f"{summary['mean']:.2f}", f"{summary['stddev']:.2f}",
+            summary["min"], summary["today_best"], " ".join(str(score) for score in summary["recent"])
+        ])
+    return 0
+
+
+def cmd_compact(args):
+    """Уплотнение истории игр"""
+    storage = open_data(args)
+    try:
+        remaining = storage.compact_logs(args.retention)
+    finally:
+        storage.close()
+    print(f"Записей в истории: {remaining}")
+    return 0
+
+
+def cmd_migrate(args):
+    """Перенос данных: аккаунтов в подпапки или JSON-данных в SQLite"""
+    if args.target == "accounts":
+        from gcenter.accounts import AccountRepository
+
+        moved = AccountRepository(os.path.join(args.data_dir, "accounts")).migrate()
+        print(f"Перенесено аккаунтов: {moved}")
+        return 0
+
+    from gcenter.sqlite_storage import SqliteStorage, migrate_json_to_sqlite
+
+    db_path = os.path.join(args.data_dir, SqliteStorage.DB_NAME)
+    if os.path.exists(db_path) and not args.force:
+        print(f"База {db_path} уже существует (--force для повторного переноса)", file=sys.stderr)
+        return 1
+    accounts_count, sessions_count = migrate_json_to_sqlite(args.data_dir, db_path, GAME_NAMES)
+    print(f"Перенесено аккаунтов: {accounts_count}, записей истории: {sessions_count}")
+    return 0
+
+
+def cmd_snapshot(args):
+    """Снимок всех данных в одном файле: сохранение и восстановление"""
+    from gcenter.snapshot import SnapshotError, export_snapshot, import_snapshot
+
+    try:
+        if args.action == "export":
+            counts = export_snapshot(args.data_dir, args.file, GAME_NAMES, args.storage)
+        else:
+            counts = import_snapshot(args.file, args.data_dir, GAME_NAMES, RATING_PER_GAME, args.storage)
+    except (SnapshotError, OSError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"Аккаунтов: {counts[0]}, записей истории: {counts[1]}")
+    return 0
+
+
+def cmd_check(args):
+    """Проверка целостности данных (только чтение)"""
+    from gcenter.integrity import check_data
+
+    problems = 0
+    for problem in check_data(args.data_dir, GAME_NAMES, RATING_PER_GAME):
+        print(problem)
+        problems += 1
+    print(f"Найдено проблем: {problems}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+def cmd_stress(args):
+    """Нагрузочная проверка: несколько процессов одновременно пишут в одну папку данных"""
+    from gcenter.stress import run
+
+    # Без явного --data-dir проверка идет во временной папке, чтобы не трогать настоящие данные
+    data_dir = args.data_dir if args.data_dir_given else tempfile.mkdtemp(prefix="gcenter-stress-")
+    print(f"Папка данных: {data_dir}", file=sys.stderr)
+    problems, elapsed = run(data_dir, args.storage, args.processes, args.results)
+    for problem in problems:
+        print(problem)
+    total = args.processes * args.results
+    print(f"Записано результатов: {total} за {elapsed:.2f} с ({total / elapsed:.0f} в секунду), "
+          f"найдено проблем: {len(problems)}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+def cmd_replay(args):
+    """Повтор записанных игр без интерфейса и сверка итога с записанным"""
+    from games.replay import ReplayError, load, replay
+
+    if args.replays:
+        # Итог сверяется с тем, что сохранено в самой записи
+        targets = [(name, None) for name in args.replays]
+    else:
+        # Все записи из истории: итог сверяется со счетом в истории
+        storage = open_data(args)
+        try:
+            game = game_title(args.game) if args.game else None
+            selection = storage.select_sessions(None, None, args.player, game)
+            targets = []
+            for offset in range(0, len(selection), HISTORY_PAGE):
+                targets.extend(
+                    (log["replay"], log.get("score"))
+                    for log in selection.page(offset, HISTORY_PAGE) if log.get("replay")
+                )
+                if args.limit is not None and len(targets) >= args.limit:
+                    break
+        finally:
+            storage.close()
+        if args.limit is not None:
+            targets = targets[:args.limit]
+
+    writer = RowWriter(args.format, ["replay", "game", "expected", "result", "ticks", "ms", "status"])
+    problems = 0
+    for name, expected in targets:
+        try:
+            data = load(name, args.data_dir)
+            started = time.perf_counter()
+            result, _ = replay(data)
+            elapsed = (time.perf_counter() - started) * 1000
+        except (ReplayError, KeyError, TypeError, ValueError) as e:
+            writer.write([name, "", "" if expected is None else expected, "", "", "", f"error: {e}"])
+            problems += 1
+            continue
+        if expected is None:
+            expected = data.get("result")
+        status = "ok" if result == expected else "mismatch"
+        problems += status != "ok"
+        writer.write([name, data["game"], expected, result, data["ticks"], f"{elapsed:.1f}", status])
+    print(f"Проверено записей: {len(targets)}, расхождений и ошибок: {problems}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+def cmd_bench(args):
+    """Замеры скорости шага игр без интерфейса с сохранением в JSON"""
+    from games import bench
+
+    baseline = {}
+    if args.compare:
+        try:
+            baseline = bench.load_baseline(args.compare)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Не удалось прочитать {args.compare}: {e}", file=sys.stderr)
+            return 1
+
+    columns = ["game", "scale", "ticks_per_s", "p50_us", "p95_us", "p99_us", "max_us",
+               "gc", "alloc_peak_kb", "alloc_net_kb"]
+    writer = RowWriter(args.format, columns + (["change"] if baseline else []))
+    results = []
+    for result in bench.run(args.game and [args.game], args.seed, args.ticks):
+        results.append(result)
+        row = [
+            result["game"], f"{result['scale_name']}={result['scale']}", f"{result['ticks_per_s']:.0f}",
+            f"{result['p50_us']:.1f}", f"{result['p95_us']:.1f}", f"{result['p99_us']:.1f}",
+            f"{result['max_us']:.1f}", result["gc_collections"],
+            f"{result['alloc_peak_kb']:.1f}", f"{result['alloc_net_kb']:.1f}"
+        ]
+        if baseline:
+            old = baseline.get((result["game"], result["scale"]))
+            # Изменение скорости: + быстрее, - медленнее
+            row.append(f"{result['ticks_per_s'] / old['ticks_per_s'] - 1:+.1%}" if old else "")
+        writer.write(row)
+
+    path = args.output or os.path.join(args.data_dir, "bench", f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    try:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        bench.save(bench.report(results, args.seed, args.ticks), path)
+    except OSError as e:
+        print(f"Ошибка сохранения результатов: {e}", file=sys.stderr)
+        return 1
+    print(f"Результаты сохранены: {path}", file=sys.stderr)
+    return 0
+
+
+def cmd_profiles(args):
+    """Самые горячие функции по сохраненным профилям игровых сессий"""
+    from gcenter.profiling import hottest, load_profiles
+
+    profiles = list(load_profiles(args.data_dir, args.game, args.player, args.mode))
+    writer = RowWriter(args.format, ["function", "self_s", "total_s", "sessions"])
+    for function, own, total, sessions in hottest(profiles, args.limit, args.sort):
+        writer.write([function, f"{own:.3f}", f"{total:.3f}", sessions])
+    print(f"Профилей: {len(profiles)}", file=sys.stderr)
+    return 0
+
+
+def build_parser():
+    """Разбор аргументов командной строки"""
+    # Общие параметры принимаются и до, и после названия команды
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--data-dir", default=argparse.SUPPRESS, help="Папка с данными (по умолчанию data)")
+    common.add_argument("--storage", choices=("json", "sqlite"), default=argparse.SUPPRESS,
+                        help="Тип хранилища (иначе GCENTER_STORAGE)")
+
+    parser = argparse.ArgumentParser(
+        prog="python -m gcenter", description="Game Center без интерфейса", parents=[common]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    leaderboard = commands.add_parser("leaderboard", parents=[common], help="Таблица лидеров")
+    leaderboard.add_argument("--limit", type=int, default=100, help="Сколько игроков вывести")
+    leaderboard.add_argument("--format", choices=FORMATS, default="text")
+    leaderboard.set_defaults(handler=cmd_leaderboard)
+
+    history = commands.add_parser("history", parents=[common], help="История игр")
+    history.add_argument("--from", dest="start", help="Начало периода: Д.М.Г [Ч:М[:С]]")
+    history.add_argument("--to", dest="end", help="Конец периода: Д.М.Г [Ч:М[:С]]")
+    history.add_argument("--player", help="Только этот игрок")
+    history.add_argument("--game", choices=GAME_NAMES, help="Только эта игра")
+    history.add_argument("--limit", type=int, help="Сколько записей вывести (по умолчанию все)")
+    history.add_argument("--format", choices=FORMATS, default="text")
+    history.set_defaults(handler=cmd_history)
+
+    stats = commands.add_parser("stats", parents=[common], help="Статистика игрока")
+    stats.add_argument("player", help="Имя игрока")
+    stats.add_argument("--format", choices=FORMATS, default="text")
+    stats.set_defaults(handler=cmd_stats)
+
+    compact = commands.add_parser("compact", parents=[common], help="Удалить старые записи истории")
+    compact.add_argument("--retention", type=int, help="Сколько последних записей оставить")
+    compact.set_defaults(handler=cmd_compact)
+
+    migrate = commands.add_parser("migrate", parents=[common], help="Перенос данных")
+    migrate.add_argument("target", choices=("accounts", "sqlite"),
+                         help="accounts - аккаунты в подпапки, sqlite - JSON-данные в базу SQLite")
+    migrate.add_argument("--force", action="store_true", help="Перезаписать существующую базу")
+    migrate.set_defaults(handler=cmd_migrate)
+
+    snapshot = commands.add_parser("snapshot", parents=[common], help="Снимок всех данных в одном файле")
+    snapshot.add_argument("action", choices=("export", "import"),
+                          help="export - сохранить данные в файл, import - восстановить в пустую папку")
+    snapshot.add_argument("file", help="Файл снимка")
+    snapshot.set_defaults(handler=cmd_snapshot)
+
+    check = commands.add_parser("check", parents=[common], help="Проверка целостности данных")
+    check.set_defaults(handler=cmd_check)
+
+    stress = commands.add_parser("stress", parents=[common],
+                                 help="Нагрузочная проверка одновременной записи из нескольких процессов")
+    stress.add_argument("--processes", type=int, default=8, help="Сколько процессов запустить")
+    stress.add_argument("--results", type=int, default=200, help="Сколько результатов записывает каждый процесс")
+    stress.set_defaults(handler=cmd_stress)
+
+    replay = commands.add_parser("replay", parents=[common],
+                                 help="Повторить записанные игры без интерфейса и сверить результаты")
+    replay.add_argument("replays", nargs="*",
+                        help="id записей или файлы .json (по умолчанию - все записи из истории)")
+    replay.add_argument("--player", help="Только игры этого игрока (для записей из истории)")
+    replay.add_argument("--game", choices=GAME_NAMES, help="Только эта игра (для записей из истории)")
+    replay.add_argument("--limit", type=int, help="Сколько последних записей проверить")
+    replay.add_argument("--format", choices=FORMATS, default="text")
+    replay.set_defaults(handler=cmd_replay)
+
+    bench = commands.add_parser("bench", parents=[common], help="Замеры скорости шага игр без интерфейса")
+    bench.add_argument("--game", choices=GAME_NAMES, help="Только эта игра")
+    bench.add_argument("--ticks", type=int, default=2000, help="Сколько шагов замерять на каждом масштабе")
+    bench.add_argument("--seed", type=int, default=1, help="Зерно игр (одинаковое - одинаковые сценарии)")
+    bench.add_argument("--output", help="Файл JSON с результатами (по умолчанию data/bench/bench-<время>.json)")
+    bench.add_argument("--compare", help="Файл JSON прошлого запуска для сравнения скорости")
+    bench.add_argument("--format", choices=FORMATS, default="text")
+    bench.set_defaults(handler=cmd_bench)
+
+    profiles = commands.add_parser("profiles", parents=[common],
+                                   help="Самые горячие функции по профилям игровых сессий")
+    profiles.add_argument("--game", choices=GAME_NAMES, help="Только эта игра")
+    profiles.add_argument("--player", help="Только этот игрок")
+    profiles.add_argument("--mode", choices=("cprofile", "sample"), help="Только профили этого режима")
+    profiles.add_argument("--sort", choices=("self", "total"), default="self",
+                          help="self - по собственному времени, total - вместе с вызванными функциями")
+    profiles.add_argument("--limit", type=int, default=20, help="Сколько функций вывести")
+    profiles.add_argument("--format", choices=FORMATS, default="text")
+    profiles.set_defaults(handler=cmd_profiles)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Значения по умолчанию для общих параметров (не заданы ни до, ни после команды)
+    args.data_dir_given = hasattr(args, "data_dir")
+    args.data_dir = getattr(args, "data_dir", DATA_DIR)
+    args.storage = getattr(args, "storage", None)
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # Вывод оборван (например, | head) - это не ошибка
+        sys.stderr.close()
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,498 @@
+import bisect
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from gcenter.locking import FileLock
+from gcenter.writer import atomic_write, open_temp, replace_file
+
+
+def stat_key(path):
+    """
+    Признак версии файла для проверки кэша: время изменения, размер и inode
+    (атомарная замена файла меняет inode даже при совпадении времени)
+    :return: Кортеж или None, если файла нет
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def shard_dirs(username):
+    """Подпапки аккаунта: два уровня по два символа хэша имени (до 65536 папок)"""
+    digest = hashlib.sha1(username.encode('utf-8')).hexdigest()
+    return digest[:2], digest[2:4]
+
+
+def read_account_files(accounts_dir):
+    """
+    Перебирает все аккаунты прямо по файлам, ничего не записывая (без индекса имен
+    и без переноса): сначала подпапки, затем еще не перенесенные файлы старого формата.
+    Если аккаунт есть в обоих местах, берется копия из подпапки.
+    """
+    if not os.path.isdir(accounts_dir):
+        return
+    seen = set()
+    for root, _, files in os.walk(accounts_dir):
+        if root == accounts_dir:
+            continue
+        for filename in sorted(files):
+            if filename.endswith('.json'):
+                account = AccountRepository.read_file(os.path.join(root, filename))
+                if account is not None:
+                    seen.add(filename)
+                    yield account
+    for filename in sorted(os.listdir(accounts_dir)):
+        path = os.path.join(accounts_dir, filename)
+        if filename.endswith('.json') and filename not in seen and os.path.isfile(path):
+            account = AccountRepository.read_file(path)
+            if account is not None:
+                yield account
+
+
+class AccountIndex:
+    """
+    Индекс имен пользователей: файл usernames.jsonl (одно имя в JSON на строку).
+    Имена дописываются в конец файла под межпроцессной блокировкой; в памяти они
+    лежат в множестве (проверка за O(1)) и в отсортированном списке (перебор по
+    алфавиту без обхода папок). Имена, добавленные другими процессами,
+    подхватываются дочитыванием хвоста файла (refresh).
+    """
+
+    FILE_NAME = "usernames.jsonl"
+
+    def __init__(self, path):
+        """:param path: Путь к файлу индекса"""
+        self.path = path
+        self.file_lock = FileLock(path)
+        self.lock = threading.Lock()  # Имена добавляет и фоновый перенос аккаунтов
+        self.names = set()
+        self.ordered = []
+        self.size = 0  # Сколько байт файла уже прочитано
+
+    def load(self):
+        """
+        Читает индекс из файла
+        :return: False если файла нет
+        """
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        names = set(self._parse(data))
+        with self.lock:
+            self.names = names
+            self.ordered = sorted(names)
+            self.size = len(data)
+        return True
+
+    @staticmethod
+    def _parse(data):
+        """Имена из прочитанного куска файла"""
+        for line in data.splitlines():
+            try:
+                yield json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue  # Оборванная строка
+
+    def refresh(self):
+        """Дочитывает имена, добавленные другими процессами"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        with self.lock:
+            if size <= self.size:
+                return
+            with open(self.path, 'rb') as f:
+                f.seek(self.size)
+                data = f.read(size - self.size)
+            data = data[:data.rfind(b"\n") + 1]  # Только целые строки
+            self.size += len(data)
+            for name in self._parse(data):
+                if name not in self.names:
+                    self.names.add(name)
+                    bisect.insort(self.ordered, name)
+
+    def rebuild(self, names):
+        """Записывает индекс заново по списку имен"""
+        names = set(names)
+        data = "".join(json.dumps(name, ensure_ascii=False) + "\n" for name in sorted(names))
+        data = data.encode('utf-8')
+        with self.file_lock:
+            atomic_write(self.path, data)
+        with self.lock:
+            self.names = names
+            self.ordered = sorted(names)
+            self.size = len(data)
+
+    def __contains__(self, username):
+        return username in self.names
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, username):
+        """Добавляет имя (дописывает одну строку в файл)"""
+        if username in self.names:
+            return
+        with self.file_lock:
+            self.refresh()
+            with self.lock:
+                if username in self.names:
+                    return
+                line = (json.dumps(username, ensure_ascii=False) + "\n").encode('utf-8')
+                with open(self.path, 'ab') as f:
+                    f.write(line)
+                self.names.add(username)
+                bisect.insort(self.ordered, username)
+                self.size += len(line)
+
+    def __iter__(self):
+        """Имена по алфавиту"""
+        self.refresh()
+        with self.lock:
+            ordered = list(self.ordered)
+        return iter(ordered)
+
+
+class AccountRepository:
+    """
+    Аккаунты в памяти поверх файлов data/accounts/<хэш>/<хэш>/<игрок>.json.
+    Файлы разложены по подпапкам по хэшу имени, чтобы ни одна папка не росла
+    до миллионов записей; список имен хранится в индексе usernames.jsonl.
+    Разобранные аккаунты хранятся в LRU-кэше ограниченного размера и
+    проверяются по os.stat: если файл изменил другой процесс, он читается заново.
+    Изменения записываются через фоновый поток как операции слияния: под
+    межпроцессной блокировкой подпапки операция применяется к текущему файлу,
+    поэтому одновременные изменения из разных процессов не теряются; до записи
+    аккаунт отдается из памяти. Аккаунты старого плоского формата (data/accounts/<игрок>.json) переносятся
+    по частям во время работы и до переноса читаются со старого места.
+    """
+
+    CAPACITY = 1024         # Сколько аккаунтов держать в кэше
+    MIGRATION_BATCH = 500   # Сколько аккаунтов переносить за один шаг
+
+    def __init__(self, accounts_dir, writer=None, capacity=None, read_only=False):
+        """
+        :param accounts_dir: Папка с аккаунтами
+        :param writer: Фоновый поток записи (None - писать сразу)
+        :param capacity: Размер кэша (по умолчанию CAPACITY)
+        :param read_only: Только чтение (для проверок): индекс не создается и не перестраивается
+        """
+        self.accounts_dir = accounts_dir
+        self.writer = writer
+        self.capacity = capacity or self.CAPACITY
+        self.cache = OrderedDict()  # {игрок: (версия файла, аккаунт)}, старые в начале
+        self.pending = {}           # Аккаунты, отправленные на запись: {игрок: (номер, аккаунт)}
+        self.pending_lock = threading.Lock()
+        self.sequence = 0           # Номер последней отправленной на запись операции
+        self.hits = 0               # Счетчики для оценки работы кэша
+        self.misses = 0
+        self.shards = set()         # Уже созданные подпапки
+
+        self.index = AccountIndex(os.path.join(accounts_dir, AccountIndex.FILE_NAME))
+        if read_only:
+            self.index.load()
+        else:
+            os.makedirs(accounts_dir, exist_ok=True)
+            if not self.index.load():
+                self.index.rebuild(self._scan_shards())
+        self.legacy = self._has_legacy()  # Остались ли аккаунты в плоском формате
+
+    def path(self, username):
+        """Путь к файлу аккаунта"""
+        return os.path.join(self.accounts_dir, *shard_dirs(username), f"{username}.json")
+
+    def legacy_path(self, username):
+        """Путь к файлу аккаунта в старом плоском формате"""
+        return os.path.join(self.accounts_dir, f"{username}.json")
+
+    def _scan_shards(self):
+        """Имена всех аккаунтов в подпапках (обход только при потере индекса)"""
+        names = []
+        for root, _, files in os.walk(self.accounts_dir):
+            if root == self.accounts_dir:
+                continue
+            names.extend(filename[:-5] for filename in files if filename.endswith('.json'))
+        return names
+
+    def _legacy_files(self):
+        """Перебирает файлы аккаунтов старого формата в корне папки"""
+        if not os.path.isdir(self.accounts_dir):
+            return
+        with os.scandir(self.accounts_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.is_file():
+                    yield entry
+
+    def _has_legacy(self):
+        for _ in self._legacy_files():
+            return True
+        return False
+
+    def legacy_count(self):
+        """Сколько аккаунтов старого формата еще не перенесено"""
+        return sum(1 for _ in self._legacy_files())
+
+    def exists(self, username):
+        """Проверяет наличие аккаунта (по индексу; неизвестное имя - одним stat, его мог создать другой процесс)"""
+        if username in self.pending or username in self.index:
+            return True
+        return self.locate(username)[0] is not None
+
+    def names(self):
+        """Имена всех аккаунтов по алфавиту (включая еще не перенесенные)"""
+        if not self.legacy:
+            return iter(self.index)
+        legacy = {entry.name[:-5] for entry in self._legacy_files()}
+        return iter(sorted(legacy.union(self.index)))
+
+    def __len__(self):
+        if not self.legacy:
+            return len(self.index)
+        return sum(1 for _ in self.names())
+
+    def get(self, username):
+        """
+        Возвращает копию аккаунта (ее можно менять, кэш не пострадает)
+        :return: Аккаунт или None, если его нет или файл поврежден
+        """
+        account = self._get(username)
+        return copy.deepcopy(account) if account is not None else None
+
+    def locate(self, username):
+        """
+        Находит файл аккаунта (новое место, затем старое)
+        :return: Пара (путь, версия файла) или (None, None)
+        """
+        path = self.path(username)
+        key = stat_key(path)
+        if key is not None or not self.legacy:
+            return (path, key) if key is not None else (None, None)
+        legacy_path = self.legacy_path(username)
+        key = stat_key(legacy_path)
+        if key is not None:
+            return legacy_path, key
+        # Файл мог быть перенесен между двумя проверками
+        key = stat_key(path)
+        return (path, key) if key is not None else (None, None)
+
+    def _get(self, username):
+        """Возвращает аккаунт из памяти, при необходимости перечитывая файл"""
+        pending = self.pending.get(username)
+        if pending is not None:
+            self.hits += 1
+            return pending[1]
+
+        path, key = self.locate(username)
+        cached = self.cache.get(username)
+        if key is None:
+            self.cache.pop(username, None)
+            return None
+        if cached is not None and cached[0] == key:
+            self.cache.move_to_end(username)
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        account = self.read_file(path)
+        if account is None:
+            self.cache.pop(username, None)
+            return None
+        self._remember(username, key, account)
+        return account
+
+    @staticmethod
+    def read_file(path):
+        """Читает файл аккаунта (None - файла нет или он поврежден)"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _remember(self, username, key, account):
+        """Кладет аккаунт в кэш и вытесняет самые давно использованные"""
+        self.cache[username] = (key, account)
+        self.cache.move_to_end(username)
+        while len(self.cache) > self.capacity:
+            self.cache.popitem(last=False)
+
+    def _shard_dir(self, username):
+        """Создает подпапку аккаунта, если ее еще нет"""
+        shard = os.path.join(self.accounts_dir, *shard_dirs(username))
+        if shard not in self.shards:
+            os.makedirs(shard, exist_ok=True)
+            self.shards.add(shard)
+        return shard
+
+    def shard_lock(self, username):
+        """Межпроцессная блокировка подпапки аккаунта"""
+        return FileLock(os.path.join(self._shard_dir(username), ".accounts"))
+
+    @staticmethod
+    def _dump(account):
+        return json.dumps(account, ensure_ascii=False, indent=4).encode('utf-8')
+
+    def create(self, account):
+        """
+        Создает аккаунт (сразу, под блокировкой - имя не займут два процесса одновременно)
+        :return: False если такой аккаунт уже есть
+        """
+        username = account["username"]
+        with self.shard_lock(username):
+            if self.locate(username)[0] is not None:
+                return False
+            atomic_write(self.path(username), self._dump(account))
+        self.index.add(username)
+        self.cache.pop(username, None)
+        return True
+
+    def update(self, username, change):
+        """
+        Изменяет аккаунт операцией слияния
+        :param change: Функция, меняющая словарь аккаунта на месте; применяется к копии
+                       в памяти сразу, а к файлу - при записи, к его актуальному содержимому
+        :return: Аккаунт после изменения или None, если аккаунта нет
+        """
+        account = self.get(username)
+        if account is None:
+            return None
+        change(account)
+        self.cache.pop(username, None)
+        with self.pending_lock:
+            self.sequence += 1
+            sequence = self.sequence
+            self.pending[username] = (sequence, account)
+
+        task = lambda: self._merge_write(username, change, sequence)
+        if self.writer is None:
+            task()
+        else:
+            self.writer.call(task)
+        return account
+
+    def _merge_write(self, username, change, sequence):
+        """Применяет операцию к файлу аккаунта под блокировкой (в фоновом потоке)"""
+        path = self.path(username)
+        try:
+            with self.shard_lock(username):
+                current_path, _ = self.locate(username)
+                account = self.read_file(current_path) if current_path else None
+                if account is None:
+                    print(f"Ошибка записи аккаунта {username}: файл не найден")
+                    return
+                change(account)
+                atomic_write(path, self._dump(account))
+                if current_path != path:
+                    os.remove(current_path)  # Заодно перенесли аккаунт старого формата
+        finally:
+            with self.pending_lock:
+                # Более новая операция еще не записана - ее копия в памяти остается
+                if self.pending.get(username, (None,))[0] == sequence:
+                    del self.pending[username]
+
+    def flush(self):
+        """Сбрасывает копии в памяти (вызывается после записи очереди)"""
+        with self.pending_lock:
+            self.pending.clear()
+
+    def restore(self, accounts):
+        """
+        Потоково записывает аккаунты в пустую папку (восстановление из снимка):
+        без блокировок и fsync каждого файла, индекс имен пишется одним файлом
+        :param accounts: Перебор аккаунтов
+        :return: Количество записанных аккаунтов
+        """
+        count = 0
+        index, tmp_path = open_temp(self.index.path)
+        with index:
+            for account in accounts:
+                username = account["username"]
+                self._shard_dir(username)
+                with open(self.path(username), 'wb') as f:
+                    f.write(self._dump(account))
+                index.write((json.dumps(username, ensure_ascii=False) + "\n").encode('utf-8'))
+                count += 1
+        replace_file(tmp_path, self.index.path)
+        self.index.load()
+        self.cache.clear()
+        return count
+
+    def clear(self):
+        """Очищает кэш"""
+        self.cache.clear()
+
+    def scan(self):
+        """Потоково перебирает все аккаунты по алфавиту (в обход кэша)"""
+        for username in self.names():
+            pending = self.pending.get(username)
+            account = pending[1] if pending is not None else None
+            if account is None:
+                path, _ = self.locate(username)
+                account = self.read_file(path) if path else None
+            if account is not None:
+                yield account
+
+    def migrate_batch(self, limit=None):
+        """
+        Переносит часть аккаунтов из плоской папки в подпапки
+        :param limit: Сколько аккаунтов перенести (по умолчанию MIGRATION_BATCH)
+        :return: Количество перенесенных аккаунтов (0 - перенос завершен)
+        """
+        limit = limit or self.MIGRATION_BATCH
+        # Имена собираются до переноса: пока идет перебор папки, ее нельзя менять,
+        # иначе scandir может пропустить часть файлов
+        batch = []
+        for entry in self._legacy_files():
+            if len(batch) >= limit:
+                break
+            batch.append((entry.name, entry.path))
+
+        for file_name, path in batch:
+            username = file_name[:-5]
+            target = os.path.join(self._shard_dir(username), file_name)
+            with self.shard_lock(username):
+                try:
+                    if os.path.exists(target):
+                        os.remove(path)  # Новая копия уже записана - старая не нужна
+                    else:
+                        os.replace(path, target)
+                except FileNotFoundError:
+                    pass  # Аккаунт уже перенес другой процесс
+            self.index.add(username)
+
+        # Старая папка перестает проверяться, только когда в ней не осталось аккаунтов
+        if not self._has_legacy():
+            self.legacy = False
+        return len(batch)
+
+    def migrate(self):
+        """
+        Переносит все аккаунты плоского формата
+        :return: Количество перенесенных аккаунтов
+        """
+        total = 0
+        while self.legacy:
+            total += self.migrate_batch()
+        return total
+
+    def start_migration(self):
+        """Запускает перенос по частям в фоновом потоке записи (каждый шаг - отдельная задача)"""
+        if not self.legacy or self.writer is None:
+            return
+
+        def step():
+            try:
+                if self.migrate_batch():
+                    self.writer.call(step)
+            except OSError as e:
+                print(f"Ошибка переноса аккаунтов: {e}")
+
+        self.writer.call(step)
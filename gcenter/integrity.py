@@ -0,0 +1,247 @@
+import os
+import random
+import sqlite3
+
+from gcenter.accounts import AccountIndex, AccountRepository
+from gcenter.leaderboard import LeaderboardIndex
+from gcenter.ranked import IncrementalRanking
+from gcenter.rating import RatingEngine
+from gcenter.registry import rank_key
+from gcenter.sessions import INDEX_RECORD, SessionLog
+
+RATING_SAMPLE = 500  # Игроков в случайной таблице для сверки расчета рейтинга
+
+
+def check_accounts(accounts_dir):
+    """
+    Проверяет файлы аккаунтов и индекс имен
+    :return: Генератор описаний найденных проблем
+    """
+    if not os.path.isdir(accounts_dir):
+        return
+    index_path = os.path.join(accounts_dir, AccountIndex.FILE_NAME)
+    if not os.path.exists(index_path):
+        yield f"Нет индекса имен {index_path}"
+        return
+
+    repository = AccountRepository(accounts_dir, read_only=True)
+    for username in repository.index:
+        path, _ = repository.locate(username)
+        if path is None:
+            yield f"Аккаунт {username} есть в индексе, но файла нет"
+            continue
+        account = repository.read_file(path)
+        if account is None:
+            yield f"Поврежден файл аккаунта {path}"
+        elif account.get("username") != username:
+            yield f"Имя в файле {path} не совпадает: {account.get('username')!r}"
+        elif not isinstance(account.get("games"), dict):
+            # Игр, зарегистрированных после создания аккаунта, в нем может не быть - это не ошибка
+            yield f"В аккаунте {username} нет результатов игр"
+
+    legacy = repository.legacy_count()
+    if legacy:
+        yield f"Не перенесено аккаунтов старого формата: {legacy}"
+
+
+def check_leaderboard(data_dir, game_names, rating_per_game):
+    """Сверяет индекс таблицы лидеров с рекордами в аккаунтах"""
+    index_file = os.path.join(data_dir, "leaderboard.json")
+    if not os.path.exists(index_file):
+        return
+    leaderboard = LeaderboardIndex(index_file, game_names, rating_per_game)
+    if not leaderboard.load():
+        yield f"Индекс рейтинга {index_file} поврежден или устарел"
+        return
+
+    repository = AccountRepository(os.path.join(data_dir, "accounts"), read_only=True)
+    for account in repository.scan():
+        username = account["username"]
+        scores = leaderboard.players.get(username)
+        if scores is None:
+            yield f"Игрока {username} нет в индексе рейтинга"
+            continue
+        for game in game_names:
+            high_score = account["games"].get(game, {}).get("high_score", 0)
+            if scores.get(game, 0) != high_score:
+                yield f"Рекорд {username}/{game}: в индексе {scores.get(game, 0)}, в аккаунте {high_score}"
+
+
+def check_sessions(path):
+    """
+    Проверяет журнал сессий: формат строк и индекс времени (по записи на каждую
+    строку, с ее меткой времени, в порядке (ts, смещение))
+    """
+    if not os.path.exists(path):
+        return
+    lines = {}  # Смещение строки -> (номер строки, метка времени)
+    previous_ts = 0.0
+    offset = 0
+    with open(path, 'rb') as f:
+        for number, line in enumerate(f, 1):
+            entry = SessionLog._parse(line.decode('utf-8', errors='replace'))
+            if entry is None:
+                yield f"Строка {number} журнала повреждена"
+            elif "ts" not in entry:
+                yield f"Строка {number} журнала без метки времени"
+            else:
+                previous_ts = entry["ts"]
+            lines[offset] = (number, previous_ts)
+            offset += len(line)
+
+    index_path = os.path.splitext(path)[0] + ".idx"
+    try:
+        with open(index_path, 'rb') as index:
+            data = index.read()
+    except OSError:
+        yield f"Нет индекса времени {index_path}"
+        return
+    if len(data) % INDEX_RECORD.size:
+        yield f"Индекс времени {index_path} оборван"
+    data = data[:len(data) - len(data) % INDEX_RECORD.size]
+
+    previous = None
+    seen = set()
+    for position, (ts, offset, _, _) in enumerate(INDEX_RECORD.iter_unpack(data)):
+        if previous is not None and (ts, offset) < previous:
+            yield f"Запись {position} индекса времени нарушает порядок (ts, смещение)"
+        previous = (ts, offset)
+        line = lines.get(offset)
+        if line is None or offset in seen:
+            yield f"Запись {position} индекса времени указывает не на строку журнала"
+        elif line[1] != ts:
+            yield f"Метка времени строки {line[0]} в индексе не совпадает с журналом"
+        seen.add(offset)
+    missing = len(lines) - len(seen)
+    if missing > 0:
+        yield f"В индексе времени нет строк журнала: {missing}"
+
+
+def check_sqlite(db_path):
+    """Проверяет целостность базы SQLite"""
+    if not os.path.exists(db_path):
+        return
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            for (message,) in conn.execute("PRAGMA integrity_check"):
+                if message != "ok":
+                    yield f"{db_path}: {message}"
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        yield f"Ошибка проверки {db_path}: {e}"
+
+
+def reference_ratings(players, game_names, rating_per_game):
+    """
+    Рейтинги по исходной формуле: в каждой игре игроки сортируются по (лучший рекорд, имя),
+    рейтинг линейно убывает от max до 0, общий рейтинг - сумма по играм по порядку
+    :param players: {игрок: {игра: рекорд}}
+    :return: Пара ({игрок: данные}, {игрок: сумма мест по играм})
+    """
+    result = {
+        player: {"scores": {game: scores.get(game, 0) for game in game_names}, "ratings": {}}
+        for player, scores in players.items()
+    }
+    rank_sums = dict.fromkeys(result, 0)
+    for game in game_names:
+        sorted_scores = sorted(
+            ((player, data["scores"][game]) for player, data in result.items()),
+            key=lambda x: (rank_key(game, x[1]), x[0])
+        )
+        num_players = len(sorted_scores)
+        for i, (player, _) in enumerate(sorted_scores):
+            rank_sums[player] += i
+            if num_players == 1:
+                rating = rating_per_game
+            else:
+                rating = rating_per_game * (1 - i / (num_players - 1))
+            result[player]["ratings"][game] = rating
+    for data in result.values():
+        data["total_rating"] = sum(data["ratings"].values())
+    return result, rank_sums
+
+
+def compare_ratings(players, game_names, rating_per_game, source):
+    """
+    Сверяет RatingEngine и IncrementalRanking с исходной формулой:
+    рейтинги каждого игрока, его место и порядок общего рейтинга (с ничьими)
+    :param source: Откуда взяты рекорды (для описания проблем)
+    """
+    expected, rank_sums = reference_ratings(players, game_names, rating_per_game)
+    # Общий рейтинг линейно убывает с суммой мест: по ней (а не по сумме с ошибками
+    # округления) равные рейтинги распознаются точно и упорядочиваются по имени
+    order = sorted(expected, key=lambda player: (rank_sums[player], player))
+
+    engine = RatingEngine(game_names, rating_per_game)
+    engine.load(players)
+    table = engine.ratings()
+    ranking = IncrementalRanking(game_names, rating_per_game)
+    ranking.load(players)
+
+    for place, player in enumerate(order, 1):
+        if table[player] != expected[player]:
+            yield f"{source}: рейтинг {player} (RatingEngine) не совпадает с исходной формулой"
+        if ranking.player_data(player) != expected[player]:
+            yield f"{source}: рейтинг {player} (IncrementalRanking) не совпадает с исходной формулой"
+        if table.place(player) != place or ranking.place(player) + 1 != place:
+            yield (f"{source}: место {player}: ожидается {place}, RatingEngine {table.place(player)}, "
+                   f"IncrementalRanking {ranking.place(player) + 1}")
+
+    for name, top in (("RatingEngine.top", [player for player, _ in engine.top(len(order))]),
+                      ("RatingTable.page", [player for player, _ in table.page(0, len(order))]),
+                      ("IncrementalRanking.top", [player for player, _ in ranking.top(len(order))])):
+        if top != order:
+            yield f"{source}: порядок {name} не совпадает с исходной формулой"
+
+
+def check_ratings(data_dir, game_names, rating_per_game):
+    """
+    Сверяет расчет рейтинга с исходной формулой на рекордах из индекса рейтинга,
+    из базы SQLite и на случайной таблице с большим числом ничьих
+    """
+    index_file = os.path.join(data_dir, "leaderboard.json")
+    leaderboard = LeaderboardIndex(index_file, game_names, rating_per_game)
+    if os.path.exists(index_file) and leaderboard.load():
+        yield from compare_ratings(leaderboard.players, game_names, rating_per_game, index_file)
+
+    db_path = os.path.join(data_dir, "gcenter.db")
+    if os.path.exists(db_path):
+        players = {}
+        try:
+            conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+            try:
+                for (username,) in conn.execute("SELECT username FROM accounts"):
+                    players[username] = {}
+                for username, game, high_score in conn.execute(
+                    "SELECT username, game, high_score FROM scores"
+                ):
+                    if username in players and game in game_names:
+                        players[username][game] = high_score
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            yield f"Ошибка чтения рекордов из {db_path}: {e}"
+        else:
+            yield from compare_ratings(players, game_names, rating_per_game, db_path)
+
+    # Рекорды из узкого диапазона дают много ничьих и в играх, и в общем рейтинге
+    rng = random.Random(1)
+    players = {
+        f"player{rng.randrange(10 ** 6):06d}-{number}": {game: rng.randrange(6) for game in game_names}
+        for number in range(RATING_SAMPLE)
+    }
+    yield from compare_ratings(players, game_names, rating_per_game, "случайная таблица")
+
+
+def check_data(data_dir, game_names, rating_per_game):
+    """
+    Проверяет все данные Game Center (только чтение)
+    :return: Генератор описаний найденных проблем
+    """
+    yield from check_accounts(os.path.join(data_dir, "accounts"))
+    yield from check_leaderboard(data_dir, game_names, rating_per_game)
+    yield from check_sessions(os.path.join(data_dir, SessionLog.FILE_NAME))
+    yield from check_sqlite(os.path.join(data_dir, "gcenter.db"))
+    yield from check_ratings(data_dir, game_names, rating_per_game)
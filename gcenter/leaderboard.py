@@ -0,0 +1,429 @@
+import json
+import os
+import threading
+
+from gcenter.accounts import stat_key
+from gcenter.locking import FileLock
+from gcenter.ranked import IncrementalRanking
+from gcenter.rating import RatingEngine
+from gcenter.registry import is_better
+from gcenter.writer import atomic_write, open_temp, remove_temp, replace_file
+
+
+class LeaderboardIndex:
+    """
+    Постоянный индекс таблицы лидеров.
+    Хранит рекорды всех игроков и счетчик поколений, чтобы рейтинг строился
+    без чтения файлов аккаунтов. Полный список рейтингов считает RatingEngine,
+    а места игроков и таблица лидеров обновляются инкрементально (IncrementalRanking).
+
+    На диске индекс - основной файл со всеми игроками и журнал изменений рядом
+    (leaderboard.journal): сохранение дописывает в журнал только строки измененных
+    игроков, а когда журнал перерастает основной файл, оба уплотняются в новый
+    основной файл (в среднем O(1) записанных строк на изменение).
+
+    Файлы могут менять несколько процессов: запись идет под блокировкой и
+    сливается с тем, что уже лежит на диске (рекорды только улучшаются), а изменения
+    других процессов подхватываются методом refresh (дочитывается только новый
+    хвост журнала).
+    """
+
+    VERSION = 1  # Версия формата файла индекса
+    COMPACT_SIZE = 64 * 1024  # Журнал меньше этого размера не уплотняется
+
+    def __init__(self, index_file, game_names, rating_per_game, writer=None):
+        """
+        :param index_file: Путь к файлу индекса
+        :param game_names: Список игр
+        :param rating_per_game: Максимальный рейтинг за одну игру
+        :param writer: Фоновый поток записи (None - сохранять сразу)
+        """
+        self.index_file = index_file
+        self.journal_file = os.path.splitext(index_file)[0] + ".journal"
+        self.file_lock = FileLock(index_file)
+        self.writer = writer
+        self.lock = threading.Lock()  # Защищает данные индекса от чтения фоновым потоком
+        self.game_names = list(game_names)
+        self.rating_per_game = rating_per_game
+
+        self.generation = 0  # Увеличивается при каждом изменении индекса
+        self.players = {}    # Рекорды игроков: {игрок: {игра: рекорд}}
+        self.engine = RatingEngine(self.game_names, rating_per_game)  # Расчет рейтингов
+        self.ranking = IncrementalRanking(self.game_names, rating_per_game)  # Места игроков
+        self.disk_key = None        # Версия основного файла, уже учтенная в памяти (stat_key)
+        self.journal_offset = 0     # Сколько байт журнала уже учтено в памяти
+        self.journal_inode = None   # Журнал, к которому относится смещение
+        self.changed = set()        # Игроки, измененные в памяти и еще не записанные
+        self._compact_queued = False  # Следующая запись - основной файл целиком (после rebuild)
+        self._save_queued = False   # Запись уже стоит в очереди фонового потока
+
+        # Кэш рассчитанных рейтингов (действителен для одного поколения)
+        self._ratings = None
+        self._ratings_generation = -1
+
+    def read_file(self):
+        """
+        Читает основной файл индекса (без журнала)
+        :return: (поколение, {игрок: {игра: рекорд}}) или None, если файла нет или он несовместим
+        """
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if data.get("version") != self.VERSION or data.get("games") != self.game_names:
+            return None
+
+        players = {
+            username: dict(zip(self.game_names, scores))
+            for username, scores in data["players"].items()
+        }
+        return data.get("generation", 0), players
+
+    def read_journal(self, offset=0):
+        """
+        Читает строки журнала изменений, дописанные после offset
+        :return: (строки [(игрок, {игра: рекорд}, поколение)], смещение конца прочитанного, inode журнала)
+        """
+        try:
+            with open(self.journal_file, 'rb') as f:
+                inode = os.fstat(f.fileno()).st_ino
+                f.seek(offset)
+                data = f.read()
+        except OSError:
+            return [], 0, None
+
+        end = data.rfind(b"\n") + 1  # Недописанная строка будет прочитана в следующий раз
+        rows = []
+        for line in data[:end].splitlines():
+            try:
+                username, scores, generation = json.loads(line)
+            except (ValueError, TypeError):
+                continue  # Строка, оборванная сбоем при записи
+            if len(scores) == len(self.game_names):
+                rows.append((username, dict(zip(self.game_names, scores)), generation))
+        return rows, offset + end, inode
+
+    @staticmethod
+    def merge_rows(players, rows, generation):
+        """
+        Сливает строки журнала с рекордами (рекорды только улучшаются)
+        :return: Пара (наибольшее поколение, есть ли в строках рекорды новее players)
+        """
+        newer = False
+        for username, scores, row_generation in rows:
+            generation = max(generation, row_generation)
+            current = players.setdefault(username, scores)
+            if current is scores:
+                newer = True
+                continue
+            for game, score in scores.items():
+                if is_better(game, score, current[game]):
+                    current[game] = score
+                    newer = True
+        return generation, newer
+
+    def read_disk(self):
+        """
+        Читает основной файл вместе с журналом изменений
+        :return: (поколение, {игрок: {игра: рекорд}}, конец журнала, inode журнала) или None
+        """
+        data = self.read_file()
+        if data is None:
+            return None
+        generation, players = data
+        rows, offset, inode = self.read_journal()
+        generation, _ = self.merge_rows(players, rows, generation)
+        return generation, players, offset, inode
+
+    def load(self):
+        """
+        Загружает индекс из файла
+        :return: True если индекс прочитан и совместим
+        """
+        key = stat_key(self.index_file)
+        data = self.read_disk()
+        if data is None:
+            return False
+
+        self.generation, self.players, self.journal_offset, self.journal_inode = data
+        self.engine.load(self.players)
+        self.ranking.load(self.players)
+        self.disk_key = key
+        return True
+
+    def refresh(self):
+        """
+        Подхватывает рекорды, записанные другими процессами: если основной файл
+        не менялся, дочитывается только новый хвост журнала
+        :return: True если индекс в памяти изменился
+        """
+        key = stat_key(self.index_file)
+        if key is None:
+            return False
+        if key != self.disk_key:
+            # Основной файл заменен (уплотнение) - читаем его вместе с журналом
+            data = self.read_disk()
+            if data is None:
+                return False
+            generation, players, offset, inode = data
+        else:
+            rows, offset, inode = self.read_journal(self.journal_offset)
+            if inode != self.journal_inode:
+                rows, offset, inode = self.read_journal()  # Журнал начат заново
+            if offset == self.journal_offset and inode == self.journal_inode:
+                return False
+            players = {}
+            generation, _ = self.merge_rows(players, rows, 0)
+
+        changed = False
+        for username, scores in players.items():
+            if username not in self.players:
+                self._add(username)
+                changed = True
+            current = self.players[username]
+            for game in self.game_names:
+                if is_better(game, scores[game], current[game]):
+                    self._apply(username, game, scores[game])
+                    changed = True
+        with self.lock:
+            self.generation = max(self.generation, generation)
+            self.disk_key, self.journal_offset, self.journal_inode = key, offset, inode
+        return changed
+
+    def serialize(self, players=None, generation=None):
+        """
+        Сериализует индекс для записи в основной файл
+        :param players: Рекорды для записи (по умолчанию - индекс в памяти)
+        """
+        with self.lock:
+            if players is None:
+                players = self.players
+            data = {
+                "version": self.VERSION,
+                "generation": self.generation if generation is None else generation,
+                "games": self.game_names,
+                "players": {
+                    username: [scores[game] for game in self.game_names]
+                    for username, scores in players.items()
+                }
+            }
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def save(self):
+        """Сохраняет изменения индекса (дозаписью в журнал)"""
+        if self.writer is None:
+            self._merge_save()
+            return
+        # Запись откладывается до фонового потока: несколько обновлений дадут одну запись
+        if not self._save_queued:
+            self._save_queued = True
+            self.writer.call(self._merge_save)
+
+    def _merge_save(self):
+        """
+        Дописывает строки измененных игроков в журнал под межпроцессной блокировкой,
+        а выросший журнал уплотняет в основной файл
+        """
+        self._save_queued = False
+        with self.lock:
+            generation = self.generation
+            names = list(self.changed)
+            rows = [[username, [self.players[username][game] for game in self.game_names], generation]
+                    for username in names]
+            self.changed.clear()
+            compact = self._compact_queued
+            self._compact_queued = False
+        try:
+            with self.file_lock:
+                if compact or stat_key(self.index_file) is None:
+                    self._compact(generation)
+                    return
+                size = self._append_journal(rows)
+                if size > max(self.COMPACT_SIZE, os.path.getsize(self.index_file)):
+                    self._compact(generation)
+        except OSError as e:
+            print(f"Ошибка сохранения индекса рейтинга: {e}")
+            with self.lock:
+                # Повторим при следующем сохранении
+                self.changed.update(names)
+                self._compact_queued = self._compact_queued or compact
+
+    def _append_journal(self, rows):
+        """
+        Дописывает строки в журнал (вызывается под file_lock)
+        :return: Размер журнала после записи
+        """
+        if not rows:
+            return self.journal_offset
+        data = b"".join(
+            json.dumps(row, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b"\n"
+            for row in rows
+        )
+        with open(self.journal_file, 'a+b') as f:
+            start = f.seek(0, os.SEEK_END)
+            if start:
+                f.seek(start - 1)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data  # Закрываем строку, оборванную сбоем
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            end = f.tell()
+            inode = os.fstat(f.fileno()).st_ino
+        with self.lock:
+            if (self.disk_key == stat_key(self.index_file) and self.journal_inode in (None, inode)
+                    and self.journal_offset == start):
+                # До записи память совпадала с диском - свои строки перечитывать не нужно
+                self.journal_offset, self.journal_inode = end, inode
+        return end
+
+    def _compact(self, generation):
+        """
+        Записывает основной файл целиком (слив с диском) и удаляет журнал
+        (вызывается под file_lock)
+        """
+        with self.lock:
+            players = {username: dict(scores) for username, scores in self.players.items()}
+        newer = False  # Есть ли на диске рекорды, которых нет в памяти
+        disk = self.read_disk()
+        if disk is not None:
+            generation = max(generation, disk[0])
+            _, newer = self.merge_rows(players, ((u, s, 0) for u, s in disk[1].items()), 0)
+        atomic_write(self.index_file, self.serialize(players, generation))
+        self._remove_journal()
+        if not newer:
+            # Иначе ключ не обновляется - refresh прочитает слитый файл
+            with self.lock:
+                self.disk_key = stat_key(self.index_file)
+                self.journal_offset, self.journal_inode = 0, None
+
+    def _remove_journal(self):
+        """Удаляет журнал, уже учтенный в основном файле"""
+        try:
+            os.remove(self.journal_file)
+        except FileNotFoundError:
+            pass
+
+    def restore(self, players):
+        """
+        Потоково записывает индекс, не собирая его в памяти (восстановление из снимка).
+        Индекс в памяти не меняется - его нужно загрузить заново (load).
+        :param players: Перебор пар (игрок, {игра: рекорд})
+        """
+        header = json.dumps({"version": self.VERSION, "generation": 1, "games": self.game_names},
+                            ensure_ascii=False, separators=(',', ':'))
+        with self.file_lock:
+            f, tmp_path = open_temp(self.index_file, 'w', encoding='utf-8')
+            try:
+                with f:
+                    f.write(header[:-1] + ',"players":{')
+                    for number, (username, scores) in enumerate(players):
+                        f.write(("," if number else "") + json.dumps(username, ensure_ascii=False) + ":" +
+                                json.dumps([scores.get(game, 0) for game in self.game_names]))
+                    f.write("}}")
+                    f.flush()
+                    os.fsync(f.fileno())
+                replace_file(tmp_path, self.index_file)
+                self._remove_journal()
+            except BaseException:
+                remove_temp(tmp_path)
+                raise
+
+    def rebuild(self, accounts):
+        """
+        Полностью перестраивает индекс по аккаунтам (однократно, при отсутствии индекса)
+        :param accounts: Перебор всех аккаунтов (AccountRepository.scan())
+        """
+        self.players = {}
+        for account in accounts:
+            games_data = account["games"]
+            self.players[account["username"]] = {
+                game: games_data.get(game, {}).get("high_score", 0) for game in self.game_names
+            }
+        self.engine.load(self.players)
+        self.ranking.load(self.players)
+        self.generation += 1
+        self._compact_queued = True
+        self.save()
+
+    def open(self, repository):
+        """
+        Загружает индекс, а если его нет или он устарел - строит заново
+        :param repository: Хранилище аккаунтов (AccountRepository)
+        """
+        if not self.load():
+            self.rebuild(repository.scan())
+
+    def _add(self, username):
+        """Добавляет игрока в память (без записи в файл)"""
+        with self.lock:
+            self.players[username] = {game: 0 for game in self.game_names}
+            self.engine.add(username)
+            self.ranking.add_player(username)
+            self.generation += 1
+
+    def _apply(self, username, game_name, high_score):
+        """Меняет рекорд в памяти (без записи в файл)"""
+        with self.lock:
+            self.engine.set(username, game_name, high_score)
+            self.ranking.update(username, game_name, high_score)
+            self.players[username][game_name] = high_score
+            self.generation += 1
+
+    def add_player(self, username):
+        """Добавляет нового игрока с нулевыми рекордами"""
+        if username in self.players:
+            return
+        self._add(username)
+        with self.lock:
+            self.changed.add(username)
+        self.save()
+
+    def update(self, username, game_name, high_score):
+        """
+        Обновляет рекорд игрока в одной игре (рекорд только улучшается: худшее значение
+        могло прийти от процесса, еще не видевшего чужой рекорд)
+        :return: True если индекс изменился
+        """
+        if username not in self.players:
+            self.add_player(username)
+
+        if not is_better(game_name, high_score, self.players[username][game_name]):
+            return False
+
+        self._apply(username, game_name, high_score)
+        with self.lock:
+            self.changed.add(username)
+        self.save()
+        return True
+
+    def ratings(self):
+        """
+        Рассчитывает рейтинги всех игроков
+        :return: RatingTable ({игрок: {"scores": {...}, "ratings": {...}, "total_rating": float}})
+        """
+        if self._ratings is not None and self._ratings_generation == self.generation:
+            return self._ratings
+
+        self._ratings = self.engine.ratings()
+        self._ratings_generation = self.generation
+        return self._ratings
+
+    def top(self, count):
+        """
+        Возвращает лучших игроков по общему рейтингу (из инкрементального порядка мест)
+        :param count: Количество игроков
+        :return: Список пар (игрок, данные)
+        """
+        return self.ranking.top(count)
+
+    def player_rating(self, username):
+        """
+        Место и рейтинг одного игрока (из инкрементального порядка мест)
+        :return: Пара (место начиная с 1, данные) или None
+        """
+        if username not in self.ranking:
+            return None
+        return self.ranking.place(username) + 1, self.ranking.player_data(username)
@@ -0,0 +1,87 @@
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class _LockState:
+    """Общее для процесса состояние блокировки одного файла"""
+
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.fd = None
+        self.depth = 0  # Глубина повторного захвата тем же потоком
+
+
+_states = {}
+_states_guard = threading.Lock()
+
+
+class FileLock:
+    """
+    Межпроцессная блокировка на отдельном файле <путь>.lock
+    (flock в Linux/macOS, msvcrt.locking в Windows).
+    Внутри процесса дополнительно сериализуется обычной блокировкой потоков,
+    поэтому ее можно брать и из основного, и из фонового потока, в том числе
+    повторно (вложенно) в одном потоке.
+    """
+
+    def __init__(self, path):
+        """:param path: Путь к защищаемому файлу (блокируется файл с суффиксом .lock)"""
+        self.path = path + ".lock"
+        with _states_guard:
+            self.state = _states.setdefault(os.path.abspath(self.path), _LockState())
+
+    def acquire(self):
+        """Ждет и захватывает блокировку"""
+        state = self.state
+        state.thread_lock.acquire()
+        state.depth += 1
+        if state.depth > 1:
+            return
+        try:
+            state.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            if fcntl is not None:
+                fcntl.flock(state.fd, fcntl.LOCK_EX)
+            else:
+                # LK_LOCK сам повторяет попытки в течение 10 секунд - ждем дальше, пока не получится
+                while True:
+                    try:
+                        msvcrt.locking(state.fd, msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+        except BaseException:
+            if state.fd is not None:
+                os.close(state.fd)
+                state.fd = None
+            state.depth -= 1
+            state.thread_lock.release()
+            raise
+
+    def release(self):
+        """Освобождает блокировку"""
+        state = self.state
+        state.depth -= 1
+        if state.depth == 0:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(state.fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(state.fd, 0, os.SEEK_SET)
+                    msvcrt.locking(state.fd, msvcrt.LK_UNLCK, 1)
+            finally:
+                os.close(state.fd)
+                state.fd = None
+        state.thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
@@ -0,0 +1,225 @@
+"""
+Профилирование игровых сессий, запущенных из Game Center.
+
+Режим выбирается переменной окружения GCENTER_PROFILE (или в меню «Отладка»):
+    off      - без профилирования
+    cprofile - cProfile: точное время каждой функции, но заметно замедляет игру
+    sample   - сэмплы: фоновый поток раз в SAMPLE_INTERVAL снимает стек потока Tk;
+               почти не влияет на игру, время функций - приблизительное
+
+Каждая сессия сохраняется в data/profiles/<игра>-<игрок>-<сессия>.json (описание
+и сэмплы) и, для cProfile, рядом в .prof (можно открыть pstats или snakeviz).
+Самые горячие функции по многим сессиям:
+
+    python -m gcenter profiles --game snake --limit 30
+"""
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILE_MODES = {  # Режим -> название в меню
+    "off": "Без профилирования",
+    "cprofile": "Профилирование: cProfile",
+    "sample": "Профилирование: сэмплы",
+}
+SAMPLE_INTERVAL = 0.005  # Период сэмплов (с)
+MAX_DEPTH = 64           # Сколько кадров стека сохраняется в сэмпле (от самого вложенного)
+
+
+def profile_mode(mode=None):
+    """
+    Режим профилирования: указанный, иначе из GCENTER_PROFILE, иначе "off"
+    :return: Один из ключей PROFILE_MODES
+    """
+    mode = (mode or os.environ.get("GCENTER_PROFILE") or "off").lower()
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Неизвестный режим профилирования: {mode}")
+    return mode
+
+
+def profiles_dir(data_dir):
+    """Папка с профилями сессий"""
+    return os.path.join(data_dir, "profiles")
+
+
+def function_name(filename, line, name):
+    """Имя функции в профиле (в том же виде, что и у pstats)"""
+    return f"{filename}:{line}({name})"
+
+
+class SamplingProfiler:
+    """Сэмплирующий профилировщик одного потока (фоновый поток читает его стек)"""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        """
+        :param thread_id: Поток, который профилируется (threading.get_ident())
+        :param interval: Период сэмплов (с)
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()  # "внешняя;...;вложенная" -> число сэмплов
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Запускает фоновый поток сэмплов"""
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name="gcenter-profiler", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """Цикл фонового потока"""
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                code = frame.f_code
+                stack.append(function_name(code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def stop(self):
+        """Останавливает фоновый поток"""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+
+class SessionProfiler:
+    """Профиль одной игровой сессии: start() при запуске игры, stop() при закрытии окна"""
+
+    def __init__(self, mode, game, player, data_dir):
+        """
+        :param mode: "cprofile" или "sample"
+        :param game: Игра
+        :param player: Игрок
+        :param data_dir: Папка с данными (профили - в data_dir/profiles)
+        """
+        self.mode = mode
+        self.data_dir = data_dir
+        self.session = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.urandom(3).hex()}"
+        # Метки сессии; после игры к ним добавляются счет и id записи игры
+        self.tags = {"game": game, "player": player, "session": self.session}
+        self.profiler = None
+        self.started = 0.0
+
+    def start(self):
+        """Начинает профилирование (в потоке Tk)"""
+        self.started = time.time()
+        if self.mode == "cprofile":
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.profiler = SamplingProfiler(threading.get_ident())
+            self.profiler.start()
+
+    def stop(self):
+        """
+        Заканчивает профилирование и сохраняет профиль
+        :return: Путь к файлу описания или None при ошибке
+        """
+        if self.profiler is None:
+            return None
+        profiler, self.profiler = self.profiler, None
+        if self.mode == "cprofile":
+            profiler.disable()
+        else:
+            profiler.stop()
+
+        name = "-".join(re.sub(r"[^\w-]", "_", str(value))
+                        for value in (self.tags["game"], self.tags["player"], self.session))
+        folder = profiles_dir(self.data_dir)
+        path = os.path.join(folder, name + ".json")
+        meta = dict(self.tags, mode=self.mode, started=self.started, duration=time.time() - self.started)
+        try:
+            os.makedirs(folder, exist_ok=True)
+            if self.mode == "cprofile":
+                profiler.dump_stats(os.path.join(folder, name + ".prof"))
+                meta["prof"] = name + ".prof"
+            else:
+                meta["interval"] = profiler.interval
+                meta["samples"] = profiler.samples
+                meta["stacks"] = dict(profiler.stacks)
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(meta, file, ensure_ascii=False)
+        except OSError as e:
+            print(f"Ошибка сохранения профиля: {e}")
+            return None
+        return path
+
+
+def load_profiles(data_dir, game=None, player=None, mode=None):
+    """
+    Перебирает сохраненные профили с фильтром по игре, игроку и режиму
+    :return: Генератор пар (путь к описанию, описание)
+    """
+    folder = profiles_dir(data_dir)
+    if not os.path.isdir(folder):
+        return
+    for file_name in sorted(os.listdir(folder)):
+        if not file_name.endswith(".json"):
+            continue
+        path = os.path.join(folder, file_name)
+        try:
+            with open(path, encoding="utf-8") as file:
+                meta = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка чтения профиля {path}: {e}", file=sys.stderr)
+            continue
+        if ((game and meta.get("game") != game) or (player and meta.get("player") != player) or
+                (mode and meta.get("mode") != mode)):
+            continue
+        yield path, meta
+
+
+def hottest(profiles, limit=20, sort="self"):
+    """
+    Самые горячие функции по нескольким сессиям
+    Время cProfile - точное (но с его накладными расходами), время сэмплов -
+    число сэмплов, умноженное на их период.
+    :param profiles: Пары (путь к описанию, описание) из load_profiles
+    :param sort: "self" - по собственному времени, "total" - вместе с вызванными функциями
+    :return: Список кортежей (функция, собственное время, общее время, число сессий)
+    """
+    own = Counter()
+    total = Counter()
+    sessions = Counter()
+    for path, meta in profiles:
+        seen = set()
+        if meta.get("mode") == "cprofile":
+            try:
+                stats = pstats.Stats(os.path.join(os.path.dirname(path), meta["prof"])).stats
+            except (OSError, KeyError, TypeError, ValueError) as e:
+                print(f"Ошибка чтения профиля {path}: {e}", file=sys.stderr)
+                continue
+            for (filename, line, name), (_, _, own_time, total_time, _) in stats.items():
+                function = function_name(filename, line, name)
+                own[function] += own_time
+                total[function] += total_time
+                seen.add(function)
+        else:
+            interval = meta.get("interval", SAMPLE_INTERVAL)
+            for stack, count in meta.get("stacks", {}).items():
+                frames = stack.split(";")
+                own[frames[-1]] += count * interval
+                # Рекурсивная функция учитывается в общем времени сэмпла один раз
+                for function in set(frames):
+                    total[function] += count * interval
+                seen.update(frames)
+        sessions.update(seen)
+
+    key = own if sort == "self" else total
+    return [
+        (function, own[function], total[function], sessions[function])
+        for function, _ in key.most_common(limit)
+    ]
@@ -0,0 +1,289 @@
+import bisect
+import heapq
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него сдвиги идут циклом по спискам
+    np = None
+
+from gcenter.rating import rank_keys
+from gcenter.registry import rank_key
+
+
+class IncrementalRanking:
+    """
+    Места игроков, поддерживаемые инкрементально.
+    По каждой игре хранится порядок игроков (order) по (rank_key рекорда, имя) -
+    с учетом направления счета игры, а при равном рекорде выше стоит игрок, чье
+    имя раньше по алфавиту. Место в игре
+    хранится неявно - это позиция игрока в order (обратная таблица places).
+    Рейтинг линейно зависит от места, так что общий порядок задается суммой мест
+    по играм (rank_sums). При смене одного рекорда игроки между старым и новым
+    местом образуют непрерывный отрезок order: он сдвигается одним переносом
+    памяти, а их суммы мест меняются одним прибавлением к отрезку (с NumPy -
+    векторно, без цикла по игрокам). Общее место и страница лидеров считаются
+    по массиву сумм мест векторным подсчетом и частичной выборкой (partition).
+    """
+
+    def __init__(self, game_names, rating_per_game):
+        """
+        :param game_names: Список игр
+        :param rating_per_game: Максимальный рейтинг за одну игру
+        """
+        self.game_names = list(game_names)
+        self.game_columns = {game: i for i, game in enumerate(self.game_names)}
+        self.rating_per_game = rating_per_game
+        self.load({})
+
+    def load(self, players):
+        """
+        Строит места заново по всем рекордам
+        :param players: {игрок: {игра: рекорд}}
+        """
+        self.scores = {
+            username: {game: scores.get(game, 0) for game in self.game_names}
+            for username, scores in players.items()
+        }
+        self.names = list(self.scores)  # Игроки по номерам (в порядке добавления)
+        self.ids = {username: i for i, username in enumerate(self.names)}
+        num_players = len(self.names)
+        by_name = sorted(range(num_players), key=self.names.__getitem__)
+
+        self.order = []   # По каждой игре: номера игроков по местам
+        self.keys = []    # По каждой игре: rank_key рекорда на каждом месте (для двоичного поиска)
+        self.places = []  # По каждой игре: место каждого игрока
+        if np is not None:
+            self.rank_sums = np.zeros(num_players, dtype=np.int64)
+            by_name = np.array(by_name, dtype=np.int64)
+            for game in self.game_names:
+                keys = rank_keys(game, np.array([self.scores[self.names[i]][game] for i in by_name],
+                                                dtype=np.int64))
+                # Игроки уже идут по алфавиту - устойчивая сортировка сохраняет его при равных рекордах
+                ranked = np.argsort(keys, kind='stable')
+                places = np.empty(num_players, dtype=np.int64)
+                places[by_name[ranked]] = np.arange(num_players, dtype=np.int64)
+                self.order.append(by_name[ranked])
+                self.keys.append(keys[ranked])
+                self.places.append(places)
+                self.rank_sums += places
+        else:
+            self.rank_sums = [0] * num_players
+            for game in self.game_names:
+                order = sorted(by_name, key=lambda i: rank_key(game, self.scores[self.names[i]][game]))
+                places = [0] * num_players
+                for place, i in enumerate(order):
+                    places[i] = place
+                    self.rank_sums[i] += place
+                self.order.append(order)
+                self.keys.append([rank_key(game, self.scores[self.names[i]][game]) for i in order])
+                self.places.append(places)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, username):
+        return username in self.ids
+
+    def _reserve(self):
+        """Освобождает место под еще одного игрока (с NumPy емкость растет вдвое)"""
+        count = len(self.names)
+        if np is None:
+            for column in range(len(self.game_names)):
+                self.order[column].append(0)
+                self.keys[column].append(0)
+                self.places[column].append(0)
+            self.rank_sums.append(0)
+            return
+        if count < len(self.rank_sums):
+            return
+        capacity = max(16, 2 * count)
+
+        def grown(values):
+            result = np.zeros(capacity, dtype=np.int64)
+            result[:count] = values[:count]
+            return result
+
+        self.order = [grown(values) for values in self.order]
+        self.keys = [grown(values) for values in self.keys]
+        self.places = [grown(values) for values in self.places]
+        self.rank_sums = grown(self.rank_sums)
+
+    @staticmethod
+    def _add_to(values, ids, delta):
+        """Прибавляет delta к значениям игроков ids (отрезку order)"""
+        if np is not None:
+            values[ids] += delta
+        else:
+            for i in ids:
+                values[i] += delta
+
+    def _find(self, column, key, username, count):
+        """Позиция, на которую встает ключ (key, имя) среди первых count мест игры"""
+        keys = self.keys[column]
+        order = self.order[column]
+        lo = bisect.bisect_left(keys, key, 0, count)
+        hi = bisect.bisect_right(keys, key, lo, count)
+        # Равные рекорды идут по алфавиту
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.names[order[mid]] < username:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _move(self, column, i, old_place, new_place, key):
+        """Переносит игрока i в игре с места old_place на new_place, сдвигая отрезок между ними"""
+        order = self.order[column]
+        keys = self.keys[column]
+        places = self.places[column]
+        if new_place < old_place:
+            # Игроки на местах [new_place, old_place) опускаются на одно место
+            moved = order[new_place:old_place]
+            self._add_to(places, moved, 1)
+            self._add_to(self.rank_sums, moved, 1)
+            order[new_place + 1:old_place + 1] = order[new_place:old_place]
+            keys[new_place + 1:old_place + 1] = keys[new_place:old_place]
+        elif new_place > old_place:
+            # Игроки на местах (old_place, new_place] поднимаются на одно место
+            moved = order[old_place + 1:new_place + 1]
+            self._add_to(places, moved, -1)
+            self._add_to(self.rank_sums, moved, -1)
+            order[old_place:new_place] = order[old_place + 1:new_place + 1]
+            keys[old_place:new_place] = keys[old_place + 1:new_place + 1]
+        order[new_place] = i
+        keys[new_place] = key
+        places[i] = new_place
+        self.rank_sums[i] += new_place - old_place
+
+    def add_player(self, username):
+        """Добавляет игрока с нулевыми рекордами (сдвигаются только игроки ниже него)"""
+        if username in self.ids:
+            return
+        self._reserve()
+        i = len(self.names)
+        self.names.append(username)
+        self.ids[username] = i
+        self.scores[username] = {game: 0 for game in self.game_names}
+        # Новый игрок сначала стоит последним (место i) в каждой игре, а затем
+        # переносится на свое место - _move поправит сумму мест
+        self.rank_sums[i] = i * len(self.game_names)
+        for column, game in enumerate(self.game_names):
+            key = rank_key(game, 0)
+            self._move(column, i, i, self._find(column, key, username, i), key)
+
+    def update(self, username, game_name, score):
+        """
+        Меняет рекорд игрока в одной игре: O(log n) на поиск места и один
+        векторный сдвиг отрезка игроков между старым и новым местом
+        :return: True если рекорд изменился
+        """
+        if username not in self.ids:
+            self.add_player(username)
+        old_score = self.scores[username][game_name]
+        if old_score == score:
+            return False
+
+        column = self.game_columns[game_name]
+        i = self.ids[username]
+        old_place = int(self.places[column][i])
+        key = rank_key(game_name, score)
+        position = self._find(column, key, username, len(self.names))
+        # Позиция найдена вместе с самим игроком - без него места ниже старого на одно меньше
+        new_place = position - 1 if position > old_place else position
+        self._move(column, i, old_place, new_place, key)
+        self.scores[username][game_name] = score
+        return True
+
+    def rating_for_place(self, place):
+        """Рейтинг за одну игру по месту (линейно от max до 0)"""
+        num_players = len(self.names)
+        if num_players == 1:
+            # Если игрок один, он получает максимальный рейтинг
+            return self.rating_per_game
+        return self.rating_per_game * (1 - place / (num_players - 1))
+
+    def place(self, username, game_name=None):
+        """
+        Место игрока (начиная с 0) в одной игре (за O(1)) или в общем рейтинге
+        (векторный подсчет игроков с меньшей суммой мест)
+        :return: Место или None, если игрока нет
+        """
+        i = self.ids.get(username)
+        if i is None:
+            return None
+        if game_name is not None:
+            return int(self.places[self.game_columns[game_name]][i])
+        rank_sums = self.rank_sums[:len(self.names)]
+        rank_sum = rank_sums[i]
+        if np is not None:
+            ahead = int(np.count_nonzero(rank_sums < rank_sum))
+            ties = np.flatnonzero(rank_sums == rank_sum)
+        else:
+            ahead = sum(1 for value in rank_sums if value < rank_sum)
+            ties = [other for other, value in enumerate(rank_sums) if value == rank_sum]
+        # При равной сумме мест выше игроки с именем раньше по алфавиту
+        return ahead + sum(1 for other in ties if self.names[other] < username)
+
+    def player_data(self, username):
+        """Данные игрока в формате {"scores", "ratings", "total_rating"} за O(игр)"""
+        scores = self.scores[username]
+        ratings = {
+            game: self.rating_for_place(self.place(username, game)) for game in self.game_names
+        }
+        return {
+            "scores": dict(scores),
+            "ratings": ratings,
+            "total_rating": sum(ratings.values())
+        }
+
+    def leaders(self, start, count):
+        """Имена игроков общего рейтинга на местах [start, start + count)"""
+        num_players = len(self.names)
+        stop = min(start + count, num_players)
+        if start >= stop:
+            return []
+        rank_sums = self.rank_sums[:num_players]
+
+        def key(i):
+            return rank_sums[i], self.names[i]
+
+        if np is None:
+            return [self.names[i] for i in heapq.nsmallest(stop, range(num_players), key=key)[start:]]
+
+        # Суммы мест на границах страницы - частичной выборкой, без сортировки всех игроков
+        low, high = np.partition(rank_sums, (start, stop - 1))[[start, stop - 1]]
+        ahead = int(np.count_nonzero(rank_sums < low))
+        candidates = sorted(np.flatnonzero((rank_sums >= low) & (rank_sums <= high)), key=key)
+        return [self.names[i] for i in candidates[start - ahead:stop - ahead]]
+
+    def board(self, start, count, game_name=None):
+        """
+        Страница таблицы лидеров на местах [start, start + count)
+        :param game_name: Игра или None для общего рейтинга
+        :return: Список троек (место начиная с 0, игрок, {"scores": рекорды, "rating": рейтинг})
+        """
+        if game_name is None:
+            return [
+                (start + offset, username, {
+                    "scores": dict(self.scores[username]),
+                    "rating": self.player_data(username)["total_rating"]
+                })
+                for offset, username in enumerate(self.leaders(start, count))
+            ]
+        order = self.order[self.game_columns[game_name]]
+        stop = min(start + count, len(self.names))
+        return [
+            (start + offset, self.names[i], {
+                "scores": dict(self.scores[self.names[i]]),
+                "rating": self.rating_for_place(start + offset)
+            })
+            for offset, i in enumerate(order[start:stop])
+        ]
+
+    def top(self, count, start=0):
+        """
+        Игроки общего рейтинга на местах [start, start + count)
+        :return: Список пар (игрок, данные)
+        """
+        return [(username, self.player_data(username)) for username in self.leaders(start, count)]
@@ -0,0 +1,289 @@
+import bisect
+import heapq
+from collections.abc import Mapping
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него рейтинг считается построчно
+    np = None
+
+from gcenter.registry import NO_RESULT_KEY, higher_is_better, rank_key
+
+
+def rank_keys(game_id, values):
+    """Ключи сортировки rank_key для столбца рекордов NumPy"""
+    if higher_is_better(game_id):
+        return -values
+    return np.where(values != 0, values, NO_RESULT_KEY)
+
+
+def row_data(game_columns, scores, ratings, total):
+    """Данные одной строки таблицы в формате {"scores", "ratings", "total_rating"}"""
+    return {
+        "scores": {game: int(scores[column]) for game, column in game_columns.items()},
+        "ratings": {game: float(ratings[column]) for game, column in game_columns.items()},
+        "total_rating": float(total)
+    }
+
+
+class RatingEngine:
+    """
+    Расчет рейтингов по столбцовой таблице рекордов (игроки x игры).
+    Места в каждой игре считаются по rank_key (с учетом направления счета игры).
+    Строки таблицы идут в порядке добавления игроков: новый игрок дописывается
+    в конец (с NumPy - в запас емкости, который растет вдвое), а отдельная
+    перестановка by_name хранит строки по алфавиту. Расчет идет по таблице,
+    переставленной по алфавиту, поэтому устойчивая сортировка по рекорду
+    сразу дает разрешение ничьих по имени. Общий рейтинг линейно зависит от
+    суммы мест по играм, поэтому порядок строится по этой сумме (целой, без
+    ошибок округления) - так же, как в IncrementalRanking. С NumPy места и доли рейтинга
+    во всех играх считаются векторно, а лучшие N выбираются частичной
+    выборкой (argpartition) вместо полной сортировки.
+    """
+
+    def __init__(self, game_names, rating_per_game):
+        """
+        :param game_names: Список игр (столбцы таблицы)
+        :param rating_per_game: Максимальный рейтинг за одну игру
+        """
+        self.game_names = list(game_names)
+        self.game_columns = {game: i for i, game in enumerate(self.game_names)}
+        self.rating_per_game = rating_per_game
+        self.names = []         # Игроки в порядке строк таблицы
+        self.rows = {}          # Игрок -> номер строки
+        self.sorted_names = []  # Игроки по алфавиту
+        self.by_name = []       # Номера строк в порядке sorted_names
+        self.scores = self._empty(0)
+        self._table = None  # Кэш расчета (RatingTable) до следующего изменения
+
+    def _empty(self, capacity):
+        """Пустая таблица рекордов на capacity строк"""
+        if np is not None:
+            return np.zeros((capacity, len(self.game_names)), dtype=np.int64)
+        return []
+
+    def __len__(self):
+        return len(self.names)
+
+    def load(self, players):
+        """
+        Загружает всю таблицу рекордов
+        :param players: {игрок: {игра: рекорд}}
+        """
+        self.names = list(players)
+        self.rows = {name: row for row, name in enumerate(self.names)}
+        self.by_name = sorted(range(len(self.names)), key=self.names.__getitem__)
+        self.sorted_names = [self.names[row] for row in self.by_name]
+        rows = [
+            [players[name].get(game, 0) for game in self.game_names]
+            for name in self.names
+        ]
+        if np is not None:
+            self.scores = np.array(rows, dtype=np.int64).reshape(len(rows), len(self.game_names))
+        else:
+            self.scores = rows
+        self._table = None
+
+    def add(self, username):
+        """Добавляет игрока с нулевыми рекордами (строка дописывается в конец таблицы)"""
+        if username in self.rows:
+            return
+        row = len(self.names)
+        if np is not None:
+            if row == len(self.scores):
+                # Емкость кончилась - растим вдвое, чтобы копирование было в среднем O(1) на игрока
+                scores = self._empty(max(16, 2 * row))
+                scores[:row] = self.scores
+                self.scores = scores
+        else:
+            self.scores.append([0] * len(self.game_names))
+        self.names.append(username)
+        self.rows[username] = row
+        # Вставка в списки по алфавиту сдвигает только ссылки, а не строки таблицы
+        pos = bisect.bisect_left(self.sorted_names, username)
+        self.sorted_names.insert(pos, username)
+        self.by_name.insert(pos, row)
+        self._table = None
+
+    def set(self, username, game_name, score):
+        """Меняет рекорд игрока в одной игре"""
+        if username not in self.rows:
+            self.add(username)
+        row = self.rows[username]
+        column = self.game_columns[game_name]
+        if np is not None:
+            self.scores[row, column] = score
+        else:
+            self.scores[row][column] = score
+        self._table = None
+
+    def ratings(self):
+        """
+        Рейтинги всех игроков: {игрок: {"scores", "ratings", "total_rating"}}.
+        Возвращаются рассчитанные столбцы (RatingTable, кэшируется до следующего
+        изменения), а словарь игрока строится только при обращении к нему.
+        """
+        if self._table is None:
+            if np is not None:
+                self._table = self._compute_numpy()
+            else:
+                self._table = self._compute_python()
+        return self._table
+
+    def _compute_numpy(self):
+        """Векторный расчет: устойчивая сортировка по каждой игре и линейные доли"""
+        num_players = len(self.names)
+        # Таблица по алфавиту - это и есть снимок рекордов для RatingTable
+        scores = self.scores[np.array(self.by_name, dtype=np.int64)]
+        ratings = np.empty((num_players, len(self.game_names)), dtype=np.float64)
+        rank_sums = np.zeros(num_players, dtype=np.int64)
+        if num_players == 1:
+            # Если игрок один, он получает максимальный рейтинг
+            ratings.fill(self.rating_per_game)
+        elif num_players > 1:
+            places = np.empty(num_players, dtype=np.int64)
+            positions = np.arange(num_players, dtype=np.int64)
+            for column in range(len(self.game_names)):
+                # Строки идут по алфавиту - устойчивая сортировка сохраняет его при равных рекордах
+                order = np.argsort(rank_keys(self.game_names[column], scores[:, column]), kind='stable')
+                places[order] = positions
+                rank_sums += places
+                # Линейное распределение рейтинга от max до 0
+                ratings[:, column] = self.rating_per_game * (1 - places / (num_players - 1))
+
+        # Складываем по играм по порядку - так же, как sum() в построчном расчете
+        totals = np.zeros(num_players, dtype=np.float64)
+        for column in range(len(self.game_names)):
+            totals += ratings[:, column]
+        return RatingTable(list(self.sorted_names), self.game_columns, scores, ratings, totals, rank_sums)
+
+    def _compute_python(self):
+        """Построчный расчет (без NumPy)"""
+        num_players = len(self.names)
+        scores = [list(self.scores[row]) for row in self.by_name]
+        ratings = [[0.0] * len(self.game_names) for _ in range(num_players)]
+        rank_sums = [0] * num_players
+        for column, game in enumerate(self.game_names):
+            order = sorted(range(num_players), key=lambda row: rank_key(game, scores[row][column]))
+            for place, row in enumerate(order):
+                rank_sums[row] += place
+                if num_players == 1:
+                    # Если игрок один, он получает максимальный рейтинг
+                    ratings[row][column] = self.rating_per_game
+                else:
+                    # Линейное распределение рейтинга от max до 0
+                    ratings[row][column] = self.rating_per_game * (1 - place / (num_players - 1))
+        totals = [sum(row_ratings) for row_ratings in ratings]
+        return RatingTable(list(self.sorted_names), self.game_columns, scores, ratings, totals, rank_sums)
+
+    def top(self, count):
+        """
+        Лучшие игроки по общему рейтингу (при равенстве - по алфавиту)
+        :return: Список пар (игрок, данные)
+        """
+        table = self.ratings()
+        return [(table.names[row], table.player_data(row)) for row in table.top_rows(count)]
+
+
+class RatingTable(Mapping):
+    """
+    Рассчитанные рейтинги всех игроков (снимок RatingEngine.ratings).
+    Хранит столбцы - имена по алфавиту, рекорды, рейтинги по играм и общие
+    рейтинги; словарь игрока строится только для запрошенных строк (одного
+    игрока или страницы), а не для всей таблицы.
+    """
+
+    def __init__(self, names, game_columns, scores, ratings, totals, rank_sums):
+        self.names = names
+        self.game_columns = game_columns
+        self.scores = scores
+        self.ratings = ratings
+        self.totals = totals
+        self.rank_sums = rank_sums  # Порядок общего рейтинга (меньше сумма мест - выше)
+        self._order = None  # Строки по убыванию общего рейтинга (строится при первой странице)
+
+    def row(self, username):
+        """Номер строки игрока (двоичный поиск по именам) или None"""
+        pos = bisect.bisect_left(self.names, username)
+        if pos < len(self.names) and self.names[pos] == username:
+            return pos
+        return None
+
+    def player_data(self, row):
+        """Данные игрока по номеру строки"""
+        return row_data(self.game_columns, self.scores[row], self.ratings[row], self.totals[row])
+
+    def __getitem__(self, username):
+        row = self.row(username)
+        if row is None:
+            raise KeyError(username)
+        return self.player_data(row)
+
+    def __contains__(self, username):
+        return self.row(username) is not None
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def place(self, username):
+        """
+        Место игрока в общем рейтинге (начиная с 1): выше стоят игроки с большим
+        рейтингом и, при равенстве, с именем раньше по алфавиту
+        :return: Место или None, если игрока нет
+        """
+        row = self.row(username)
+        if row is None:
+            return None
+        rank_sum = self.rank_sums[row]
+        if np is not None:
+            # Строки идут по алфавиту: при равной сумме мест выше только строки до этой
+            return 1 + int(np.count_nonzero(self.rank_sums < rank_sum)) + \
+                int(np.count_nonzero(self.rank_sums[:row] == rank_sum))
+        return 1 + sum(1 for other, value in enumerate(self.rank_sums)
+                       if value < rank_sum or (value == rank_sum and other < row))
+
+    def top_rows(self, count):
+        """
+        Строки лучших игроков по общему рейтингу (частичной выборкой, без полной сортировки)
+        :param count: Количество игроков
+        """
+        rank_sums = self.rank_sums
+        num_players = len(self.names)
+        count = min(count, num_players)
+        if count <= 0:
+            return []
+
+        if np is None:
+            return heapq.nsmallest(count, range(num_players), key=lambda row: (rank_sums[row], row))
+
+        if count < num_players:
+            # Частичная выборка: граница count-го места без сортировки всей таблицы
+            threshold = np.partition(rank_sums, count - 1)[count - 1]
+            candidates = np.flatnonzero(rank_sums <= threshold)  # Все, кто не ниже границы (с ничьими)
+        else:
+            candidates = np.arange(num_players)
+        # Кандидаты идут по алфавиту - устойчивая сортировка разрешает ничьи по имени
+        order = candidates[np.argsort(rank_sums[candidates], kind='stable')]
+        return [int(row) for row in order[:count]]
+
+    def order(self):
+        """Номера строк по убыванию общего рейтинга (при равенстве - по алфавиту)"""
+        if self._order is None:
+            if np is not None:
+                self._order = np.argsort(self.rank_sums, kind='stable')
+            else:
+                self._order = sorted(range(len(self.names)), key=lambda row: self.rank_sums[row])
+        return self._order
+
+    def page(self, offset, limit):
+        """
+        Игроки общего рейтинга на местах [offset, offset + limit) (с 0)
+        :return: Список пар (игрок, данные)
+        """
+        return [
+            (self.names[int(row)], self.player_data(int(row)))
+            for row in self.order()[offset:offset + limit]
+        ]
@@ -0,0 +1,125 @@
+"""
+Реестр игр Game Center: id, название, направление счета, окно и ядро каждой игры.
+
+Модули игр не импортируются при запуске: класс окна загружается при первом
+запуске игры (load) или заранее в фоновом потоке (prewarm), поэтому первый клик
+по игре не ждет импорта. Чтобы добавить игру, достаточно зарегистрировать ее
+здесь - кнопка, столбцы таблиц, рейтинг и запись игр подхватят ее сами.
+"""
+import importlib
+import threading
+
+NO_RESULT_KEY = 2 ** 62  # Ключ сортировки "результата нет" в играх, где лучше меньший результат
+
+
+def import_object(path):
+    """Импортирует объект по строке вида модуль:имя"""
+    module_name, _, name = path.partition(":")
+    return getattr(importlib.import_module(module_name), name)
+
+
+class GameInfo:
+    """Описание игры в реестре"""
+
+    def __init__(self, game_id, title, entry, core=None, result="score", higher_is_better=True):
+        """
+        :param game_id: id игры (ключ в аккаунтах, рейтингах и файлах данных)
+        :param title: Название (на кнопке, в таблицах и в истории игр)
+        :param entry: Класс окна игры "модуль:Класс", вызывается как Класс(окно, callback)
+        :param core: Ядро игры без Tk "модуль:Класс", вызывается как Класс(seed)
+        :param result: Атрибут ядра с итогом игры (его получает Game Center)
+        :param higher_is_better: Лучше больший результат; иначе лучше меньший (например,
+                                 время), а 0 означает, что результата еще нет
+        """
+        self.game_id = game_id
+        self.title = title
+        self.entry = entry
+        self.core = core
+        self.result = result
+        self.higher_is_better = higher_is_better
+        self.entry_class = None  # Класс окна после первой загрузки
+        self.core_class = None   # Класс ядра после первой загрузки
+
+    def load(self):
+        """Класс окна игры (модуль импортируется при первом вызове)"""
+        if self.entry_class is None:
+            self.entry_class = import_object(self.entry)
+        return self.entry_class
+
+    def load_core(self):
+        """Класс ядра игры (модуль импортируется при первом вызове)"""
+        if self.core_class is None:
+            self.core_class = import_object(self.core)
+        return self.core_class
+
+
+GAMES = {}  # id -> GameInfo в порядке регистрации (это и порядок столбцов в таблицах)
+
+
+def register(game):
+    """Добавляет игру в реестр"""
+    if game.game_id in GAMES:
+        raise ValueError(f"Игра {game.game_id} уже зарегистрирована")
+    GAMES[game.game_id] = game
+    return game
+
+
+def get_game(game_id):
+    """Описание игры по id (KeyError, если такой игры нет)"""
+    return GAMES[game_id]
+
+
+def game_title(game_id):
+    """Название игры по id (для незарегистрированных - id с заглавной буквы)"""
+    game = GAMES.get(game_id)
+    return game.title if game is not None else game_id.capitalize()
+
+
+def higher_is_better(game_id):
+    """Лучше ли в игре больший результат (незарегистрированные игры считаются такими)"""
+    game = GAMES.get(game_id)
+    return game is None or game.higher_is_better
+
+
+def is_better(game_id, score, best):
+    """Лучше ли результат score рекорда best (с учетом направления счета игры)"""
+    if higher_is_better(game_id):
+        return score > best
+    # Меньше - лучше, но 0 - это отсутствие результата
+    return score != 0 and (best == 0 or score < best)
+
+
+def best_score(game_id, score, best):
+    """Лучший из результата и рекорда"""
+    return score if is_better(game_id, score, best) else best
+
+
+def rank_key(game_id, score):
+    """Ключ сортировки рекорда в таблицах: меньше ключ - выше место"""
+    if higher_is_better(game_id):
+        return -score
+    return score if score != 0 else NO_RESULT_KEY
+
+
+def prewarm(game_ids=None):
+    """
+    Импортирует модули игр в фоновом потоке
+    :param game_ids: Какие игры загрузить (None - все)
+    :return: Запущенный поток
+    """
+    def run():
+        for game_id in game_ids or list(GAMES):
+            try:
+                GAMES[game_id].load()
+            except (ImportError, AttributeError) as e:
+                print(f"Ошибка загрузки игры {game_id}: {e}")
+
+    thread = threading.Thread(target=run, name="gcenter-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+register(GameInfo("snake", "Snake", "games.snake:Snake", "games.snake_core:SnakeCore"))
+register(GameInfo("balls", "Balls", "games.balls:Balls", "games.balls_core:BallsCore", result="level"))
+register(GameInfo("letters", "Letters", "games.letters:Letters", "games.letters_core:LettersCore"))
+register(GameInfo("digits", "Digits", "games.digits:Digits", "games.digits_core:DigitsCore"))
@@ -0,0 +1,630 @@
+import bisect
+import json
+import os
+import struct
+import threading
+import zlib
+from array import array
+from datetime import datetime, timedelta
+
+from gcenter.locking import FileLock
+from gcenter.writer import atomic_write, open_temp, remove_temp, replace_file
+
+DATE_FORMAT = "%d.%m.%Y %H:%M:%S"  # Формат даты в старых логах и при отображении
+FILTER_FORMATS = ("%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M", "%d.%m.%Y")  # Форматы фильтра по дате
+
+# Запись индекса времени: метка времени, смещение строки в журнале, хэш игрока, хэш игры
+INDEX_RECORD = struct.Struct('<dQII')
+
+
+def to_line(entry):
+    """Сериализует запись журнала в одну строку JSON"""
+    return json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n"
+
+
+def key_hash(value):
+    """Короткий хэш игрока или игры для индекса (0 зарезервирован за пустым значением)"""
+    if not value:
+        return 0
+    return zlib.crc32(str(value).encode('utf-8')) or 1
+
+
+def format_date(entry):
+    """Возвращает дату записи в читаемом виде (только для отображения)"""
+    if "ts" in entry:
+        return datetime.fromtimestamp(entry["ts"]).strftime(DATE_FORMAT)
+    return entry.get("date", "??.??.???? ??:??:??")
+
+
+def parse_date(text, end=False):
+    """
+    Разбирает дату фильтра в формате D.M.Y [H:M[:S]]
+    :param end: True для правой границы - тогда граница не включается и
+                дата без времени означает конец этого дня
+    :return: Метка времени или None для пустой строки
+    """
+    text = text.strip()
+    if not text:
+        return None
+    for date_format in FILTER_FORMATS:
+        try:
+            moment = datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+        if end:
+            # Правая граница включает весь указанный день, минуту или секунду
+            moment += {
+                "%d.%m.%Y": timedelta(days=1),
+                "%d.%m.%Y %H:%M": timedelta(minutes=1),
+            }.get(date_format, timedelta(seconds=1))
+        return moment.timestamp()
+    raise ValueError(f"Неверный формат даты: {text}")
+
+
+def upgrade_entry(entry):
+    """
+    Переводит запись старого формата (строка "date") на метку времени "ts"
+    :return: Запись с полем "ts" или None, если дату не удалось разобрать
+    """
+    if "ts" in entry:
+        return entry
+    try:
+        ts = datetime.strptime(entry["date"], DATE_FORMAT).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+    upgraded = {key: value for key, value in entry.items() if key != "date"}
+    upgraded["ts"] = ts
+    return upgraded
+
+
+def upgrade_entries(entries):
+    """Переводит список записей на метки времени и упорядочивает его по времени"""
+    upgraded = [entry for entry in map(upgrade_entry, entries) if entry is not None]
+    upgraded.sort(key=lambda entry: entry["ts"])  # Однократная сортировка при переходе
+    return upgraded
+
+
+def read_entries(path):
+    """
+    Перебирает записи журнала прямо по файлу, ничего не записывая
+    (без индекса и блокировок; поврежденные строки пропускаются)
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            entry = SessionLog._parse(line)
+            if entry is not None:
+                yield entry
+
+
+def entry_matches(entry, start=None, end=None, player=None, game=None):
+    """Проверяет, подходит ли запись под фильтр истории"""
+    ts = entry.get("ts", 0)
+    return (
+        (start is None or ts >= start) and
+        (end is None or ts < end) and
+        (not player or entry.get("player") == player) and
+        (not game or entry.get("game") == game)
+    )
+
+
+class SessionLog:
+    """
+    Журнал игровых сессий в формате JSON Lines (одна запись на строку).
+    Новая игра дописывается в конец файла, а не перезаписывает весь файл;
+    старые записи отбрасываются при уплотнении (compact).
+    В файле записи идут в порядке записи, а метка времени "ts" (секунды эпохи Unix)
+    хранится такой, какой была при игре (часы могут идти назад, процессы - обгонять
+    друг друга). Рядом лежит индекс времени (.idx) с записями фиксированной длины,
+    упорядоченный по (ts, смещение) - по нему выборка за период находится двоичным
+    поиском. Запись с меткой не меньше последней дописывается в конец индекса,
+    а более ранняя вставляется на свое место (сдвигается только хвост индекса).
+    С фоновым потоком записи (writer) новые записи сначала попадают в список
+    pending и уже видны в выборках, а на диск дописываются в фоне.
+    Журнал могут одновременно дописывать несколько процессов: запись идет под
+    межпроцессной блокировкой, а перед чтением подхватываются чужие строки.
+    """
+
+    FILE_NAME = "sessions.jsonl"
+    RETENTION = 100000   # Сколько последних сессий хранится после уплотнения
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, path, retention=None, writer=None):
+        """
+        :param path: Путь к файлу журнала
+        :param retention: Сколько последних записей оставлять при уплотнении
+        :param writer: Фоновый поток записи (None - писать сразу)
+        """
+        self.path = path
+        self.writer = writer
+        # Порядок захвата: сначала file_lock (между процессами), затем lock (между потоками)
+        self.file_lock = FileLock(path)
+        self.lock = threading.RLock()  # Согласует чтение с фоновой дозаписью и уплотнением
+        self.pending = []              # Записи, еще не дописанные на диск (старые в начале)
+        self.index_path = os.path.splitext(path)[0] + ".idx"
+        self.retention = retention or self.RETENTION
+        self.last_ts = 0     # Наибольшая метка времени в индексе
+        # Меняется, когда позиции в индексе сдвигаются: журнал заменен целиком (уплотнение)
+        # или запись вставлена в середину индекса
+        self.generation = 0
+        # Списки позиций индекса по каждому хэшу игрока и игры (для выборки с фильтром):
+        # строятся при первой такой выборке, потом дочитывается только новый хвост индекса
+        self.postings = None
+        self.postings_count = 0        # Сколько записей индекса уже учтено в postings
+        self.postings_generation = -1  # Поколение, к которому относятся позиции
+        with self.file_lock, self.lock:
+            self.count = self._count_lines()  # Количество строк (записей) в файле
+            # Размер прочитанной части файла: строки за ним дописаны позже и еще не учтены
+            self.size = os.path.getsize(path) if os.path.exists(path) else 0
+            self.inode = os.stat(path).st_ino if os.path.exists(path) else None
+            if not self.upgrade() and not self._index_valid():
+                self.rebuild_index()
+            self.last_ts = self._index_last_ts()
+
+    def _count_lines(self):
+        """Считает строки файла и дописывает перевод строки после оборванной записи"""
+        if not os.path.exists(self.path):
+            return 0
+        count = 0
+        last = b"\n"
+        with open(self.path, 'rb') as f:
+            while True:
+                chunk = f.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                count += chunk.count(b"\n")
+                last = chunk[-1:]
+        if last != b"\n":
+            # Запись была прервана на середине - закрываем строку, чтобы не склеить со следующей
+            with open(self.path, 'ab') as f:
+                f.write(b"\n")
+            count += 1
+        return count
+
+    def _index_valid(self):
+        """Индекс считается актуальным, если в нем по записи на каждую строку журнала"""
+        try:
+            size = os.path.getsize(self.index_path)
+        except OSError:
+            return False
+        return size == self.count * INDEX_RECORD.size
+
+    @staticmethod
+    def _index_record(entry, offset, previous_ts):
+        """Запись индекса для строки журнала (поврежденная строка получает время предыдущей)"""
+        if entry is None:
+            return INDEX_RECORD.pack(previous_ts, offset, 0, 0)
+        return INDEX_RECORD.pack(
+            entry.get("ts", previous_ts), offset,
+            key_hash(entry.get("player")), key_hash(entry.get("game"))
+        )
+
+    def _index_last_ts(self):
+        """Наибольшая метка времени в индексе (последняя запись) или 0"""
+        if not self.count or not os.path.exists(self.index_path):
+            return 0
+        with open(self.index_path, 'rb') as index:
+            index.seek((self.count - 1) * INDEX_RECORD.size)
+            record = index.read(INDEX_RECORD.size)
+        return INDEX_RECORD.unpack(record)[0] if len(record) == INDEX_RECORD.size else 0
+
+    def rebuild_index(self):
+        """Перестраивает индекс времени по файлу журнала"""
+        records = []
+        previous_ts = 0.0
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                offset = 0
+                for line in f:
+                    entry = self._parse(line.decode('utf-8', errors='replace'))
+                    record = self._index_record(entry, offset, previous_ts)
+                    previous_ts = INDEX_RECORD.unpack(record)[0]
+                    records.append(record)
+                    offset += len(line)
+        self._write_index(records)
+
+    def _write_index(self, records):
+        """Атомарно записывает индекс, упорядочив записи по (ts, смещение)"""
+        records.sort(key=lambda record: INDEX_RECORD.unpack(record)[:2])
+        atomic_write(self.index_path, b"".join(records))
+
+    def sync(self):
+        """Подхватывает записи, дописанные другими процессами, и замену файла при уплотнении"""
+        with self.file_lock, self.lock:
+            self._sync()
+
+    def _sync(self):
+        """То же, что sync (вызывается под обеими блокировками)"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            if self.count or self.inode is not None:
+                self.count = self.size = 0
+                self.inode = None
+                self.generation += 1
+            return
+
+        if st.st_ino != self.inode or st.st_size < self.size:
+            # Файл заменил другой процесс (уплотнение) - пересчитываем его целиком
+            self.count = self._count_lines()
+            self.size = os.path.getsize(self.path)
+            self.inode = st.st_ino
+            self.generation += 1
+            if not self._index_valid():
+                self.rebuild_index()
+        elif st.st_size > self.size:
+            # Другие процессы дописали строки (целиком - они пишут под той же блокировкой)
+            with open(self.path, 'rb') as f:
+                f.seek(self.size)
+                data = f.read(st.st_size - self.size)
+            self.count += data.count(b"\n")
+            self.size += len(data)
+            entries = (self._parse(line.decode('utf-8', errors='replace')) for line in data.splitlines())
+            if any(entry is not None and entry.get("ts", 0) < self.last_ts for entry in entries):
+                self.generation += 1  # Чужая запись вставлена в середину индекса - позиции сдвинулись
+        else:
+            return
+        self.last_ts = self._index_last_ts()
+
+    def append(self, entry):
+        """Дописывает одну запись в конец журнала (метка времени сохраняется как есть)"""
+        if self.writer is None:
+            self._write_entry(entry)
+            return
+        with self.lock:
+            self.pending.append(entry)
+        self.writer.call(lambda: self._write_entry(entry))
+
+    def _write_entry(self, entry):
+        """Дописывает запись и ее индекс на диск (в фоновом потоке, если он есть)"""
+        with self.file_lock, self.lock:
+            self._sync()
+            line = to_line(entry).encode('utf-8')
+            with open(self.path, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(line)
+                self.inode = os.fstat(f.fileno()).st_ino
+            record = self._index_record(entry, offset, entry["ts"])
+            if entry["ts"] >= self.last_ts:
+                with open(self.index_path, 'ab') as index:
+                    index.write(record)
+                self.last_ts = entry["ts"]
+            else:
+                # Более ранняя метка (часы ушли назад или другой процесс записал позже):
+                # запись встает на свое место, более поздние записи индекса сдвигаются
+                with open(self.index_path, 'r+b') as index:
+                    position = self._bisect(index, entry["ts"], self.count, right=True)
+                    index.seek(position * INDEX_RECORD.size)
+                    tail = index.read()
+                    index.seek(position * INDEX_RECORD.size)
+                    index.write(record + tail)
+                self.generation += 1
+            # Запись становится видимой в файле только после того, как дописан индекс
+            self.count += 1
+            self.size = offset + len(line)
+            if self.pending and self.pending[0] is entry:
+                self.pending.pop(0)
+
+        if self.writer is not None:
+            # Сброс на диск - уже без блокировки, чтобы не задерживать читателей
+            with open(self.path, 'ab') as f:
+                os.fsync(f.fileno())
+
+        # Уплотняем, только когда файл вырос вдвое - в среднем это O(1) на запись
+        if self.count > 2 * self.retention:
+            self.compact()
+
+    @staticmethod
+    def _parse(line):
+        """Разбирает строку журнала (поврежденные строки пропускаются)"""
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            return None
+
+    def __iter__(self):
+        """Потоково перебирает все записи от старых к новым (вместе с недописанными)"""
+        with self.file_lock, self.lock:
+            self._sync()
+            count = self.count
+            pending = list(self.pending)
+        if count and os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for _, line in zip(range(count), f):
+                    entry = self._parse(line)
+                    if entry is not None:
+                        yield entry
+        yield from pending
+
+    def tail(self, limit):
+        """
+        Читает последние записи с конца файла, не загружая его целиком
+        :param limit: Количество записей
+        :return: Список записей (старые в начале)
+        """
+        if limit <= 0:
+            return []
+        with self.file_lock, self.lock:
+            self._sync()
+            entries = self._read_tail(limit, self.size) + self.pending
+        return entries[-limit:]
+
+    def _read_tail(self, limit, size):
+        """Читает последние записи из первых size байт файла"""
+        if not size or not os.path.exists(self.path):
+            return []
+
+        with open(self.path, 'rb') as f:
+            position = size
+            data = b""
+            # Читаем блоками с конца, пока не наберем нужное число строк
+            while position > 0 and data.count(b"\n") <= limit:
+                step = min(self.CHUNK_SIZE, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+
+        lines = data.split(b"\n")
+        if position > 0:
+            lines = lines[1:]  # Первая строка блока может быть неполной
+        entries = []
+        for line in lines:
+            entry = self._parse(line.decode('utf-8', errors='replace'))
+            if entry is not None:
+                entries.append(entry)
+        return entries[-limit:]
+
+    def _rewrite(self, entries):
+        """Атомарно заменяет журнал и его индекс новым набором записей"""
+        records = []
+        f, tmp_path = open_temp(self.path)
+        try:
+            with f:
+                offset = 0
+                for entry in entries:
+                    line = to_line(entry).encode('utf-8')
+                    records.append(self._index_record(entry, offset, entry.get("ts", 0)))
+                    f.write(line)
+                    offset += len(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._write_index(records)
+            replace_file(tmp_path, self.path)
+        except BaseException:
+            remove_temp(tmp_path)
+            raise
+        self.count = len(records)
+        self.size = offset
+        self.inode = os.stat(self.path).st_ino
+        self.generation += 1
+        self.last_ts = self._index_last_ts()
+
+    def compact(self, retention=None):
+        """
+        Оставляет в журнале только последние записи
+        :param retention: Сколько записей оставить (по умолчанию self.retention)
+        :return: Количество оставшихся записей
+        """
+        retention = retention or self.retention
+        with self.file_lock, self.lock:
+            self._sync()
+            # Недописанные записи не трогаем - их допишет фоновый поток
+            self._rewrite(self._read_tail(retention, self.size))
+            return self.count
+
+    def replace(self, entries):
+        """
+        Заменяет весь журнал (потоково, например при восстановлении из снимка)
+        :param entries: Перебор записей от старых к новым
+        :return: Количество записей
+        """
+        with self.file_lock, self.lock:
+            self._sync()
+            self._rewrite(entries)
+            return self.count
+
+    def head(self):
+        """Возвращает первую запись журнала или None"""
+        for entry in self:
+            return entry
+        return None
+
+    def upgrade(self):
+        """Однократно переводит журнал со строковых дат на метки времени"""
+        first = self.head()
+        if first is None or "ts" in first:
+            return False
+        self._rewrite(upgrade_entries(self))
+        return True
+
+    def import_legacy(self, logs_file):
+        """
+        Однократно переносит историю из старого logs.json в журнал
+        (с переводом дат на метки времени).
+        Старый файл переименовывается в logs.json.migrated.
+        """
+        if not os.path.exists(logs_file):
+            return 0
+        try:
+            with open(logs_file, 'r', encoding='utf-8') as f:
+                logs = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            logs = []
+
+        with self.file_lock, self.lock:
+            if not os.path.exists(logs_file):
+                return 0  # Уже перенес другой процесс
+            # Старая история идет раньше уже записанных сессий
+            self._rewrite(upgrade_entries(logs) + list(self))
+            os.replace(logs_file, logs_file + ".migrated")
+        return len(logs)
+
+    def _bisect(self, index, ts, count, right=False):
+        """
+        Двоичный поиск по индексу: позиция первой записи с меткой времени >= ts
+        :param right: Позиция первой записи с меткой времени > ts
+        """
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            index.seek(mid * INDEX_RECORD.size)
+            record_ts = INDEX_RECORD.unpack(index.read(INDEX_RECORD.size))[0]
+            if record_ts < ts or (right and record_ts == ts):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def select(self, start=None, end=None, player=None, game=None):
+        """
+        Выборка записей по периоду [start, end), игроку и игре
+        :return: LogSelection - постраничный доступ к найденным записям
+        """
+        filters = (start, end, player, game)
+        with self.file_lock, self.lock:
+            self._sync()
+            count = self.count
+            pending = [entry for entry in self.pending if entry_matches(entry, *filters)]
+            if count == 0:
+                return LogSelection(self, 0, 0, filters=filters, pending=pending)
+            return self._select(count, filters, pending)
+
+    def _select(self, count, filters, pending):
+        """Поиск выборки по индексу (первые count записей)"""
+        start, end, player, game = filters
+        with open(self.index_path, 'rb') as index:
+            lo = self._bisect(index, start, count) if start is not None else 0
+            hi = self._bisect(index, end, count) if end is not None else count
+            if not player and not game:
+                return LogSelection(self, lo, hi, filters=filters, pending=pending)
+
+            self._update_postings(index, count)
+
+        # Фильтр по игроку/игре: срез списка позиций за период находится двоичным поиском
+        keys = []
+        if player:
+            keys.append(("player", key_hash(player)))
+        if game:
+            keys.append(("game", key_hash(game)))
+        lists = []
+        for key in keys:
+            found = self.postings.get(key, ())
+            lists.append(found[bisect.bisect_left(found, lo):bisect.bisect_left(found, hi)])
+        lists.sort(key=len)
+        positions = array('L', lists[0])
+        if len(lists) > 1:
+            # Игрок и игра: из более короткого списка оставляем позиции, которые есть в другом
+            other = lists[1]
+            both = array('L')
+            for position in positions:
+                i = bisect.bisect_left(other, position)
+                if i < len(other) and other[i] == position:
+                    both.append(position)
+            positions = both
+        return LogSelection(self, lo, hi, positions, filters=filters, pending=pending)
+
+    def _update_postings(self, index, count):
+        """Доводит списки позиций до первых count записей индекса"""
+        if self.postings is None or self.postings_generation != self.generation:
+            # Позиции сдвинулись (уплотнение или вставка в середину) - строим заново
+            self.postings = {}
+            self.postings_count = 0
+            self.postings_generation = self.generation
+        position = self.postings_count
+        index.seek(position * INDEX_RECORD.size)
+        while position < count:
+            batch = min(count - position, self.CHUNK_SIZE)
+            data = index.read(batch * INDEX_RECORD.size)
+            for _, _, record_player, record_game in INDEX_RECORD.iter_unpack(data):
+                for key in (("player", record_player), ("game", record_game)):
+                    found = self.postings.get(key)
+                    if found is None:
+                        found = self.postings[key] = array('L')
+                    found.append(position)
+                position += 1
+        self.postings_count = count
+
+    def read_at(self, positions):
+        """
+        Читает записи по их позициям в индексе
+        :param positions: Позиции строк журнала
+        :return: Список записей (поврежденные строки пропускаются)
+        """
+        entries = []
+        if not positions:
+            return entries
+        with self.file_lock, self.lock, open(self.index_path, 'rb') as index, open(self.path, 'rb') as f:
+            for position in positions:
+                index.seek(position * INDEX_RECORD.size)
+                offset = INDEX_RECORD.unpack(index.read(INDEX_RECORD.size))[1]
+                f.seek(offset)
+                entry = self._parse(f.readline().decode('utf-8', errors='replace'))
+                if entry is not None:
+                    entries.append(entry)
+        return entries
+
+
+class LogSelection:
+    """Результат выборки из журнала: количество и чтение страниц (новые записи первыми)"""
+
+    def __init__(self, log, lo, hi, positions=None, filters=(None, None, None, None), pending=()):
+        """
+        :param lo: Первая позиция периода в индексе
+        :param hi: Позиция сразу за концом периода
+        :param positions: Позиции записей после фильтра по игроку/игре (None - весь период)
+        :param filters: Исходный фильтр для проверки записей (защита от совпадения хэшей)
+        :param pending: Подходящие записи, еще не дописанные на диск (старые в начале)
+        """
+        self.log = log
+        self.lo = lo
+        self.hi = hi
+        self.positions = positions
+        self.filters = filters
+        self.pending = list(reversed(pending))  # Самые новые записи идут первыми
+        self.generation = log.generation        # Поколение файла, к которому относятся позиции
+
+    def _disk_count(self):
+        """Количество найденных записей в файле"""
+        if self.positions is not None:
+            return len(self.positions)
+        return self.hi - self.lo
+
+    def __len__(self):
+        return len(self.pending) + self._disk_count()
+
+    def page(self, offset, limit):
+        """
+        Возвращает страницу записей
+        :param offset: Сколько самых новых записей пропустить
+        :param limit: Размер страницы
+        """
+        with self.log.file_lock, self.log.lock:
+            self.log._sync()
+            if self.log.generation != self.generation:
+                # Журнал уплотнили после выборки - позиции устарели, выбираем заново
+                self.__dict__.update(self.log.select(*self.filters).__dict__)
+            return self._page(offset, limit)
+
+    def _page(self, offset, limit):
+        """Страница записей (под блокировками журнала)"""
+        head = self.pending[offset:offset + limit]
+        offset = max(0, offset - len(self.pending))
+        limit -= len(head)
+
+        total = self._disk_count()
+        first = max(0, total - offset - limit)
+        last = max(0, total - offset)
+        if self.positions is not None:
+            positions = self.positions[first:last]
+        else:
+            positions = range(self.lo + first, self.lo + last)
+        entries = [
+            entry for entry in self.log.read_at(positions)
+            if entry_matches(entry, *self.filters)
+        ]
+        entries.reverse()
+        return head + entries
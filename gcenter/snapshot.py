@@ -0,0 +1,455 @@
+"""
+Снимок всех данных Game Center в одном двоичном файле (резервная копия и перенос).
+
+Файл: MAGIC, затем блоки подряд. Блок - заголовок BLOCK_HEADER (тип, длина
+данных, crc32 данных) и данные, сжатые zlib:
+    HEAD - версия формата и таблица строк с названиями игр;
+    ACCT - до BATCH аккаунтов: таблица строк с именами и записи фиксированной
+           длины (по каждой игре - рекорд, последний результат и сводка статистики);
+    SESS - до BATCH записей истории: таблица строк (игроки, игры и id записей игр)
+           и записи фиксированной длины (метка времени, номер игрока, номер игры,
+           очки, номер id записи игры или -1);
+    END  - количество аккаунтов и записей истории для проверки полноты.
+Экспорт и импорт идут потоком по блокам, поэтому память не зависит от объема данных.
+"""
+import json
+import os
+import sqlite3
+import struct
+import zlib
+
+from gcenter.accounts import AccountRepository
+from gcenter.leaderboard import LeaderboardIndex
+from gcenter.locking import FileLock
+from gcenter.sessions import SessionLog, upgrade_entries
+from gcenter.sqlite_storage import SqliteStorage, create_schema, session_entry
+from gcenter.stats import HISTOGRAM_BUCKETS, RECENT_LIMIT, new_stats
+from gcenter.storage import storage_backend
+from gcenter.writer import open_temp, remove_temp, replace_file
+
+MAGIC = b"GCSNAP\x00\x01"
+VERSION = 2
+BATCH = 4096  # Записей в одном блоке
+END = b"END\x00"
+
+BLOCK_HEADER = struct.Struct('<4sII')   # Тип блока, длина данных, crc32 данных
+COUNT = struct.Struct('<I')
+HEAD_RECORD = struct.Struct('<H')       # Версия формата
+END_RECORD = struct.Struct('<QQ')       # Аккаунтов, записей истории
+# Метка времени, номер игрока, номер игры, очки, номер id записи игры (-1 - нет записи)
+SESSION_RECORD = struct.Struct('<dIIqi')
+SESSION_RECORD_V1 = struct.Struct('<dIIq')  # Версия 1: без id записи игры
+
+# Результаты одной игры в аккаунте: есть ли сводка, рекорд, последний результат,
+# сводка (игр, сумма, сумма квадратов, минимум, максимум, гистограмма,
+# число последних результатов, последние результаты, день ГГГГММДД, лучший за день)
+GAME_FORMAT = f"Bqqqqqqq{HISTOGRAM_BUCKETS}IB{RECENT_LIMIT}qIq"
+GAME_VALUES = 8 + HISTOGRAM_BUCKETS + 1 + RECENT_LIMIT + 2  # Значений в записи одной игры
+
+SCORES_INSERT = "INSERT INTO scores (username, game, high_score, last_score, stats) VALUES (?, ?, ?, ?, ?)"
+SESSIONS_INSERT = "INSERT INTO sessions (ts, player, game, score, replay) VALUES (?, ?, ?, ?, ?)"
+
+
+class SnapshotError(Exception):
+    """Снимок поврежден, имеет неизвестный формат или его некуда восстановить"""
+
+
+def pack_strings(strings):
+    """Таблица строк: количество, смещения и строки UTF-8 подряд"""
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    return (
+        COUNT.pack(len(encoded)) +
+        struct.pack(f'<{len(offsets)}I', *offsets) +
+        b"".join(encoded)
+    )
+
+
+def unpack_strings(data, position=0):
+    """
+    Читает таблицу строк
+    :return: (список строк, позиция после таблицы)
+    """
+    (count,) = COUNT.unpack_from(data, position)
+    position += COUNT.size
+    offsets = struct.unpack_from(f'<{count + 1}I', data, position)
+    position += 4 * (count + 1)
+    blob = data[position:position + offsets[-1]]
+    strings = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(count)]
+    return strings, position + offsets[-1]
+
+
+def pack_game(game):
+    """Значения записи GAME_FORMAT для результатов одной игры"""
+    stats = game.get("stats")
+    values = [1 if stats else 0, game.get("high_score", 0), game.get("last_score", 0)]
+    stats = stats or new_stats()
+    recent = stats["recent"][-RECENT_LIMIT:]
+    values += [
+        stats["count"], stats["total"], stats["squares"], stats["min"] or 0, stats["max"] or 0,
+        *stats["histogram"], len(recent), *recent, *[0] * (RECENT_LIMIT - len(recent)),
+        int(stats["day"].replace("-", "")) if stats["day"] else 0, stats["day_best"]
+    ]
+    return values
+
+
+def unpack_game(values):
+    """Результаты одной игры из значений записи GAME_FORMAT"""
+    game = {"high_score": values[1], "last_score": values[2]}
+    if values[0]:
+        count = values[3]
+        histogram_end = 8 + HISTOGRAM_BUCKETS
+        recent_count = values[histogram_end]
+        day = values[histogram_end + 1 + RECENT_LIMIT]
+        game["stats"] = {
+            "count": count,
+            "total": values[4],
+            "squares": values[5],
+            "min": values[6] if count else None,
+            "max": values[7] if count else None,
+            "histogram": list(values[8:histogram_end]),
+            "recent": list(values[histogram_end + 1:histogram_end + 1 + recent_count]),
+            "day": f"{day // 10000:04d}-{day // 100 % 100:02d}-{day % 100:02d}" if day else None,
+            "day_best": values[-1]
+        }
+    return game
+
+
+class SnapshotWriter:
+    """Потоковая запись снимка (во временный файл, который подменяет целевой при закрытии)"""
+
+    def __init__(self, path, game_names):
+        self.path = path
+        self.game_names = list(game_names)
+        self.account_record = struct.Struct('<' + GAME_FORMAT * len(self.game_names))
+        self.accounts = 0
+        self.sessions = 0
+        self.file, self.tmp_path = open_temp(path)
+        self.file.write(MAGIC)
+        self._block(b"HEAD", HEAD_RECORD.pack(VERSION) + pack_strings(self.game_names))
+
+    def _block(self, kind, data):
+        data = zlib.compress(data, 1)  # Быстрое сжатие: снимок должен упираться в диск, а не в процессор
+        self.file.write(BLOCK_HEADER.pack(kind, len(data), zlib.crc32(data)))
+        self.file.write(data)
+
+    def write_accounts(self, accounts):
+        """Записывает аккаунты блоками по BATCH"""
+        names = []
+        records = []
+        for account in accounts:
+            games = account.get("games", {})
+            values = []
+            for game in self.game_names:
+                values += pack_game(games.get(game, {}))
+            names.append(account["username"])
+            records.append(self.account_record.pack(*values))
+            if len(names) >= BATCH:
+                self._block(b"ACCT", pack_strings(names) + b"".join(records))
+                self.accounts += len(names)
+                names, records = [], []
+        if names:
+            self._block(b"ACCT", pack_strings(names) + b"".join(records))
+            self.accounts += len(names)
+
+    def write_sessions(self, entries):
+        """Записывает историю игр (от старых к новым) сжатыми блоками по BATCH"""
+        strings = {}
+        records = []
+
+        def number(value):
+            return strings.setdefault(value, len(strings))
+
+        for entry in entries:
+            replay = entry.get("replay")
+            records.append(SESSION_RECORD.pack(
+                entry.get("ts", 0),
+                number(str(entry.get("player", "unknown"))),
+                number(str(entry.get("game", "Unknown"))),
+                int(entry.get("score", 0)),
+                number(str(replay)) if replay else -1
+            ))
+            if len(records) >= BATCH:
+                self._block(b"SESS", pack_strings(list(strings)) + b"".join(records))
+                self.sessions += len(records)
+                strings, records = {}, []
+        if records:
+            self._block(b"SESS", pack_strings(list(strings)) + b"".join(records))
+            self.sessions += len(records)
+
+    def close(self):
+        """Дописывает блок END и подменяет целевой файл"""
+        self._block(END, END_RECORD.pack(self.accounts, self.sessions))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        replace_file(self.tmp_path, self.path)
+
+    def abort(self):
+        """Прерывает запись и удаляет временный файл"""
+        self.file.close()
+        remove_temp(self.tmp_path)
+
+
+class SnapshotReader:
+    """Потоковое чтение снимка; каждый перебор заново проходит файл по блокам"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise SnapshotError(f"{path} - не снимок Game Center")
+            kind, data = self._read_block(f)
+        if kind != b"HEAD":
+            raise SnapshotError(f"{path}: нет заголовка снимка")
+        (self.version,) = HEAD_RECORD.unpack_from(data)
+        if self.version not in (1, VERSION):
+            raise SnapshotError(f"{path}: неизвестная версия снимка {self.version}")
+        self.game_names, _ = unpack_strings(data, HEAD_RECORD.size)
+        self.account_record = struct.Struct('<' + GAME_FORMAT * len(self.game_names))
+
+    def _read_block(self, f, wanted=None):
+        """
+        Читает следующий блок
+        :param wanted: Типы блоков, которые нужно распаковать (остальные пропускаются)
+        :return: (тип, данные) или (None, None) в конце файла
+        """
+        header = f.read(BLOCK_HEADER.size)
+        if not header:
+            return None, None
+        if len(header) < BLOCK_HEADER.size:
+            raise SnapshotError(f"{self.path}: файл оборван")
+        kind, length, crc = BLOCK_HEADER.unpack(header)
+        if wanted is not None and kind not in wanted:
+            f.seek(length, os.SEEK_CUR)
+            return kind, None
+        data = f.read(length)
+        if len(data) < length or zlib.crc32(data) != crc:
+            raise SnapshotError(f"{self.path}: поврежден блок {kind.decode('ascii', 'replace')}")
+        return kind, zlib.decompress(data)
+
+    def _blocks(self, kind):
+        """Перебирает распакованные блоки одного типа"""
+        with open(self.path, 'rb') as f:
+            f.seek(len(MAGIC))
+            while True:
+                block, data = self._read_block(f, (kind, END))
+                if block is None:
+                    raise SnapshotError(f"{self.path}: нет блока END (файл оборван)")
+                if block == kind:
+                    yield data
+                if block == END:
+                    return
+
+    def totals(self):
+        """Количество аккаунтов и записей истории по блоку END"""
+        for data in self._blocks(END):
+            return END_RECORD.unpack(data)
+
+    def accounts(self):
+        """Перебирает аккаунты в формате {"username", "games"}"""
+        for data in self._blocks(b"ACCT"):
+            names, position = unpack_strings(data)
+            for username, values in zip(names, self.account_record.iter_unpack(data[position:])):
+                yield {
+                    "username": username,
+                    "games": {
+                        game: unpack_game(values[i * GAME_VALUES:(i + 1) * GAME_VALUES])
+                        for i, game in enumerate(self.game_names)
+                    }
+                }
+
+    def sessions(self):
+        """Перебирает записи истории от старых к новым"""
+        for data in self._blocks(b"SESS"):
+            strings, position = unpack_strings(data)
+            if self.version == 1:
+                for ts, player, game, score in SESSION_RECORD_V1.iter_unpack(data[position:]):
+                    yield {"ts": ts, "player": strings[player], "game": strings[game], "score": score}
+                continue
+            for ts, player, game, score, replay in SESSION_RECORD.iter_unpack(data[position:]):
+                yield session_entry(ts, strings[player], strings[game], score,
+                                    strings[replay] if replay >= 0 else None)
+
+
+def json_source(data_dir):
+    """
+    Источник данных JSON-хранилища
+    :return: (перебор аккаунтов, перебор истории от старых к новым)
+    """
+    accounts_dir = os.path.join(data_dir, "accounts")
+    logs_file = os.path.join(data_dir, "logs.json")
+
+    def accounts():
+        if os.path.isdir(accounts_dir):
+            yield from AccountRepository(accounts_dir, read_only=True).scan()
+
+    def sessions():
+        # Еще не перенесенный старый logs.json идет раньше журнала
+        if os.path.exists(logs_file):
+            try:
+                with open(logs_file, 'r', encoding='utf-8') as f:
+                    yield from upgrade_entries(json.load(f))
+            except (OSError, json.JSONDecodeError):
+                pass
+        yield from SessionLog(os.path.join(data_dir, SessionLog.FILE_NAME))
+
+    return accounts(), sessions()
+
+
+def sqlite_source(db_path):
+    """
+    Источник данных базы SQLite (чтение курсором, без загрузки таблиц в память)
+    :return: (перебор аккаунтов, перебор истории от старых к новым)
+    """
+    def accounts():
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            account = None
+            for username, game, high_score, last_score, stats in conn.execute(
+                "SELECT a.username, s.game, s.high_score, s.last_score, s.stats "
+                "FROM accounts a LEFT JOIN scores s ON s.username = a.username ORDER BY a.username"
+            ):
+                if account is None or account["username"] != username:
+                    if account is not None:
+                        yield account
+                    account = {"username": username, "games": {}}
+                if game is not None:
+                    account["games"][game] = {"high_score": high_score, "last_score": last_score}
+                    if stats:
+                        account["games"][game]["stats"] = json.loads(stats)
+            if account is not None:
+                yield account
+        finally:
+            conn.close()
+
+    def sessions():
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            for row in conn.execute(
+                "SELECT ts, player, game, score, replay FROM sessions ORDER BY id"
+            ):
+                yield session_entry(*row)
+        finally:
+            conn.close()
+
+    return accounts(), sessions()
+
+
+def export_snapshot(data_dir, path, game_names, backend=None):
+    """
+    Сохраняет все данные в файл снимка
+    :return: (аккаунтов, записей истории)
+    """
+    if storage_backend(backend) == "sqlite":
+        db_path = os.path.join(data_dir, SqliteStorage.DB_NAME)
+        if not os.path.exists(db_path):
+            raise SnapshotError(f"Нет базы {db_path}")
+        accounts, sessions = sqlite_source(db_path)
+    else:
+        accounts, sessions = json_source(data_dir)
+
+    writer = SnapshotWriter(path, game_names)
+    try:
+        writer.write_accounts(accounts)
+        writer.write_sessions(sessions)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    return writer.accounts, writer.sessions
+
+
+def restore_accounts(reader, game_names):
+    """Аккаунты снимка с недостающими играми (если список игр с тех пор вырос)"""
+    for account in reader.accounts():
+        for game in game_names:
+            account["games"].setdefault(game, {"high_score": 0, "last_score": 0})
+        yield account
+
+
+def import_json(reader, data_dir, game_names, rating_per_game):
+    """Восстанавливает снимок в пустое JSON-хранилище"""
+    accounts = AccountRepository(os.path.join(data_dir, "accounts"))
+    sessions = SessionLog(os.path.join(data_dir, SessionLog.FILE_NAME))
+    if len(accounts) or sessions.count:
+        raise SnapshotError(f"В папке {data_dir} уже есть данные - восстанавливать можно только в пустую")
+
+    accounts_count = accounts.restore(restore_accounts(reader, game_names))
+    # Индекс рейтинга - вторым проходом по снимку, чтобы не держать рекорды всех игроков в памяти
+    LeaderboardIndex(os.path.join(data_dir, "leaderboard.json"), game_names, rating_per_game).restore(
+        (account["username"], {game: data["high_score"] for game, data in account["games"].items()})
+        for account in restore_accounts(reader, game_names)
+    )
+    sessions_count = sessions.replace(reader.sessions())
+    return accounts_count, sessions_count
+
+
+def import_sqlite(reader, db_path, game_names):
+    """Восстанавливает снимок в новую базу SQLite (собирается во временном файле)"""
+    if os.path.exists(db_path):
+        raise SnapshotError(f"База {db_path} уже существует - восстанавливать можно только в новую")
+    f, tmp_path = open_temp(db_path)  # Пустой файл SQLite открывает как новую базу
+    f.close()
+
+    accounts_count = 0
+    sessions_count = 0
+    conn = sqlite3.connect(tmp_path)
+    try:
+        create_schema(conn)
+        with conn:
+            scores = []
+            for account in restore_accounts(reader, game_names):
+                conn.execute("INSERT INTO accounts (username) VALUES (?)", (account["username"],))
+                scores.extend(
+                    (
+                        account["username"], game, data["high_score"], data["last_score"],
+                        json.dumps(data["stats"], separators=(',', ':')) if "stats" in data else None
+                    )
+                    for game, data in account["games"].items()
+                )
+                accounts_count += 1
+                if len(scores) >= BATCH:
+                    conn.executemany(SCORES_INSERT, scores)
+                    scores = []
+            conn.executemany(SCORES_INSERT, scores)
+
+            sessions = []
+            for entry in reader.sessions():
+                sessions.append((entry["ts"], entry["player"], entry["game"], entry["score"],
+                                 entry.get("replay")))
+                if len(sessions) >= BATCH:
+                    conn.executemany(SESSIONS_INSERT, sessions)
+                    sessions_count += len(sessions)
+                    sessions = []
+            conn.executemany(SESSIONS_INSERT, sessions)
+            sessions_count += len(sessions)
+    except BaseException:
+        conn.close()
+        remove_temp(tmp_path)
+        raise
+    conn.close()
+    replace_file(tmp_path, db_path)
+    return accounts_count, sessions_count
+
+
+def import_snapshot(path, data_dir, game_names, rating_per_game, backend=None):
+    """
+    Восстанавливает данные из снимка в пустую папку (или в новую базу SQLite)
+    :return: (аккаунтов, записей истории)
+    """
+    reader = SnapshotReader(path)
+    expected = reader.totals()  # Заодно проверяет, что файл не оборван
+    os.makedirs(data_dir, exist_ok=True)
+    if storage_backend(backend) == "sqlite":
+        db_path = os.path.join(data_dir, SqliteStorage.DB_NAME)
+        with FileLock(db_path):
+            counts = import_sqlite(reader, db_path, game_names)
+    else:
+        counts = import_json(reader, data_dir, game_names, rating_per_game)
+
+    if counts != expected:
+        raise SnapshotError(f"Восстановлено {counts}, а в снимке {expected}")
+    return counts
@@ -0,0 +1,419 @@
+import json
+import os
+import sqlite3
+
+from gcenter.accounts import read_account_files
+from gcenter.ranked import IncrementalRanking
+from gcenter.rating import RatingEngine
+from gcenter.registry import best_score
+from gcenter.sessions import SessionLog, read_entries, upgrade_entries, upgrade_entry
+from gcenter.stats import add_score, new_stats
+from gcenter.storage import Storage
+from gcenter.writer import open_temp, remove_temp, replace_file
+
+# Таблица истории игр ({name} - имя таблицы: при переводе на ts она собирается под другим именем)
+SESSIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS {name} (
+    id     INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts     REAL NOT NULL,
+    player TEXT NOT NULL,
+    game   TEXT NOT NULL,
+    score  INTEGER NOT NULL,
+    replay TEXT
+)"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    username TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS scores (
+    username   TEXT NOT NULL REFERENCES accounts(username),
+    game       TEXT NOT NULL,
+    high_score INTEGER NOT NULL DEFAULT 0,
+    last_score INTEGER NOT NULL DEFAULT 0,
+    stats      TEXT,
+    PRIMARY KEY (username, game)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS scores_board ON scores (game, high_score DESC, username);
+""" + SESSIONS_TABLE.format(name="sessions") + """;
+
+DROP INDEX IF EXISTS sessions_player;
+CREATE INDEX IF NOT EXISTS sessions_ts ON sessions (ts);
+CREATE INDEX IF NOT EXISTS sessions_player_ts ON sessions (player, ts);
+CREATE INDEX IF NOT EXISTS sessions_game_ts ON sessions (game, ts);
+"""
+
+
+def upgrade_sessions_table(conn):
+    """
+    Однократно переводит таблицу sessions со строковой даты на метку времени ts.
+    Новая таблица собирается рядом и подменяет старую в одной транзакции,
+    поэтому прерванный перевод не теряет историю.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(sessions)")]
+    if not columns or "ts" in columns:
+        return
+    rows = conn.execute("SELECT date, player, game, score FROM sessions ORDER BY id").fetchall()
+    entries = upgrade_entries(
+        {"date": date, "player": player, "game": game, "score": score}
+        for date, player, game, score in rows
+    )
+    conn.execute("BEGIN IMMEDIATE")
+    with conn:
+        conn.execute("DROP TABLE IF EXISTS sessions_new")
+        conn.execute(SESSIONS_TABLE.format(name="sessions_new"))
+        conn.executemany(
+            "INSERT INTO sessions_new (ts, player, game, score) VALUES (?, ?, ?, ?)",
+            [(e["ts"], e["player"], e["game"], e["score"]) for e in entries]
+        )
+        conn.execute("DROP TABLE sessions")  # Вместе с индексами старой таблицы
+        conn.execute("ALTER TABLE sessions_new RENAME TO sessions")
+
+
+def upgrade_scores_table(conn):
+    """Однократно добавляет в таблицу scores столбец со сводкой результатов"""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(scores)")]
+    if "stats" not in columns:
+        with conn:
+            conn.execute("ALTER TABLE scores ADD COLUMN stats TEXT")
+
+
+def upgrade_replay_column(conn):
+    """Однократно добавляет в таблицу sessions столбец с id записи игры"""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(sessions)")]
+    if "replay" not in columns:
+        with conn:
+            conn.execute("ALTER TABLE sessions ADD COLUMN replay TEXT")
+
+
+def session_entry(ts, player, game, score, replay):
+    """Запись истории из строки таблицы sessions (replay - только если есть)"""
+    entry = {"ts": ts, "player": player, "game": game, "score": score}
+    if replay is not None:
+        entry["replay"] = replay
+    return entry
+
+
+def create_schema(conn):
+    """Создает таблицы и индексы, если их еще нет"""
+    upgrade_sessions_table(conn)
+    conn.executescript(SCHEMA)
+    upgrade_scores_table(conn)
+    upgrade_replay_column(conn)
+
+
+class SqliteStorage(Storage):
+    """Хранилище в одной базе SQLite (режим WAL) с индексированными таблицами"""
+
+    DB_NAME = "gcenter.db"
+    BUSY_TIMEOUT = 30  # Сколько секунд ждать освобождения базы другим процессом
+
+    def __init__(self, db_path, data_dir, game_names, rating_per_game):
+        """
+        :param db_path: Путь к файлу базы данных
+        """
+        super().__init__(data_dir, game_names, rating_per_game)
+        self.db_path = db_path
+        # Ждать, пока запись другого процесса освободит базу, а не сразу падать с "database is locked"
+        self.conn = sqlite3.connect(db_path, timeout=self.BUSY_TIMEOUT)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")  # Рекорды только у существующих аккаунтов
+        create_schema(self.conn)
+        self.compact_logs()
+        self._score_changes = 0  # Сколько раз это соединение меняло аккаунты и рекорды
+
+        # Кэш рейтингов сбрасывается при изменении рекордов (в том числе другими процессами)
+        self.engine = RatingEngine(self.game_names, rating_per_game)
+        self._ratings = None
+        self._ratings_version = None
+        self._engine_version = None
+        self._players = {}  # Рекорды из таблицы scores на момент последней загрузки
+
+        # Места игроков для таблиц лидеров: перестраиваются при изменении данных другими
+        # процессами, а свои изменения применяются инкрементально
+        self._ranking = IncrementalRanking(self.game_names, rating_per_game)
+        self._ranking_version = None
+
+    def _data_version(self):
+        """
+        Версия рекордов: меняется после коммита другого соединения (PRAGMA data_version)
+        и после изменения аккаунтов и рекордов этим соединением. Своя история игр
+        (add_log, compact_logs) версию не меняет, поэтому места не перестраиваются.
+        """
+        return (
+            self.conn.execute("PRAGMA data_version").fetchone()[0],
+            self._score_changes
+        )
+
+    def account_exists(self, username):
+        row = self.conn.execute(
+            "SELECT 1 FROM accounts WHERE username = ?", (username,)
+        ).fetchone()
+        return row is not None
+
+    def create_account(self, username):
+        version = self._data_version()
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO accounts (username) VALUES (?)", (username,)
+            )
+            if cursor.rowcount == 0:
+                return False
+            self.conn.executemany(
+                "INSERT INTO scores (username, game) VALUES (?, ?)",
+                [(username, game) for game in self.game_names]
+            )
+        self._score_changes += 1
+        if self._ranking_current(version):
+            self._ranking.add_player(username)
+        return True
+
+    def _ranking_current(self, version):
+        """
+        Можно ли применить свое изменение к местам инкрементально: места были актуальны
+        до изменения и с тех пор не было записей других процессов.
+        При успехе места помечаются актуальными для новой версии данных.
+        """
+        new_version = self._data_version()
+        if self._ranking_version != version or new_version[0] != version[0]:
+            return False
+        self._ranking_version = new_version
+        return True
+
+    def load_account(self, username):
+        if not self.account_exists(username):
+            return None
+        games = {game: {"high_score": 0, "last_score": 0} for game in self.game_names}
+        for game, high_score, last_score, stats in self.conn.execute(
+            "SELECT game, high_score, last_score, stats FROM scores WHERE username = ?", (username,)
+        ):
+            games[game] = {"high_score": high_score, "last_score": last_score}
+            if stats:
+                games[game]["stats"] = json.loads(stats)
+        return {"username": username, "games": games}
+
+    def record_score(self, username, game_name, score):
+        # Сводка читается и записывается в одной транзакции с блокировкой записи,
+        # чтобы одновременные результаты из разных процессов не потерялись
+        version = self._data_version()
+        self.conn.execute("BEGIN IMMEDIATE")
+        with self.conn:
+            if not self.account_exists(username):
+                raise OSError(f"Аккаунт {username} не найден")
+            self.conn.execute(
+                "INSERT OR IGNORE INTO scores (username, game) VALUES (?, ?)",
+                (username, game_name)
+            )
+            row = self.conn.execute(
+                "SELECT high_score, stats FROM scores WHERE username = ? AND game = ?",
+                (username, game_name)
+            ).fetchone()
+            # Рекорд выбирается с учетом направления счета игры (внутри той же транзакции)
+            high_score = best_score(game_name, score, row[0])
+            stats = add_score(json.loads(row[1]) if row[1] else new_stats(), score, game=game_name)
+            self.conn.execute(
+                "UPDATE scores SET high_score = ?, last_score = ?, stats = ? "
+                "WHERE username = ? AND game = ?",
+                (high_score, score, json.dumps(stats, separators=(',', ':')), username, game_name)
+            )
+        self._score_changes += 1
+        if self._ranking_current(version):
+            self._ranking.update(username, game_name, high_score)
+        return high_score
+
+    def _load_engine(self):
+        """Перечитывает таблицу рекордов в RatingEngine, если данные изменились"""
+        version = self._data_version()
+        if self._engine_version != version:
+            players = {username: {} for (username,) in self.conn.execute("SELECT username FROM accounts")}
+            for username, game, high_score in self.conn.execute(
+                "SELECT username, game, high_score FROM scores"
+            ):
+                players.setdefault(username, {})[game] = high_score
+            self.engine.load(players)
+            self._players = players
+            self._engine_version = version
+        return version
+
+    def ranking(self):
+        version = self._data_version()
+        if self._ranking_version != version:
+            self._load_engine()
+            self._ranking.load(self._players)
+            self._ranking_version = version
+        return self._ranking
+
+    def player_rating(self, username):
+        ranking = self.ranking()
+        if username not in ranking:
+            return None
+        return ranking.place(username) + 1, ranking.player_data(username)
+
+    def ratings(self):
+        version = self._load_engine()
+        if self._ratings is not None and self._ratings_version == version:
+            return self._ratings
+
+        self._ratings = self.engine.ratings()
+        self._ratings_version = version
+        return self._ratings
+
+    def top(self, count):
+        self._load_engine()
+        return self.engine.top(count)
+
+    def load_logs(self):
+        rows = self.conn.execute(
+            "SELECT ts, player, game, score, replay FROM sessions ORDER BY id DESC LIMIT ?",
+            (self.LOGS_LIMIT,)
+        ).fetchall()
+        return [session_entry(*row) for row in reversed(rows)]
+
+    def add_log(self, log_entry):
+        # Метка времени сохраняется как есть; порядок записи задает id, а выборки
+        # за период упорядочены по (ts, id)
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO sessions (ts, player, game, score, replay) VALUES (?, ?, ?, ?, ?)",
+                (log_entry["ts"], log_entry["player"], log_entry["game"], log_entry["score"],
+                 log_entry.get("replay"))
+            )
+
+    def select_sessions(self, start=None, end=None, player=None, game=None):
+        return SqliteSelection(self.conn, start, end, player, game)
+
+    def compact_logs(self, retention=None):
+        retention = retention or self.RETENTION
+        with self.conn:
+            # Остаются последние записанные игры (id растет с каждой записью)
+            self.conn.execute(
+                "DELETE FROM sessions WHERE id <= (SELECT MAX(id) FROM sessions) - ?",
+                (retention,)
+            )
+        return self.conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+class SqliteSelection:
+    """
+    Выборка истории из SQLite: подсчет через индексы по (игрок|игра, ts), а страницы -
+    по ключу (ts, id) от границы уже прочитанной страницы (без OFFSET по всем предыдущим)
+    """
+
+    def __init__(self, conn, start=None, end=None, player=None, game=None):
+        self.conn = conn
+        self.conditions = []
+        self.params = []
+        for condition, value in (
+            ("ts >= ?", start), ("ts < ?", end), ("player = ?", player or None), ("game = ?", game or None)
+        ):
+            if value is not None:
+                self.conditions.append(condition)
+                self.params.append(value)
+        self._count = None
+        self._cursors = {0: None}  # Смещение -> ключ (ts, id) последней записи перед ним
+
+    @staticmethod
+    def _where(conditions):
+        return f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    def __len__(self):
+        if self._count is None:
+            self._count = self.conn.execute(
+                f"SELECT COUNT(*) FROM sessions {self._where(self.conditions)}", self.params
+            ).fetchone()[0]
+        return self._count
+
+    def page(self, offset, limit):
+        # Начинаем от ближайшей известной границы страницы: при листании подряд пропускать нечего
+        known = max(position for position in self._cursors if position <= offset)
+        cursor = self._cursors[known]
+        conditions = list(self.conditions)
+        params = list(self.params)
+        if cursor is not None:
+            conditions.append("(ts < ? OR (ts = ? AND id < ?))")
+            params += [cursor[0], cursor[0], cursor[1]]
+        rows = self.conn.execute(
+            f"SELECT id, ts, player, game, score, replay FROM sessions {self._where(conditions)} "
+            "ORDER BY ts DESC, id DESC LIMIT ? OFFSET ?",
+            params + [limit, offset - known]
+        ).fetchall()
+        if rows:
+            self._cursors[offset + len(rows)] = (rows[-1][1], rows[-1][0])
+        return [session_entry(*row[1:]) for row in rows]
+
+
+def migrate_json_to_sqlite(data_dir, db_path, game_names):
+    """
+    Однократно переносит JSON-данные (аккаунты, sessions.jsonl и старый
+    logs.json) в базу SQLite.
+    JSON-файлы только читаются (индексы и перенос аккаунтов не запускаются).
+    База собирается во временном файле и подменяется целиком, поэтому прерванный
+    перенос просто повторится при следующем запуске.
+    :return: Кортеж (перенесено аккаунтов, перенесено записей истории)
+    """
+    accounts_dir = os.path.join(data_dir, "accounts")
+    logs_file = os.path.join(data_dir, "logs.json")
+    sessions = read_entries(os.path.join(data_dir, SessionLog.FILE_NAME))
+    f, tmp_path = open_temp(db_path)  # Пустой файл SQLite открывает как новую базу
+    f.close()
+
+    accounts_count = 0
+    sessions_count = 0
+    conn = sqlite3.connect(tmp_path)
+    try:
+        create_schema(conn)
+        with conn:
+            for account in read_account_files(accounts_dir):
+                username = account["username"]
+                conn.execute("INSERT OR IGNORE INTO accounts (username) VALUES (?)", (username,))
+                games_data = account.get("games", {})
+                conn.executemany(
+                    "INSERT OR REPLACE INTO scores (username, game, high_score, last_score, stats) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (
+                            username, game,
+                            games_data.get(game, {}).get("high_score", 0),
+                            games_data.get(game, {}).get("last_score", 0),
+                            json.dumps(games_data[game]["stats"], separators=(',', ':'))
+                            if "stats" in games_data.get(game, {}) else None
+                        )
+                        for game in game_names
+                    ]
+                )
+                accounts_count += 1
+
+            logs = []
+            if os.path.exists(logs_file):
+                try:
+                    with open(logs_file, 'r', encoding='utf-8') as f:
+                        logs = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    logs = []
+            for chunk in (upgrade_entries(logs), sessions):
+                for log in chunk:
+                    log = upgrade_entry(log)
+                    if log is None:
+                        continue
+                    conn.execute(
+                        "INSERT INTO sessions (ts, player, game, score, replay) VALUES (?, ?, ?, ?, ?)",
+                        (
+                            log["ts"], log.get("player", "unknown"),
+                            log.get("game", "Unknown"), log.get("score", 0), log.get("replay")
+                        )
+                    )
+                    sessions_count += 1
+    except BaseException:
+        conn.close()
+        remove_temp(tmp_path)
+        raise
+    conn.close()
+
+    replace_file(tmp_path, db_path)
+    return accounts_count, sessions_count
@@ -0,0 +1,98 @@
+import math
+import time
+
+from gcenter.registry import best_score
+
+HISTOGRAM_BUCKETS = 16  # Корзины гистограммы: 0, 1, 2-3, 4-7, ... (последняя - без верхней границы)
+RECENT_LIMIT = 10       # Сколько последних результатов хранится
+
+
+def new_stats():
+    """Пустая сводка результатов одного игрока в одной игре"""
+    return {
+        "count": 0,         # Сыграно игр
+        "total": 0,         # Сумма очков
+        "squares": 0,       # Сумма квадратов очков (для разброса)
+        "min": None,
+        "max": None,
+        "histogram": [0] * HISTOGRAM_BUCKETS,
+        "recent": [],       # Последние результаты (новые в конце)
+        "day": None,        # День последней игры (ГГГГ-ММ-ДД, местное время)
+        "day_best": 0       # Лучший результат за этот день
+    }
+
+
+def bucket(score):
+    """Номер корзины гистограммы для результата (по числу двоичных разрядов)"""
+    return min(max(0, int(score)).bit_length(), HISTOGRAM_BUCKETS - 1)
+
+
+def bucket_range(index):
+    """
+    Границы корзины гистограммы
+    :return: (от, до) включительно; у последней корзины верхней границы нет (None)
+    """
+    low = 0 if index == 0 else 1 << (index - 1)
+    if index == HISTOGRAM_BUCKETS - 1:
+        return low, None
+    return low, (1 << index) - 1
+
+
+def day_of(ts):
+    """День по метке времени (ГГГГ-ММ-ДД, местное время)"""
+    return time.strftime("%Y-%m-%d", time.localtime(ts))
+
+
+def add_score(stats, score, ts=None, game=None):
+    """
+    Добавляет результат в сводку за O(1)
+    :param stats: Сводка (new_stats()), меняется на месте
+    :param ts: Метка времени игры (по умолчанию - сейчас)
+    :param game: id игры - лучший результат дня выбирается по ее направлению счета
+    :return: stats
+    """
+    stats["count"] += 1
+    stats["total"] += score
+    stats["squares"] += score * score
+    stats["min"] = score if stats["min"] is None else min(stats["min"], score)
+    stats["max"] = score if stats["max"] is None else max(stats["max"], score)
+    stats["histogram"][bucket(score)] += 1
+
+    recent = stats["recent"]
+    recent.append(score)
+    if len(recent) > RECENT_LIMIT:
+        del recent[0]
+
+    day = day_of(time.time() if ts is None else ts)
+    if stats["day"] != day:
+        stats["day"] = day
+        stats["day_best"] = score
+    else:
+        stats["day_best"] = best_score(game, score, stats["day_best"])
+    return stats
+
+
+def summarize(stats, now=None):
+    """
+    Итоговые показатели по сводке (без чтения истории игр)
+    :param stats: Сводка из аккаунта или None, если игр еще не было
+    :param now: Текущее время (для лучшего результата дня)
+    :return: {"count", "mean", "stddev", "min", "max", "histogram", "recent", "today_best"}
+    """
+    stats = stats or new_stats()
+    count = stats["count"]
+    mean = stats["total"] / count if count else 0.0
+    variance = stats["squares"] / count - mean * mean if count else 0.0
+    today = day_of(time.time() if now is None else now)
+    return {
+        "count": count,
+        "mean": mean,
+        "stddev": math.sqrt(max(0.0, variance)),  # max - защита от ошибки округления
+        "min": stats["min"],
+        "max": stats["max"],
+        "histogram": [
+            (*bucket_range(index), amount) for index, amount in enumerate(stats["histogram"]) if amount
+        ],
+        "recent": list(stats["recent"]),
+        "today_best": stats["day_best"] if stats["day"] == today else None
+    }
@@ -0,0 +1,319 @@
+import os
+import time
+
+from gcenter.accounts import AccountRepository
+from gcenter.leaderboard import LeaderboardIndex
+from gcenter.locking import FileLock
+from gcenter.registry import is_better
+from gcenter.sessions import SessionLog
+from gcenter.stats import add_score, new_stats, summarize
+from gcenter.writer import BackgroundWriter
+
+
+def new_game_results():
+    """Нулевые результаты одной игры в аккаунте"""
+    return {"high_score": 0, "last_score": 0}
+
+
+def new_account(username, game_names):
+    """Создает пустой аккаунт с нулевыми результатами во всех играх"""
+    return {
+        "username": username,
+        "games": {game: new_game_results() for game in game_names}
+    }
+
+
+class Storage:
+    """
+    Базовый интерфейс хранилища Game Center.
+    Все операции GameCenter с аккаунтами, рейтингом и историей идут через него.
+    """
+
+    LOGS_LIMIT = 100                    # Сколько последних игр показывается в истории
+    RETENTION = SessionLog.RETENTION    # Сколько сессий хранится после уплотнения
+
+    def __init__(self, data_dir, game_names, rating_per_game):
+        """
+        :param data_dir: Папка для хранения данных
+        :param game_names: Список игр
+        :param rating_per_game: Максимальный рейтинг за одну игру
+        """
+        self.data_dir = data_dir
+        self.game_names = list(game_names)
+        self.rating_per_game = rating_per_game
+
+    def account_exists(self, username):
+        """Проверяет, зарегистрирован ли пользователь"""
+        raise NotImplementedError
+
+    def create_account(self, username):
+        """
+        Регистрирует нового пользователя
+        :return: False если имя уже занято
+        """
+        raise NotImplementedError
+
+    def load_account(self, username):
+        """Возвращает аккаунт в формате {"username": ..., "games": {...}} или None"""
+        raise NotImplementedError
+
+    def record_score(self, username, game_name, score):
+        """
+        Сохраняет результат игры и обновляет рекорд
+        :return: Рекорд игрока в этой игре после обновления
+        """
+        raise NotImplementedError
+
+    def player_stats(self, username):
+        """
+        Статистика игрока по играм (из сводок, обновляемых при записи результата)
+        :return: {игра: summarize(...)} или None, если аккаунта нет
+        """
+        account = self.load_account(username)
+        if account is None:
+            return None
+        return {
+            game: summarize(account["games"].get(game, {}).get("stats"))
+            for game in self.game_names
+        }
+
+    def ratings(self):
+        """Рейтинги всех игроков: RatingTable ({игрок: {"scores", "ratings", "total_rating"}})"""
+        raise NotImplementedError
+
+    def top(self, count):
+        """Лучшие игроки по общему рейтингу: список пар (игрок, данные)"""
+        raise NotImplementedError
+
+    def player_rating(self, username):
+        """
+        Место и рейтинг одного игрока
+        :return: Пара (место начиная с 1, данные) или None
+        """
+        ratings = self.ratings()
+        place = ratings.place(username)
+        if place is None:
+            return None
+        return place, ratings[username]
+
+    def ranking(self):
+        """Актуальные места игроков (IncrementalRanking) для постраничных таблиц лидеров"""
+        raise NotImplementedError
+
+    def board(self, offset=0, limit=10, game=None):
+        """
+        Страница таблицы лидеров за O(log n + limit), без пересчета мест
+        :param game: Игра или None для общего рейтинга
+        :return: Список троек (место начиная с 1, игрок, {"scores": рекорды, "rating": рейтинг})
+        """
+        return [
+            (place + 1, username, data)
+            for place, username, data in self.ranking().board(offset, limit, game)
+        ]
+
+    def board_size(self):
+        """Количество игроков в таблицах лидеров"""
+        return len(self.ranking())
+
+    def board_place(self, username, game=None):
+        """
+        Место игрока в одной игре (за O(1)) или в общем рейтинге (векторный подсчет)
+        :return: Место начиная с 1 или None, если игрока нет
+        """
+        place = self.ranking().place(username, game)
+        return None if place is None else place + 1
+
+    def board_around(self, username, radius=5, game=None):
+        """
+        Игроки вокруг заданного: до radius мест выше и ниже него
+        :return: Страница в формате board() (пустая, если игрока нет)
+        """
+        place = self.board_place(username, game)
+        if place is None:
+            return []
+        start = max(0, place - 1 - radius)
+        return self.board(start, place - start + radius, game)
+
+    def load_logs(self):
+        """Возвращает последние игры (старые в начале списка)"""
+        raise NotImplementedError
+
+    def add_log(self, log_entry):
+        """Добавляет запись в историю игр"""
+        raise NotImplementedError
+
+    def select_sessions(self, start=None, end=None, player=None, game=None):
+        """
+        Выборка истории по периоду [start, end), игроку и игре (через индексы)
+        :return: Объект с len() и page(offset, limit) - страницы от новых к старым
+        """
+        raise NotImplementedError
+
+    def compact_logs(self, retention=None):
+        """
+        Удаляет старые записи истории сверх срока хранения
+        :return: Количество оставшихся записей
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """Дожидается записи на диск всех отложенных изменений"""
+
+    def close(self):
+        """Освобождает ресурсы хранилища"""
+
+
+class JsonStorage(Storage):
+    """
+    Хранилище на JSON-файлах: аккаунты в data/accounts (по подпапкам) и журнал data/sessions.jsonl.
+    Запись на диск идет в фоновом потоке, чтобы не задерживать интерфейс;
+    до завершения записи изменения читаются из памяти.
+    """
+
+    def __init__(self, data_dir, game_names, rating_per_game):
+        super().__init__(data_dir, game_names, rating_per_game)
+        self.accounts_dir = os.path.join(data_dir, "accounts")  # Папка с аккаунтами
+        self.logs_file = os.path.join(data_dir, "logs.json")     # Старый файл с логами игр
+        os.makedirs(self.accounts_dir, exist_ok=True)
+
+        self.writer = BackgroundWriter()  # Фоновый поток записи файлов
+        self.accounts = AccountRepository(self.accounts_dir, self.writer)  # Аккаунты и их кэш
+
+        # Индекс таблицы лидеров (строится по аккаунтам только при первом запуске)
+        self.leaderboard = LeaderboardIndex(
+            os.path.join(data_dir, "leaderboard.json"),
+            self.game_names,
+            rating_per_game,
+            self.writer
+        )
+        self.leaderboard.open(self.accounts)
+        self.accounts.start_migration()  # Перенос аккаунтов старого формата идет в фоне
+
+        # Журнал сессий (дописывается по одной записи)
+        self.sessions = SessionLog(
+            os.path.join(data_dir, SessionLog.FILE_NAME), self.RETENTION, self.writer
+        )
+        if os.path.exists(self.logs_file):
+            self.sessions.import_legacy(self.logs_file)
+
+    def account_path(self, username):
+        """Путь к файлу аккаунта"""
+        return self.accounts.path(username)
+
+    def account_exists(self, username):
+        return self.accounts.exists(username)
+
+    def create_account(self, username):
+        if self.account_exists(username):
+            return False
+        # Создание идет под блокировкой: другой процесс мог занять имя после проверки
+        if not self.accounts.create(new_account(username, self.game_names)):
+            return False
+        self.leaderboard.add_player(username)
+        return True
+
+    def load_account(self, username):
+        account = self.accounts.get(username)
+        if account is not None:
+            # Аккаунт мог быть создан до регистрации новой игры
+            for game in self.game_names:
+                account["games"].setdefault(game, new_game_results())
+        return account
+
+    def record_score(self, username, game_name, score):
+        ts = time.time()
+
+        def change(account):
+            # Применяется и к копии в памяти, и к файлу на момент записи (с рекордами других процессов)
+            # Игры, зарегистрированной после создания аккаунта, в нем еще нет
+            game_stats = account["games"].setdefault(game_name, new_game_results())
+            if is_better(game_name, score, game_stats["high_score"]):
+                game_stats["high_score"] = score
+            game_stats["last_score"] = score
+            add_score(game_stats.setdefault("stats", new_stats()), score, ts, game_name)
+
+        account = self.accounts.update(username, change)
+        if account is None:
+            raise OSError(f"Аккаунт {username} не найден")
+
+        high_score = account["games"][game_name]["high_score"]
+        # Обновляем индекс таблицы лидеров (двоичный поиск вместо пересчета)
+        self.leaderboard.update(username, game_name, high_score)
+        return high_score
+
+    def ratings(self):
+        self.leaderboard.refresh()
+        return self.leaderboard.ratings()
+
+    def top(self, count):
+        self.leaderboard.refresh()
+        return self.leaderboard.top(count)
+
+    def player_rating(self, username):
+        self.leaderboard.refresh()
+        return self.leaderboard.player_rating(username)
+
+    def ranking(self):
+        self.leaderboard.refresh()
+        return self.leaderboard.ranking
+
+    def load_logs(self):
+        return self.sessions.tail(self.LOGS_LIMIT)
+
+    def add_log(self, log_entry):
+        try:
+            self.sessions.append(log_entry)
+        except OSError as e:
+            print(f"Ошибка сохранения логов: {e}")
+
+    def select_sessions(self, start=None, end=None, player=None, game=None):
+        return self.sessions.select(start, end, player, game)
+
+    def compact_logs(self, retention=None):
+        self.writer.flush()
+        return self.sessions.compact(retention)
+
+    def flush(self):
+        self.writer.flush()
+        self.accounts.flush()
+
+    def close(self):
+        self.writer.close()
+        self.accounts.flush()
+
+
+# Доступные реализации хранилища (выбираются переменной окружения GCENTER_STORAGE)
+BACKENDS = ("json", "sqlite")
+
+
+def storage_backend(backend=None):
+    """
+    Тип хранилища: указанный, иначе из GCENTER_STORAGE, иначе "json"
+    :return: Одно из BACKENDS
+    """
+    backend = (backend or os.environ.get("GCENTER_STORAGE") or "json").lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Неизвестный тип хранилища: {backend}")
+    return backend
+
+
+def open_storage(data_dir, game_names, rating_per_game, backend=None):
+    """
+    Открывает хранилище выбранного типа
+    :param backend: "json" или "sqlite" (по умолчанию - из GCENTER_STORAGE, иначе "json")
+    """
+    backend = storage_backend(backend)
+
+    os.makedirs(data_dir, exist_ok=True)
+    if backend == "sqlite":
+        from gcenter.sqlite_storage import SqliteStorage, migrate_json_to_sqlite
+
+        db_path = os.path.join(data_dir, SqliteStorage.DB_NAME)
+        if not os.path.exists(db_path):
+            # Однократный перенос существующих JSON-данных (его выполняет только один из процессов)
+            with FileLock(db_path):
+                if not os.path.exists(db_path):
+                    migrate_json_to_sqlite(data_dir, db_path, game_names)
+        return SqliteStorage(db_path, data_dir, game_names, rating_per_game)
+
+    return JsonStorage(data_dir, game_names, rating_per_game)
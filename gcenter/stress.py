@@ -0,0 +1,120 @@
+"""
+Нагрузочная проверка одновременной работы нескольких процессов с одной папкой данных:
+процессы параллельно создают аккаунты и записывают результаты, после чего
+проверяется, что ни одна запись не потерялась.
+
+    python -m gcenter stress --processes 8 --results 200
+"""
+import multiprocessing
+import random
+import time
+from collections import Counter
+
+from gcenter import GAME_NAMES, RATING_PER_GAME
+from gcenter.registry import best_score, game_title
+from gcenter.integrity import check_data
+from gcenter.storage import open_storage
+
+PLAYERS = 12  # Сколько игроков делят между собой все процессы
+
+
+def plan(worker, results):
+    """
+    Результаты, которые отправит один процесс (одинаковы при каждом вызове)
+    :return: Список троек (игрок, игра, очки)
+    """
+    rng = random.Random(worker)
+    return [
+        (f"player{rng.randrange(PLAYERS)}", rng.choice(GAME_NAMES), rng.randrange(10000))
+        for _ in range(results)
+    ]
+
+
+def run_worker(data_dir, backend, worker, results):
+    """Процесс-участник: записывает свою часть результатов как можно быстрее"""
+    storage = open_storage(data_dir, GAME_NAMES, RATING_PER_GAME, backend)
+    try:
+        for username, game_name, score in plan(worker, results):
+            if not storage.account_exists(username):
+                storage.create_account(username)
+            storage.record_score(username, game_name, score)
+            storage.add_log({
+                "ts": time.time(),
+                "player": username,
+                "game": game_title(game_name),
+                "score": score
+            })
+    finally:
+        storage.close()
+
+
+def verify(data_dir, backend, processes, results):
+    """
+    Сверяет данные с отправленными результатами
+    :return: Генератор описаний найденных проблем
+    """
+    expected_logs = Counter()
+    expected_high = {}
+    expected_counts = Counter()
+    for worker in range(processes):
+        for username, game_name, score in plan(worker, results):
+            expected_logs[(username, game_title(game_name), score)] += 1
+            expected_counts[(username, game_name)] += 1
+            key = (username, game_name)
+            expected_high[key] = best_score(game_name, score, expected_high.get(key, 0))
+
+    storage = open_storage(data_dir, GAME_NAMES, RATING_PER_GAME, backend)
+    try:
+        selection = storage.select_sessions()
+        logs = Counter(
+            (log["player"], log["game"], log["score"]) for log in selection.page(0, len(selection))
+        )
+        if logs != expected_logs:
+            lost = sum((expected_logs - logs).values())
+            extra = sum((logs - expected_logs).values())
+            yield f"История игр: потеряно записей {lost}, лишних {extra}"
+
+        board = dict(storage.top(PLAYERS + 1))
+        for key, high_score in sorted(expected_high.items()):
+            username, game_name = key
+            account = storage.load_account(username)
+            if account is None:
+                yield f"Аккаунт {username} потерян"
+                continue
+            saved = account["games"][game_name]["high_score"]
+            if saved != high_score:
+                yield f"Рекорд {username}/{game_name}: {saved} вместо {high_score}"
+            played = account["games"][game_name].get("stats", {}).get("count", 0)
+            if played != expected_counts[key]:
+                yield f"Статистика {username}/{game_name}: {played} игр вместо {expected_counts[key]}"
+            if username not in board:
+                yield f"Игрока {username} нет в таблице лидеров"
+            elif board[username]["scores"][game_name] != high_score:
+                yield (f"Таблица лидеров {username}/{game_name}: "
+                       f"{board[username]['scores'][game_name]} вместо {high_score}")
+    finally:
+        storage.close()
+
+    yield from check_data(data_dir, GAME_NAMES, RATING_PER_GAME)
+
+
+def run(data_dir, backend=None, processes=8, results=200):
+    """
+    Запускает процессы и проверяет результат
+    :return: (список проблем, время записи в секундах)
+    """
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(data_dir, backend, worker, results))
+        for worker in range(processes)
+    ]
+    started = time.perf_counter()
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    problems = [f"Процесс {process.pid} завершился с кодом {process.exitcode}"
+                for process in workers if process.exitcode]
+    problems.extend(verify(data_dir, backend, processes, results))
+    return problems, elapsed
@@ -0,0 +1,162 @@
+import os
+import tempfile
+import threading
+from collections import deque
+
+# Права новых файлов по umask процесса (как у open), mkstemp дает только владельцу
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+
+def open_temp(path, mode='wb', **kwargs):
+    """
+    Открывает новый временный файл с уникальным именем в папке path
+    (рядом с целевым, чтобы os.replace не пересекал файловые системы,
+    и не совпадающим с временным файлом другого процесса)
+    :param kwargs: Параметры open (например, encoding)
+    :return: Кортеж (файл, путь к временному файлу)
+    """
+    folder = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=folder)
+    try:
+        permissions = os.stat(path).st_mode & 0o777  # Сохраняем права заменяемого файла
+    except OSError:
+        permissions = FILE_MODE
+    try:
+        os.chmod(tmp_path, permissions)
+    except OSError:
+        pass
+    try:
+        return os.fdopen(fd, mode, **kwargs), tmp_path
+    except BaseException:
+        os.close(fd)
+        remove_temp(tmp_path)
+        raise
+
+
+def fsync_dir(folder):
+    """Сбрасывает на диск саму папку (запись о переименовании), где ОС это позволяет"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return  # Windows не открывает папки для fsync
+    try:
+        fd = os.open(folder or ".", os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def replace_file(tmp_path, path):
+    """Подменяет path готовым временным файлом и фиксирует переименование на диске"""
+    os.replace(tmp_path, path)
+    fsync_dir(os.path.dirname(path))
+
+
+def remove_temp(tmp_path):
+    """Удаляет временный файл после неудачной записи"""
+    try:
+        os.remove(tmp_path)
+    except OSError:
+        pass
+
+
+def atomic_write(path, data):
+    """
+    Атомарная запись файла: уникальный временный файл + fsync + переименование + fsync папки.
+    При сбое посреди записи на диске остается либо старая, либо новая версия.
+    :param data: Содержимое файла (bytes)
+    """
+    f, tmp_path = open_temp(path)
+    try:
+        with f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        replace_file(tmp_path, path)
+    except BaseException:
+        remove_temp(tmp_path)
+        raise
+
+
+class BackgroundWriter:
+    """
+    Фоновый поток записи на диск.
+    Повторные записи одного файла, ожидающие в очереди, объединяются - на диск
+    попадает только последняя версия. Задачи (call) выполняются строго по порядку.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._order = deque()   # Очередь операций: ("file", путь) или ("call", функция)
+        self._files = {}        # Последнее содержимое для ожидающих записи файлов
+        self._busy = False      # Поток сейчас выполняет операцию
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="gcenter-writer", daemon=True)
+        self._thread.start()
+
+    def write_file(self, path, data):
+        """
+        Ставит файл в очередь на атомарную запись
+        :param data: bytes или функция без аргументов, возвращающая bytes
+                     (вызывается в фоновом потоке непосредственно перед записью)
+        """
+        with self._cond:
+            if path not in self._files:
+                self._order.append(("file", path))
+            self._files[path] = data
+            self._cond.notify_all()
+
+    def call(self, task):
+        """Ставит в очередь произвольную задачу записи"""
+        with self._cond:
+            self._order.append(("call", task))
+            self._cond.notify_all()
+
+    def pending(self):
+        """Количество операций, ожидающих выполнения"""
+        with self._cond:
+            return len(self._order) + (1 if self._busy else 0)
+
+    def flush(self, timeout=None):
+        """
+        Ждет, пока все поставленные операции будут записаны
+        :return: True если очередь опустела
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._order and not self._busy, timeout)
+
+    def close(self):
+        """Записывает все ожидающие операции и останавливает поток"""
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        """Основной цикл фонового потока"""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._order or self._closed)
+                if not self._order:
+                    return
+                kind, item = self._order.popleft()
+                data = self._files.pop(item) if kind == "file" else None
+                self._busy = True
+
+            try:
+                if kind == "file":
+                    atomic_write(item, data() if callable(data) else data)
+                else:
+                    item()
+            except Exception as e:
+                print(f"Ошибка фоновой записи: {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
@@ -1,8 +1,11 @@
 import tkinter as tk
-from tkinter import messagebox, simpledialog, ttk
-import json
-import os
-from datetime import datetime
+from tkinter import messagebox, simpledialog
+import time
+from gcenter import DATA_DIR, GAME_NAMES, RATING_PER_GAME
+from gcenter.profiling import PROFILE_MODES, SessionProfiler, profile_mode
+from gcenter.registry import GAMES, game_title, prewarm
+from gcenter.storage import open_storage
+from widgets import HistoryView, LeaderboardView, ProfileView
 
 class GameCenter:
     def __init__(self, root):
@@ -12,8 +15,13 @@ class GameCenter:
         self.root.geometry("600x650")
         
         # Константы для расчета рейтинга
-        self.RATING_PER_GAME = 1.25  # Максимальный рейтинг за одну игру (1.25 для 4 игр)
-        self.GAME_NAMES = ["snake", "balls", "letters", "digits"]  # Список игр
+        self.RATING_PER_GAME = RATING_PER_GAME  # Максимальный рейтинг за одну игру (общий делится между играми)
+        self.GAME_NAMES = list(GAME_NAMES)  # Список игр
+        
+        # Настройки таблицы лидеров
+        self.TOP_PAGE_SIZE = 10   # Сколько игроков показывается сразу и подгружается при прокрутке
+        self.TOP_LIMIT = 100      # Максимум игроков в таблице лидеров
+        self.PREWARM_GAMES = True # Загружать модули игр в фоне, как только появится окно
         
         # Загружаем иконку
         try:
@@ -27,26 +35,26 @@ class GameCenter:
             
         # Инициализация данных
         self.current_user = None  # Текущий авторизованный пользователь
-        self.data_dir = "data"  # Папка для хранения данных
-        self.accounts_dir = os.path.join(self.data_dir, "accounts")  # Папка с аккаунтами
-        self.logs_file = os.path.join(self.data_dir, "logs.json")  # Файл с логами игр
-        os.makedirs(self.accounts_dir, exist_ok=True)  # Создаем директории, если их нет
+        self.data_dir = DATA_DIR  # Папка для хранения данных
+        
+        # Хранилище аккаунтов и истории (JSON или SQLite, см. GCENTER_STORAGE)
+        self.storage = open_storage(self.data_dir, self.GAME_NAMES, self.RATING_PER_GAME)
         
-        # Инициализация логов
-        self.game_logs = []  # Список для хранения истории игр
-        self.load_logs()  # Загружаем логи из файла
+        # Профилирование игровых сессий (GCENTER_PROFILE или меню «Отладка»)
+        try:
+            mode = profile_mode()
+        except ValueError as e:
+            print(f"Ошибка: {e}")
+            mode = "off"
+        self.profile_mode = tk.StringVar(value=mode)
+        self.profiler = None  # Профиль текущей игровой сессии
         
         # Создание интерфейса авторизации
         self.create_auth_interface()
-
-    def load_logs(self):
-        """Загрузка истории игр из файла"""
-        try:
-            if os.path.exists(self.logs_file):
-                with open(self.logs_file, 'r', encoding='utf-8') as f:
-                    self.game_logs = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.game_logs = []
+        
+        # Первый запуск любой игры не ждет импорта ее модуля
+        if self.PREWARM_GAMES:
+            self.root.after_idle(prewarm)
 
     def create_auth_interface(self):
         """Создание интерфейса авторизации"""
@@ -86,6 +94,14 @@ class GameCenter:
         """Создание основного интерфейса"""
         self.clear_window()
         
+        # Меню отладки: режим профилирования следующих игр
+        menubar = tk.Menu(self.root)
+        debug_menu = tk.Menu(menubar, tearoff=0)
+        for mode, title in PROFILE_MODES.items():
+            debug_menu.add_radiobutton(label=title, variable=self.profile_mode, value=mode)
+        menubar.add_cascade(label="Отладка", menu=debug_menu)
+        self.root.config(menu=menubar)
+        
         # Основные фреймы
         self.top_frame = tk.Frame(self.root)
         self.top_frame.pack(pady=10, fill=tk.BOTH, expand=True)
@@ -99,44 +115,31 @@ class GameCenter:
         # Таблица лидеров
         tk.Label(self.top_frame, text="🏆 Топ игроков", font=('Arial', 14, 'bold')).pack()
         
-        self.top_tree = ttk.Treeview(self.top_frame, height=6)
-        self.top_tree['columns'] = ('Rating', 'Snake', 'Balls', 'Letters', 'Digits')
-        self.top_tree.column('#0', width=100, anchor='w')
-        self.top_tree.column('Rating', width=80, anchor='center')
-        self.top_tree.column('Snake', width=80, anchor='center')
-        self.top_tree.column('Balls', width=80, anchor='center')
-        self.top_tree.column('Letters', width=80, anchor='center')
-        self.top_tree.column('Digits', width=80, anchor='center')
-        
-        self.top_tree.heading('#0', text='Игрок')
-        self.top_tree.heading('Rating', text='Рейтинг')
-        self.top_tree.heading('Snake', text='Snake')
-        self.top_tree.heading('Balls', text='Balls')
-        self.top_tree.heading('Letters', text='Letters')
-        self.top_tree.heading('Digits', text='Digits')
-        
-        self.top_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-        
-        # История игр с прокруткой
+        self.top_view = LeaderboardView(
+            self.top_frame,
+            self.storage,
+            self.GAME_NAMES,
+            page_size=self.TOP_PAGE_SIZE,
+            limit=self.TOP_LIMIT,
+            height=6,
+            username=self.current_user
+        )
+        self.top_view.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.top_tree = self.top_view.tree
+        
+        # История игр с прокруткой (отрисовываются только видимые строки)
         logs_frame = tk.Frame(self.middle_frame)
         logs_frame.pack(fill=tk.BOTH, expand=True)
         
         tk.Label(logs_frame, text="🕒 История игр", font=('Arial', 12)).pack()
         
-        # Создаем Scrollbar и Text для логов
-        scrollbar = tk.Scrollbar(logs_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.logs_text = tk.Text(
-            logs_frame, 
-            height=10, 
-            state='disabled', 
-            font=('Arial', 10),
-            yscrollcommand=scrollbar.set
+        self.history_view = HistoryView(
+            logs_frame,
+            self.storage,
+            [game_title(game) for game in self.GAME_NAMES],
+            rows=10
         )
-        self.logs_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-        
-        scrollbar.config(command=self.logs_text.yview)
+        self.history_view.pack(fill=tk.BOTH, expand=True)
         
         # Информация о пользователе
         self.user_frame = tk.Frame(self.bottom_frame)
@@ -148,31 +151,35 @@ class GameCenter:
         self.games_frame = tk.Frame(self.bottom_frame)
         self.games_frame.pack()
         
-        games = [
-            ("Snake", "snake"),
-            ("Balls", "balls"),
-            ("Letters", "letters"),
-            ("Digits", "digits")
-        ]
-        
-        for name, game_id in games:
+        for game in GAMES.values():
             btn = tk.Button(
                 self.games_frame, 
-                text=name, 
-                command=lambda g=game_id: self.start_game(g),
+                text=game.title, 
+                command=lambda g=game.game_id: self.start_game(g),
                 width=12, 
                 height=2
             )
             btn.pack(side=tk.LEFT, padx=5, pady=5)
         
-        # Кнопка выхода
+        # Кнопки профиля и выхода
+        account_frame = tk.Frame(self.bottom_frame)
+        account_frame.pack(pady=10)
+        
+        tk.Button(
+            account_frame,
+            text="Профиль",
+            command=self.show_profile,
+            width=12,
+            height=2
+        ).pack(side=tk.LEFT, padx=5)
+        
         tk.Button(
-            self.bottom_frame,
+            account_frame,
             text="Выйти",
             command=self.logout,
             width=12,
             height=2
-        ).pack(pady=10)
+        ).pack(side=tk.LEFT, padx=5)
         
         # Обновление данных
         self.update_logs_display()
@@ -198,183 +205,109 @@ class GameCenter:
             except:
                 pass
         
-        def universal_callback(score):
-            """Универсальный обработчик завершения игры"""
+        def universal_callback(score, replay=None):
+            """Универсальный обработчик завершения игры (replay - id записи игры)"""
+            if self.profiler is not None:
+                self.profiler.tags.update(score=score, replay=replay)
             if score is not None:
                 self.update_score(game_name, score)
                 self.update_top_players()
-                self.add_game_log(game_name, score)
+                self.add_game_log(game_name, score, replay)
             
             # Задержка перед закрытием
             game_window.after(100, lambda: self.final_close(game_window))
         
         # Сворачиваем главное окно
         self.root.iconify()
+        self.start_profiler(game_name)
         
         try:
-            if game_name == "snake":
-                from games.snake import Snake
-                Snake(game_window, universal_callback)
-                
-            elif game_name == "balls":
-                from games.balls import Balls
-                Balls(game_window, universal_callback)
-                
-            elif game_name == "letters":
-                from games.letters import Letters
-                Letters(game_window, universal_callback)
-                
-            elif game_name == "digits":
-                from games.digits import Digits
-                Digits(game_window, universal_callback)
-                
-        except ImportError as e:
+            # Модуль игры импортируется при первом запуске (если не загружен заранее)
+            game_class = GAMES[game_name].load()
+        except (ImportError, AttributeError) as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить игру: {e}")
+            self.stop_profiler()
             self.root.deiconify()
+            return
+        
+        game_class(game_window, universal_callback)
+
+    def start_profiler(self, game_name):
+        """Начинает профилирование игровой сессии (если оно включено)"""
+        self.stop_profiler()
+        mode = self.profile_mode.get()
+        if mode == "off":
+            return
+        self.profiler = SessionProfiler(mode, game_name, self.current_user, self.data_dir)
+        try:
+            self.profiler.start()
+        except ValueError as e:
+            # cProfile уже запущен снаружи (например, python -m cProfile main.py)
+            print(f"Ошибка запуска профилирования: {e}")
+            self.profiler = None
+
+    def stop_profiler(self):
+        """Заканчивает профилирование сессии и сохраняет профиль"""
+        if self.profiler is None:
+            return
+        profiler, self.profiler = self.profiler, None
+        path = profiler.stop()
+        if path:
+            print(f"Профиль сохранен: {path}")
 
     def final_close(self, game_window):
         """Финальное закрытие игры"""
         if game_window.winfo_exists():
             game_window.destroy()
+        self.stop_profiler()
         self.root.deiconify()
 
     def on_game_close(self, game_window):
         """Обработчик закрытия окна игры"""
         self.final_close(game_window)
 
-    def add_game_log(self, game_name, score):
+    def add_game_log(self, game_name, score, replay=None):
         """Добавление записи в историю игр"""
         log_entry = {
-            "date": datetime.now().strftime("%d.%m.%Y %H:%M:%S"), 
+            "ts": time.time(),  # Метка времени (дата форматируется только при отображении)
             "player": self.current_user,
-            "game": game_name.capitalize(),
+            "game": game_title(game_name),
             "score": score
         }
-        self.game_logs.append(log_entry)
-        self.save_logs()
+        if replay:
+            log_entry["replay"] = replay  # id записи игры в data/replays
+        self.storage.add_log(log_entry)
         self.update_logs_display()
 
-    def save_logs(self):
-        """Сохранение истории игр"""
-        try:
-            with open(self.logs_file, 'w', encoding='utf-8') as f:
-                json.dump(self.game_logs[-100:], f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Ошибка сохранения логов: {e}")
-
     def update_logs_display(self):
-        """Обновление отображения истории игр с прокруткой"""
-        self.logs_text.config(state='normal')
-        self.logs_text.delete(1.0, tk.END)
-        
-        try:
-            # Сортируем логи по полной дате (с годом)
-            sorted_logs = sorted(
-                self.game_logs,
-                key=lambda x: datetime.strptime(x['date'], "%d.%m.%Y %H:%M:%S"),
-                reverse=True
-            )
-            
-            # Отображаем без года (как было раньше)
-            for log in sorted_logs:
-                # Извлекаем только день, месяц и время для отображения
-                self.logs_text.insert(
-                    tk.END,
-                    f"{log['date']} ({log.get('player', 'unknown')}) "
-                    f"{log.get('game', 'Unknown')}: {log.get('score', '?')}\n"
-                )
-                
-        except (KeyError, ValueError) as e:
-            print(f"Ошибка при обработке логов: {e}")
-            # Фолбэк: отображаем как есть, если возникли проблемы с датами
-            for log in reversed(self.game_logs[-20:]):  # Последние 20 записей
-                self.logs_text.insert(
-                    tk.END,
-                    f"{log.get('date', '??.?? ??:??:??')} ({log.get('player', 'unknown')}) "
-                    f"{log.get('game', 'Unknown')}: {log.get('score', '?')}\n"
-                )
-        
-        self.logs_text.config(state='disabled')
-        self.logs_text.yview_moveto(0)  # Прокрутка к началу
+        """Обновление отображения истории игр (с самых новых записей)"""
+        self.history_view.refresh()
 
     def calculate_player_ratings(self):
         """Рассчитывает рейтинги игроков для всех игр"""
-        # Собираем данные обо всех игроках
-        players_data = {}
-        for filename in os.listdir(self.accounts_dir):
-            if filename.endswith('.json'):
-                with open(os.path.join(self.accounts_dir, filename), 'r', encoding='utf-8') as f:
-                    account = json.load(f)
-                    username = account["username"]
-                    games_data = account["games"]
-                    
-                    players_data[username] = {
-                        "scores": {
-                            "snake": games_data["snake"]["high_score"],
-                            "balls": games_data["balls"]["high_score"],
-                            "letters": games_data["letters"]["high_score"],
-                            "digits": games_data["digits"]["high_score"]
-                        }
-                    }
-        
-        # Если нет игроков, возвращаем пустой словарь
-        if not players_data:
-            return {}
-        
-        # Для каждой игры рассчитываем позиции игроков и распределяем рейтинг
-        for game in self.GAME_NAMES:
-            # Собираем всех игроков, которые играли в эту игру (даже с 0 очками)
-            game_scores = [(player, data["scores"][game]) for player, data in players_data.items()]
-            
-            # Сортируем по убыванию очков
-            sorted_scores = sorted(game_scores, key=lambda x: (-x[1], x[0]))
-            
-            # Количество игроков в этой игре
-            num_players = len(sorted_scores)
-            
-            # Распределяем рейтинг
-            for i, (player, score) in enumerate(sorted_scores):
-                if num_players == 1:
-                    # Если игрок один, он получает максимальный рейтинг
-                    rating = self.RATING_PER_GAME
-                else:
-                    # Линейное распределение рейтинга от max до 0
-                    rating = self.RATING_PER_GAME * (1 - i / (num_players - 1))
-                
-                # Добавляем рейтинг в данные игрока
-                if "ratings" not in players_data[player]:
-                    players_data[player]["ratings"] = {}
-                players_data[player]["ratings"][game] = rating
-        
-        # Рассчитываем общий рейтинг для каждого игрока
-        for player, data in players_data.items():
-            total_rating = sum(data.get("ratings", {}).values())
-            players_data[player]["total_rating"] = total_rating
-        
-        return players_data
+        return self.storage.ratings()
 
     def update_top_players(self):
-        """Обновление таблицы лидеров с новой системой рейтинга"""
-        for item in self.top_tree.get_children():
-            self.top_tree.delete(item)
-        
-        # Получаем данные с рассчитанными рейтингами
-        players_data = self.calculate_player_ratings()
-        
-        # Сортируем игроков по общему рейтингу (по убыванию)
-        sorted_players = sorted(players_data.items(),
-                              key=lambda x: -x[1]['total_rating'])
-        
-        # Добавляем игроков в таблицу
-        for player, data in sorted_players[:10]:  # Только топ-10
-            scores = data['scores']
-            self.top_tree.insert('', 'end', text=player, values=(
-                f"{data['total_rating']:.2f}",  # Рейтинг с округлением до сотых
-                scores["snake"],
-                scores["balls"],
-                scores["letters"],
-                scores["digits"]
-            ))
+        """Обновление таблицы лидеров (меняются только изменившиеся строки)"""
+        self.top_view.refresh()
+        self.update_user_info()
+
+    def update_user_info(self):
+        """Показывает место и рейтинг текущего игрока (без пересчета всей таблицы)"""
+        text = f"Пользователь: {self.current_user}"
+        player_rating = self.storage.player_rating(self.current_user)
+        if player_rating:
+            place, data = player_rating
+            text += f"  |  Место: {place}  |  Рейтинг: {data['total_rating']:.2f}"
+        self.user_label.config(text=text)
+
+    def show_profile(self):
+        """Окно с личной статистикой текущего игрока"""
+        window = tk.Toplevel(self.root)
+        window.title(f"Профиль: {self.current_user}")
+        profile = ProfileView(window, self.storage, self.current_user, self.GAME_NAMES)
+        profile.pack(fill=tk.BOTH, expand=True)
+        profile.refresh()
 
     def clear_window(self):
         """Очистка окна"""
@@ -383,6 +316,7 @@ class GameCenter:
 
     def logout(self):
         """Выход из аккаунта"""
+        self.storage.flush()  # Дописываем отложенные изменения перед сменой пользователя
         self.current_user = None
         self.create_auth_interface()
 
@@ -390,7 +324,7 @@ class GameCenter:
         """Авторизация пользователя"""
         user = simpledialog.askstring("Вход", "Введите имя пользователя:", parent=self.root)
         
-        if user and os.path.exists(os.path.join(self.accounts_dir, f"{user}.json")):
+        if user and self.storage.account_exists(user):
             self.current_user = user
             self.create_main_interface()
         else:
@@ -403,23 +337,10 @@ class GameCenter:
         if not user:
             return
             
-        if os.path.exists(os.path.join(self.accounts_dir, f"{user}.json")):
+        if not self.storage.create_account(user):
             messagebox.showerror("Ошибка", "Имя пользователя уже занято")
             return
             
-        account = {
-            "username": user,
-            "games": {
-                "snake": {"high_score": 0, "last_score": 0},
-                "balls": {"high_score": 0, "last_score": 0},
-                "letters": {"high_score": 0, "last_score": 0},
-                "digits": {"high_score": 0, "last_score": 0}
-            }
-        }
-        
-        with open(os.path.join(self.accounts_dir, f"{user}.json"), 'w', encoding='utf-8') as f:
-            json.dump(account, f, ensure_ascii=False, indent=4)
-            
         self.current_user = user
         messagebox.showinfo("Успех", "Регистрация прошла успешно!")
         self.create_main_interface()
@@ -428,26 +349,15 @@ class GameCenter:
         """Обновление результатов игрока"""
         if not self.current_user:
             return
-            
-        account_path = os.path.join(self.accounts_dir, f"{self.current_user}.json")
-        
-        with open(account_path, 'r', encoding='utf-8') as f:
-            account = json.load(f)
-        
-        game_stats = account["games"][game_name]
-        
-        if new_score > game_stats["high_score"]:
-            game_stats["high_score"] = new_score
-        game_stats["last_score"] = new_score
         
-        with open(account_path, 'w', encoding='utf-8') as f:
-            json.dump(account, f, ensure_ascii=False, indent=4)
+        self.storage.record_score(self.current_user, game_name, new_score)
 
 if __name__ == "__main__":
     root = tk.Tk()
     try:
         app = GameCenter(root)
         root.mainloop()
+        app.storage.close()
     except Exception as e:
         messagebox.showerror("Ошибка", f"Программа завершена из-за ошибки: {str(e)}")
         root.destroy()
\ No newline at end of file
@@ -0,0 +1,425 @@
+import tkinter as tk
+from tkinter import messagebox, ttk
+from gcenter.registry import game_title
+from gcenter.sessions import format_date, parse_date
+
+
+class HistoryView(tk.Frame):
+    """
+    Виртуализированный список истории игр.
+    В таблице всегда ровно ROWS строк - при прокрутке меняется только их текст,
+    а данные читаются из хранилища страницами нужного размера.
+    """
+
+    ALL_GAMES = "Все"  # Значение фильтра "все игры"
+
+    def __init__(self, parent, storage, game_titles, rows=10):
+        """
+        :param parent: Родительский виджет
+        :param storage: Хранилище Game Center
+        :param game_titles: Названия игр для фильтра (как в записях истории)
+        :param rows: Количество видимых строк
+        """
+        super().__init__(parent)
+        self.storage = storage
+        self.rows = rows
+        self.offset = 0          # Сколько самых новых записей пропущено (позиция прокрутки)
+        self.selection = None    # Текущая выборка из хранилища
+        self.filters = {}        # Текущий фильтр (аргументы select_sessions)
+
+        # --- Панель фильтров ---
+        filter_frame = tk.Frame(self)
+        filter_frame.pack(fill=tk.X, padx=10)
+
+        tk.Label(filter_frame, text="С:").pack(side=tk.LEFT)
+        self.start_entry = tk.Entry(filter_frame, width=11)
+        self.start_entry.pack(side=tk.LEFT, padx=2)
+
+        tk.Label(filter_frame, text="По:").pack(side=tk.LEFT)
+        self.end_entry = tk.Entry(filter_frame, width=11)
+        self.end_entry.pack(side=tk.LEFT, padx=2)
+
+        tk.Label(filter_frame, text="Игрок:").pack(side=tk.LEFT)
+        self.player_entry = tk.Entry(filter_frame, width=10)
+        self.player_entry.pack(side=tk.LEFT, padx=2)
+
+        self.game_box = ttk.Combobox(
+            filter_frame,
+            values=[self.ALL_GAMES] + list(game_titles),
+            width=8,
+            state='readonly'
+        )
+        self.game_box.set(self.ALL_GAMES)
+        self.game_box.pack(side=tk.LEFT, padx=2)
+
+        tk.Button(filter_frame, text="🔍", command=self.apply_filters).pack(side=tk.LEFT, padx=2)
+        tk.Button(filter_frame, text="✖", command=self.reset_filters).pack(side=tk.LEFT)
+
+        # --- Таблица с постоянным набором строк ---
+        table_frame = tk.Frame(self)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        self.scrollbar = tk.Scrollbar(table_frame, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree = ttk.Treeview(
+            table_frame,
+            columns=('Date', 'Player', 'Game', 'Score'),
+            show='headings',
+            height=rows,
+            selectmode='none'
+        )
+        self.tree.column('Date', width=150, anchor='w')
+        self.tree.column('Player', width=120, anchor='w')
+        self.tree.column('Game', width=90, anchor='center')
+        self.tree.column('Score', width=70, anchor='center')
+        self.tree.heading('Date', text='Дата')
+        self.tree.heading('Player', text='Игрок')
+        self.tree.heading('Game', text='Игра')
+        self.tree.heading('Score', text='Счёт')
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        for row in range(rows):
+            self.tree.insert('', 'end', iid=str(row), values=('', '', '', ''))
+
+        # Прокрутка колесом мыши (Windows/macOS и Linux)
+        self.tree.bind('<MouseWheel>', lambda e: self.scroll_by(-1 if e.delta > 0 else 1))
+        self.tree.bind('<Button-4>', lambda e: self.scroll_by(-1))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_by(1))
+
+    def refresh(self):
+        """Заново выполняет выборку (например, после новой игры) и показывает самые новые записи"""
+        self.selection = self.storage.select_sessions(**self.filters)
+        self.offset = 0
+        self.render()
+
+    def apply_filters(self):
+        """Применяет фильтр по дате, игроку и игре"""
+        try:
+            start = parse_date(self.start_entry.get())
+            end = parse_date(self.end_entry.get(), end=True)
+        except ValueError as e:
+            messagebox.showerror("Ошибка", f"{e}\nФормат: Д.М.Г или Д.М.Г Ч:М:С")
+            return
+
+        game = self.game_box.get()
+        self.filters = {
+            "start": start,
+            "end": end,
+            "player": self.player_entry.get().strip() or None,
+            "game": None if game == self.ALL_GAMES else game
+        }
+        self.refresh()
+
+    def reset_filters(self):
+        """Сбрасывает фильтр"""
+        for entry in (self.start_entry, self.end_entry, self.player_entry):
+            entry.delete(0, tk.END)
+        self.game_box.set(self.ALL_GAMES)
+        self.filters = {}
+        self.refresh()
+
+    def max_offset(self):
+        """Наибольшая позиция прокрутки"""
+        return max(0, len(self.selection) - self.rows)
+
+    def scroll_by(self, count):
+        """Прокручивает список на count строк"""
+        self.scroll_to(self.offset + count)
+
+    def scroll_to(self, offset):
+        """Перемещается к указанной позиции и перерисовывает видимые строки"""
+        offset = max(0, min(int(offset), self.max_offset()))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def on_scroll(self, action, value, unit=None):
+        """Обработчик полосы прокрутки (moveto / scroll)"""
+        if action == 'moveto':
+            self.scroll_to(float(value) * len(self.selection))
+        elif action == 'scroll':
+            step = self.rows if unit == 'pages' else 1
+            self.scroll_by(int(value) * step)
+
+    def render(self):
+        """Отрисовывает только видимое окно записей"""
+        if self.selection is None:
+            return
+        logs = self.selection.page(self.offset, self.rows)
+        for row in range(self.rows):
+            if row < len(logs):
+                log = logs[row]
+                values = (
+                    format_date(log),
+                    log.get('player', 'unknown'),
+                    log.get('game', 'Unknown'),
+                    log.get('score', '?')
+                )
+            else:
+                values = ('', '', '', '')
+            self.tree.item(str(row), values=values)
+
+        total = len(self.selection)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+
+class LeaderboardView(tk.Frame):
+    """
+    Таблица лидеров с обновлением по разнице.
+    Показывает общий рейтинг или таблицу одной игры страницами из хранилища
+    (места заранее посчитаны, страница стоит O(log n + размер страницы)).
+    При обновлении строки перемещаются, меняются или добавляются только там,
+    где изменились место или значения; следующие страницы игроков подгружаются
+    при прокрутке до конца таблицы, кнопка "Я" показывает игроков вокруг текущего.
+    """
+
+    OVERALL = "Общий"  # Значение выбора "общий рейтинг"
+
+    def __init__(self, parent, storage, game_names, page_size=10, limit=100, height=6, username=None):
+        """
+        :param parent: Родительский виджет
+        :param storage: Хранилище Game Center
+        :param game_names: Список игр (столбцы таблицы)
+        :param page_size: Сколько игроков загружается сразу и при каждой подгрузке
+        :param limit: Максимальное количество игроков в таблице (None - без ограничения)
+        :param height: Высота таблицы в строках
+        :param username: Текущий игрок (для просмотра мест вокруг него)
+        """
+        super().__init__(parent)
+        self.storage = storage
+        self.game_names = list(game_names)
+        self.page_size = page_size
+        self.limit = limit
+        self.username = username
+        self.game = None          # Игра таблицы или None для общего рейтинга
+        self.offset = 0           # Место (с 0), с которого начинается таблица
+        self.loaded = page_size   # Сколько мест таблицы сейчас запрошено
+        self.rows = {}            # Показанные строки: {игрок: значения}
+        self.order = []           # Показанный порядок игроков
+
+        # --- Выбор таблицы и переходы ---
+        controls = tk.Frame(self)
+        controls.pack(fill=tk.X)
+
+        self.board_box = ttk.Combobox(
+            controls,
+            values=[self.OVERALL] + [game_title(game) for game in self.game_names],
+            width=10,
+            state='readonly'
+        )
+        self.board_box.set(self.OVERALL)
+        self.board_box.bind('<<ComboboxSelected>>', lambda event: self.select_board())
+        self.board_box.pack(side=tk.LEFT, padx=2)
+
+        tk.Button(controls, text="⏫", command=self.show_top).pack(side=tk.LEFT, padx=2)
+        self.previous_button = tk.Button(controls, text="▲", command=self.load_previous, state=tk.DISABLED)
+        self.previous_button.pack(side=tk.LEFT, padx=2)
+        if username is not None:
+            tk.Button(controls, text="Я", command=self.show_around_me).pack(side=tk.LEFT, padx=2)
+
+        # --- Таблица ---
+        self.scrollbar = tk.Scrollbar(self, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        columns = ['Place', 'Rating'] + [game_title(game) for game in self.game_names]
+        self.tree = ttk.Treeview(self, height=height, yscrollcommand=self.on_view_changed)
+        self.tree['columns'] = columns
+        self.tree.column('#0', width=100, anchor='w')
+        self.tree.heading('#0', text='Игрок')
+        self.tree.column('Place', width=50, anchor='center')
+        self.tree.heading('Place', text='Место')
+        self.tree.column('Rating', width=80, anchor='center')
+        self.tree.heading('Rating', text='Рейтинг')
+        for column in columns[2:]:
+            self.tree.column(column, width=80, anchor='center')
+            self.tree.heading(column, text=column)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+    def refresh(self):
+        """Применяет к таблице только изменившиеся строки"""
+        leaders = self.storage.board(self.offset, self.loaded, self.game)
+        new_order = [player for _, player, _ in leaders]
+
+        # Удаляем игроков, выбывших из таблицы
+        new_players = set(new_order)
+        for player in self.order:
+            if player not in new_players:
+                self.tree.delete(player)
+                del self.rows[player]
+
+        for index, (place, player, data) in enumerate(leaders):
+            scores = data['scores']
+            values = (str(place), f"{data['rating']:.2f}") + tuple(
+                str(scores.get(game, 0)) for game in self.game_names
+            )
+            if player not in self.rows:
+                self.tree.insert('', index, iid=player, text=player, values=values)
+            else:
+                if self.tree.index(player) != index:
+                    self.tree.move(player, '', index)
+                if self.rows[player] != values:
+                    self.tree.item(player, values=values)
+            self.rows[player] = values
+
+        self.order = new_order
+        self.previous_button.config(state=tk.NORMAL if self.offset > 0 else tk.DISABLED)
+
+    def reset(self, offset=0):
+        """Показывает таблицу заново начиная с места offset"""
+        self.tree.delete(*self.tree.get_children())
+        self.rows = {}
+        self.order = []
+        self.offset = offset
+        self.loaded = self.page_size
+        self.refresh()
+
+    def select_board(self):
+        """Переключает общий рейтинг и таблицы отдельных игр"""
+        titles = {game_title(game): game for game in self.game_names}
+        self.game = titles.get(self.board_box.get())  # None - общий рейтинг
+        self.reset()
+
+    def show_top(self):
+        """Возвращает таблицу к первым местам"""
+        self.reset()
+
+    def show_around_me(self):
+        """Показывает игроков вокруг текущего и выделяет его строку"""
+        place = self.storage.board_place(self.username, self.game)
+        if place is None:
+            return
+        self.reset(max(0, place - 1 - self.page_size // 2))
+        if self.tree.exists(self.username):
+            self.tree.selection_set(self.username)
+            self.tree.see(self.username)
+
+    def has_more(self):
+        """Есть ли еще игроки, которых можно подгрузить"""
+        if self.limit is not None and self.loaded >= self.limit:
+            return False
+        return len(self.order) >= self.loaded
+
+    def load_more(self):
+        """Подгружает следующую страницу игроков"""
+        if not self.has_more():
+            return
+        self.loaded += self.page_size
+        if self.limit is not None:
+            self.loaded = min(self.loaded, self.limit)
+        self.refresh()
+
+    def load_previous(self):
+        """Подгружает страницу игроков выше показанных"""
+        if self.offset <= 0:
+            return
+        step = min(self.page_size, self.offset)
+        self.offset -= step
+        self.loaded += step
+        if self.limit is not None:
+            self.loaded = min(self.loaded, self.limit)
+        self.refresh()
+        if self.order:
+            self.tree.see(self.order[0])
+
+    def on_scroll(self, *args):
+        """Обработчик полосы прокрутки"""
+        self.tree.yview(*args)
+
+    def on_view_changed(self, first, last):
+        """Обновляет полосу прокрутки и подгружает игроков при достижении конца таблицы"""
+        self.scrollbar.set(first, last)
+        if float(last) >= 1.0 and self.order and self.has_more():
+            # Подгрузка после обработки текущего события прокрутки
+            self.after_idle(self.load_more)
+
+
+class ProfileView(tk.Frame):
+    """
+    Личная статистика игрока по играм.
+    Данные берутся из сводок, которые обновляются при записи каждого результата,
+    поэтому панель открывается мгновенно при любой длине истории.
+    """
+
+    HISTOGRAM_HEIGHT = 120  # Высота области гистограммы в пикселях
+
+    def __init__(self, parent, storage, username, game_names):
+        """
+        :param parent: Родительский виджет
+        :param storage: Хранилище Game Center
+        :param username: Игрок
+        :param game_names: Список игр
+        """
+        super().__init__(parent)
+        self.storage = storage
+        self.username = username
+        self.game_names = list(game_names)
+        self.stats = {}
+
+        columns = ['Count', 'Max', 'Mean', 'Stddev', 'Min', 'Today', 'Recent']
+        titles = ['Игр', 'Рекорд', 'Среднее', 'Разброс', 'Минимум', 'Сегодня', 'Последние']
+        self.tree = ttk.Treeview(self, height=len(self.game_names), selectmode='browse')
+        self.tree['columns'] = columns
+        self.tree.column('#0', width=80, anchor='w')
+        self.tree.heading('#0', text='Игра')
+        for column, title in zip(columns, titles):
+            self.tree.column(column, width=180 if column == 'Recent' else 70, anchor='center')
+            self.tree.heading(column, text=title)
+        self.tree.pack(fill=tk.X, padx=10, pady=5)
+        self.tree.bind('<<TreeviewSelect>>', lambda event: self.draw_histogram())
+
+        self.histogram = tk.Canvas(self, height=self.HISTOGRAM_HEIGHT, bg='white')
+        self.histogram.pack(fill=tk.X, padx=10, pady=5)
+
+    def refresh(self):
+        """Перечитывает статистику игрока"""
+        self.stats = self.storage.player_stats(self.username) or {}
+        selected = self.tree.selection()
+        self.tree.delete(*self.tree.get_children())
+        for game in self.game_names:
+            summary = self.stats.get(game)
+            if summary is None:
+                continue
+            count = summary['count']
+            values = (
+                count,
+                summary['max'] if count else "-",
+                f"{summary['mean']:.1f}" if count else "-",
+                f"{summary['stddev']:.1f}" if count else "-",
+                summary['min'] if count else "-",
+                summary['today_best'] if summary['today_best'] is not None else "-",
+                " ".join(str(score) for score in reversed(summary['recent']))
+            )
+            self.tree.insert('', tk.END, iid=game, text=game_title(game), values=values)
+
+        if selected and self.tree.exists(selected[0]):
+            self.tree.selection_set(selected[0])
+        elif self.game_names and self.tree.exists(self.game_names[0]):
+            self.tree.selection_set(self.game_names[0])
+        self.draw_histogram()
+
+    def draw_histogram(self):
+        """Рисует гистограмму результатов выбранной игры"""
+        self.histogram.delete('all')
+        selected = self.tree.selection()
+        if not selected or selected[0] not in self.stats:
+            return
+        buckets = self.stats[selected[0]]['histogram']
+        if not buckets:
+            self.histogram.create_text(10, 10, anchor='nw', text="Игр еще не было")
+            return
+
+        width = max(self.histogram.winfo_width(), 400)
+        bar_width = width / len(buckets)
+        tallest = max(amount for _, _, amount in buckets)
+        bottom = self.HISTOGRAM_HEIGHT - 20
+        for index, (low, high, amount) in enumerate(buckets):
+            x = index * bar_width
+            top = bottom - (bottom - 15) * amount / tallest
+            self.histogram.create_rectangle(x + 4, top, x + bar_width - 4, bottom, fill='steelblue')
+            self.histogram.create_text(x + bar_width / 2, top - 2, anchor='s', text=str(amount))
+            label = str(low) if high == low else f"{low}+" if high is None else f"{low}-{high}"
+            self.histogram.create_text(x + bar_width / 2, bottom + 2, anchor='n', text=label)